@@ -0,0 +1,123 @@
+import os
+import random
+from typing import Dict, Iterator, List, Sequence
+
+# Number of nodes per element by supported element type.
+NODES_PER_ELEMENT_BY_TYPE = {
+    'C3D4': 4,
+    'C3D10': 10,
+    'C3D20R': 20,
+    'S4': 4
+}
+
+# Maximum number of entries on a data line before continuing on the next line.
+MAX_ENTRIES_PER_LINE = 16
+
+# Number of data lines to format before writing them.
+LINES_PER_WRITE = 1 << 14
+
+
+def generate_deck(directory: str,
+                  num_nodes: int,
+                  num_elements: int,
+                  element_types: Sequence[str] = ('C3D4', 'C3D10', 'C3D20R', 'S4'),
+                  seed: int = 0) -> str:
+    """Generates a synthetic CalculiX input deck.
+
+    The deck is written as a main file which includes a file of nodes,
+    followed by elements split evenly across element types.
+    Elements with more than 15 nodes are written with continuation lines.
+    Each element type gets an element set,
+    and element sets are also defined with GENERATE and by referencing other sets.
+
+    :param directory: Directory to write the deck to.
+    :param num_nodes: Number of nodes.
+    :param num_elements: Number of elements.
+    :param element_types: Element types to split elements across.
+    :param seed: Seed for random node coordinates and connectivity.
+    :raises ValueError: When an element type isn't supported.
+    :return: Path to the main file.
+    """
+    for element_type in element_types:
+        if element_type not in NODES_PER_ELEMENT_BY_TYPE:
+            raise ValueError("Unsupported element type '{}'.".format(element_type))
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    nodes_path = os.path.join(directory, 'nodes.inp')
+    with open(nodes_path, 'w') as f:
+        f.write('*NODE, NSET=Nall\n')
+        write_lines(f, iter_node_lines(num_nodes, rng))
+    path = os.path.join(directory, 'main.inp')
+    with open(path, 'w') as f:
+        f.write('** Synthetic deck with {} nodes and {} elements.\n'.format(
+            num_nodes, num_elements))
+        f.write('*INCLUDE, INPUT=nodes.inp\n')
+        element_sets = []
+        for element_type, (start, stop) in split_elements(num_elements, element_types).items():
+            element_set = 'E' + element_type
+            element_sets.append(element_set)
+            f.write('** {} elements\n'.format(element_type))
+            f.write('*ELEMENT, TYPE={}, ELSET={}\n'.format(element_type, element_set))
+            write_lines(f, iter_element_lines(
+                start, stop, NODES_PER_ELEMENT_BY_TYPE[element_type], num_nodes, rng))
+        f.write('*ELSET, ELSET=Efirsthalf, GENERATE\n')
+        f.write('1, {}, 1\n'.format(max(num_elements // 2, 1)))
+        f.write('*ELSET, ELSET=Eodd, GENERATE\n')
+        f.write('1, {}, 2\n'.format(max(num_elements, 1)))
+        f.write('*ELSET, ELSET=Eall\n')
+        write_lines(f, iter_set_lines(element_sets))
+        f.write('*MATERIAL, NAME=Steel\n')
+        f.write('*ELASTIC\n')
+        f.write('210000, 0.3\n')
+    return path
+
+
+def split_elements(num_elements: int, element_types: Sequence[str]) -> Dict[str, tuple]:
+    """Splits element numbers evenly across element types.
+
+    :return: Start and stop element numbers by element type.
+    """
+    ranges = {}
+    start = 1
+    for i, element_type in enumerate(element_types):
+        count = num_elements // len(element_types) + (i < num_elements % len(element_types))
+        ranges[element_type] = (start, start + count)
+        start += count
+    return ranges
+
+
+def iter_node_lines(num_nodes: int, rng: random.Random) -> Iterator[str]:
+    for number in range(1, num_nodes + 1):
+        yield '{}, {:.6e}, {:.6e}, {:.6e}\n'.format(
+            number, rng.random(), rng.random(), rng.random())
+
+
+def iter_element_lines(start: int,
+                       stop: int,
+                       nodes_per_element: int,
+                       num_nodes: int,
+                       rng: random.Random) -> Iterator[str]:
+    for number in range(start, stop):
+        entries = [str(number)] + [
+            str(rng.randint(1, num_nodes)) for _ in range(nodes_per_element)]
+        lines = [', '.join(entries[i:i + MAX_ENTRIES_PER_LINE])
+                 for i in range(0, len(entries), MAX_ENTRIES_PER_LINE)]
+        yield ',\n'.join(lines) + '\n'
+
+
+def iter_set_lines(element_sets: List[str]) -> Iterator[str]:
+    for i in range(0, len(element_sets), MAX_ENTRIES_PER_LINE):
+        yield ', '.join(element_sets[i:i + MAX_ENTRIES_PER_LINE]) + '\n'
+
+
+def write_lines(f, lines: Iterator[str]) -> None:
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == LINES_PER_WRITE:
+            f.writelines(batch)
+            batch.clear()
+    f.writelines(batch)
+
+
+__all__ = ['generate_deck']
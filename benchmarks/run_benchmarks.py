@@ -0,0 +1,209 @@
+"""Times reading a synthetic CalculiX input deck, and writes the results as JSON.
+
+Usage:
+
+    python -m benchmarks.run_benchmarks --nodes 1000000 --elements 500000 --output results.json
+    python -m benchmarks.run_benchmarks --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, List, Optional
+
+from ccxmeshreader.mesh_records import IncludeStart
+from ccxmeshreader.read_mesh import (build_mesh, iter_mesh, iter_records,
+                                     read_mesh)
+
+from .generate_deck import generate_deck
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+
+def run_benchmarks(path: str,
+                   backends: List[str],
+                   repeat: int = 3,
+                   workers: Optional[int] = None) -> dict:
+    """Times reading a CalculiX input deck end to end and per phase.
+
+    Phases are cumulative:
+    'scan' reads keyword lines and slices out data blocks,
+    'parse' also parses data blocks into records,
+    'build' builds a mesh from parsed records,
+    and 'read_mesh' does all of the above.
+
+    :param path: Path to CalculiX input file.
+    :param backends: Backends to time build and read_mesh with.
+    :param repeat: Number of times to time each phase, of which the fastest is kept.
+    :param workers: Number of processes to pass to read_mesh.
+    :return: Deck size, and a result per phase and backend.
+    """
+    num_bytes, num_lines = measure_deck(path)
+    results = []
+
+    def add_result(phase: str, backend: Optional[str], function: Callable[[], object]) -> None:
+        seconds = min(time_function(function) for _ in range(repeat))
+        results.append({
+            'phase': phase,
+            'backend': backend,
+            'seconds': seconds,
+            'mb_per_s': num_bytes / seconds / 1e6,
+            'lines_per_s': num_lines / seconds,
+            'peak_memory_bytes': measure_peak_memory(function)
+        })
+
+    add_result('scan', None, lambda: consume(iter_records(path)))
+    add_result('parse', None, lambda: consume(iter_mesh(path, blocks=True)))
+    records = list(iter_mesh(path, blocks=True))
+    for backend in backends:
+        add_result('build', backend,
+                   lambda records=records: build_mesh(records, backend))
+    # Frees the records before timing read_mesh.
+    del records
+    for backend in backends:
+        add_result('read_mesh', backend,
+                   lambda: read_mesh(path, backend=backend, workers=workers))
+    return {
+        'deck': {'path': path, 'bytes': num_bytes, 'lines': num_lines},
+        'environment': get_environment(),
+        'results': results
+    }
+
+
+def time_function(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def measure_peak_memory(function: Callable[[], object]) -> int:
+    """Measures peak memory allocated while calling a function.
+
+    Only memory allocated through Python's allocators,
+    including numpy arrays, is traced.
+
+    :return: Peak traced memory in bytes.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def consume(iterator) -> None:
+    deque(iterator, maxlen=0)
+
+
+def measure_deck(path: str) -> tuple:
+    """Measures the size of a deck, including files it includes.
+
+    :return: Two-element tuple containing number of bytes and number of lines.
+    """
+    paths = [path] + [record.path for record in iter_records(path)
+                      if type(record) is IncludeStart]
+    num_bytes = 0
+    num_lines = 0
+    for deck_path in paths:
+        with open(deck_path, 'rb') as f:
+            data = f.read()
+        num_bytes += len(data)
+        num_lines += data.count(b'\n')
+    return num_bytes, num_lines
+
+
+def get_environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': None if np is None else np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare_results(results: dict, baseline: dict) -> List[str]:
+    """Compares results with baseline results of the same phases and backends.
+
+    :return: A line per phase and backend with the ratio of seconds to the baseline.
+    """
+    baseline_seconds = {
+        (result['phase'], result['backend']): result['seconds']
+        for result in baseline['results']
+    }
+    lines = []
+    for result in results['results']:
+        key = (result['phase'], result['backend'])
+        if key in baseline_seconds:
+            lines.append('{:<10} {:<6} {:8.3f}s {:6.2f}x baseline'.format(
+                result['phase'], result['backend'] or '-',
+                result['seconds'], result['seconds'] / baseline_seconds[key]))
+    return lines
+
+
+def format_results(results: dict) -> List[str]:
+    lines = ['{} bytes, {} lines'.format(
+        results['deck']['bytes'], results['deck']['lines'])]
+    for result in results['results']:
+        lines.append('{:<10} {:<6} {:8.3f}s {:8.1f} MB/s {:12.0f} lines/s {:8.1f} MB peak'.format(
+            result['phase'], result['backend'] or '-', result['seconds'],
+            result['mb_per_s'], result['lines_per_s'],
+            result['peak_memory_bytes'] / 1e6))
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=100000,
+                        help='number of nodes in the generated deck')
+    parser.add_argument('--elements', type=int, default=50000,
+                        help='number of elements in the generated deck')
+    parser.add_argument('--element-types', nargs='+',
+                        default=['C3D4', 'C3D10', 'C3D20R', 'S4'],
+                        help='element types to split elements across')
+    parser.add_argument('--deck', help='existing deck to read instead of generating one')
+    parser.add_argument('--backends', nargs='+',
+                        default=['dict'] if np is None else ['dict', 'numpy'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', help='path to write results to as JSON')
+    parser.add_argument('--baseline', help='path to results to compare with')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.deck or generate_deck(
+            directory, args.nodes, args.elements, args.element_types)
+        results = run_benchmarks(path, args.backends, args.repeat, args.workers)
+    results['deck']['nodes'] = None if args.deck else args.nodes
+    results['deck']['elements'] = None if args.deck else args.elements
+
+    for line in format_results(results):
+        print(line)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for line in compare_results(results, baseline):
+            print(line)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,4 +1,19 @@
+from .connectivity import MeshConnectivity
+from .element_set import ElementSet
+from .keyword_handlers import KeywordHandler, register_keyword_handler
+from .mapped_mesh import load_mapped_mesh
+from .mesh_cache import MeshCache
+from .mesh_index import MeshIndex
+from .mesh_query import MeshQuery
+from .mesh_reader import MeshReader
 from .parser_error import ParserError
-from .read_mesh import read_mesh
+from .read_mesh import iter_mesh, read_mesh
+from .read_mesh_async import iter_mesh_async, read_mesh_async
+from .read_meshes import read_meshes
+from .read_stats import ReadStats
+from .shared_mesh import SharedMesh
 
-__all__ = ['ParserError', 'read_mesh']
+__all__ = ['ElementSet', 'KeywordHandler', 'MeshCache', 'MeshConnectivity', 'MeshIndex',
+           'MeshQuery', 'MeshReader', 'ParserError', 'ReadStats', 'SharedMesh', 'iter_mesh', 'iter_mesh_async',
+           'load_mapped_mesh', 'read_mesh', 'read_mesh_async', 'read_meshes',
+           'register_keyword_handler']
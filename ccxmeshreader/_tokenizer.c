@@ -0,0 +1,394 @@
+/*
+ * Parses blocks of *NODE and *ELEMENT data lines into preallocated buffers.
+ *
+ * This is an optional accelerator for ccxmeshreader.parse_data_block.
+ * Each function returns None for a block it doesn't consider regular,
+ * so the caller can fall back to parsing it in Python,
+ * which raises the appropriate error for malformed lines.
+ *
+ * The GIL is released while parsing,
+ * so other threads, such as an event loop, keep running.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#define MAX_ELEMENT_DATA_LINE_PARTS 16
+#define MAX_NUMBER_LENGTH 64
+
+static int
+is_space(char c)
+{
+    return c == ' ' || c == '\t' || c == '\r';
+}
+
+static int
+is_digit(char c)
+{
+    return c >= '0' && c <= '9';
+}
+
+/* Powers of ten that are exactly representable as doubles. */
+static const double exact_powers_of_ten[] = {
+    1e0, 1e1, 1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10,
+    1e11, 1e12, 1e13, 1e14, 1e15, 1e16, 1e17, 1e18, 1e19, 1e20,
+    1e21, 1e22
+};
+
+static const char *
+skip_spaces(const char *p, const char *end)
+{
+    while (p < end && is_space(*p)) {
+        p++;
+    }
+    return p;
+}
+
+/* Checks a field is followed by a comma, newline, or the end of the data. */
+static int
+is_field_end(const char *p, const char *end)
+{
+    return p == end || *p == ',' || *p == '\n';
+}
+
+/* Reads a field containing a decimal integer, as int() does.
+ * An empty field is read as 0 if allow_empty is set.
+ * On success, advances *cursor to the comma, newline, or end after the field,
+ * and returns 0. Returns -1 if the field isn't an integer that fits in 64 bits. */
+static int
+read_int(const char **cursor, const char *end, int allow_empty, int64_t *value)
+{
+    const char *p = skip_spaces(*cursor, end);
+    const char *start = p;
+    const char *digits_start;
+    int negative = 0;
+    uint64_t magnitude = 0;
+
+    if (p < end && (*p == '+' || *p == '-')) {
+        negative = *p == '-';
+        p++;
+    }
+    digits_start = p;
+    for (; p < end && is_digit(*p); p++) {
+        unsigned int digit = (unsigned int)(*p - '0');
+        if (magnitude > (UINT64_MAX - digit) / 10) {
+            return -1;
+        }
+        magnitude = magnitude * 10 + digit;
+    }
+    if (p == digits_start && (!allow_empty || p != start)) {
+        /* No digits, and not empty. */
+        return -1;
+    }
+    p = skip_spaces(p, end);
+    if (!is_field_end(p, end)) {
+        return -1;
+    }
+    if (negative) {
+        if (magnitude > (uint64_t)INT64_MAX + 1) {
+            return -1;
+        }
+        *value = magnitude == (uint64_t)INT64_MAX + 1 ? INT64_MIN : -(int64_t)magnitude;
+    }
+    else {
+        if (magnitude > (uint64_t)INT64_MAX) {
+            return -1;
+        }
+        *value = (int64_t)magnitude;
+    }
+    *cursor = p;
+    return 0;
+}
+
+/* Reads a field containing a decimal floating-point number, as float() does.
+ * Only [+-]digits[.digits][(e|E)[+-]digits] is accepted, not inf, nan, or underscores.
+ * On success, advances *cursor to the comma, newline, or end after the field,
+ * and returns 0. Returns -1 if the field isn't a number. */
+static int
+read_double(const char **cursor, const char *end, double *value)
+{
+    const char *p = skip_spaces(*cursor, end);
+    const char *start = p;
+    const char *number_end;
+    int negative = 0, digits = 0;
+    uint64_t mantissa = 0;
+    long exponent = 0;
+
+    if (p < end && (*p == '+' || *p == '-')) {
+        negative = *p == '-';
+        p++;
+    }
+    for (; p < end && is_digit(*p); p++) {
+        mantissa = mantissa * 10 + (uint64_t)(*p - '0');
+        digits++;
+    }
+    if (p < end && *p == '.') {
+        for (p++; p < end && is_digit(*p); p++) {
+            mantissa = mantissa * 10 + (uint64_t)(*p - '0');
+            exponent--;
+            digits++;
+        }
+    }
+    if (digits == 0) {
+        return -1;
+    }
+    if (p < end && (*p == 'e' || *p == 'E')) {
+        int exponent_negative = 0, exponent_digits = 0;
+        long exponent_value = 0;
+        p++;
+        if (p < end && (*p == '+' || *p == '-')) {
+            exponent_negative = *p == '-';
+            p++;
+        }
+        for (; p < end && is_digit(*p); p++) {
+            if (exponent_value < 100000) {
+                exponent_value = exponent_value * 10 + (*p - '0');
+            }
+            exponent_digits++;
+        }
+        if (exponent_digits == 0) {
+            return -1;
+        }
+        exponent += exponent_negative ? -exponent_value : exponent_value;
+    }
+    number_end = p;
+    p = skip_spaces(p, end);
+    if (!is_field_end(p, end)) {
+        return -1;
+    }
+    if (digits <= 19 && mantissa <= ((uint64_t)1 << 53) && exponent >= -22 && exponent <= 22) {
+        /* Both the mantissa and power of ten are exact,
+         * so one multiplication or division is correctly rounded. */
+        double result = (double)mantissa;
+        if (exponent < 0) {
+            result /= exact_powers_of_ten[-exponent];
+        }
+        else {
+            result *= exact_powers_of_ten[exponent];
+        }
+        *value = negative ? -result : result;
+    }
+    else {
+        char number[MAX_NUMBER_LENGTH + 1];
+        char *parsed_end;
+        int failed;
+        PyGILState_STATE gil_state;
+        Py_ssize_t length = number_end - start;
+        if (length > MAX_NUMBER_LENGTH) {
+            return -1;
+        }
+        memcpy(number, start, (size_t)length);
+        number[length] = '\0';
+        /* Called with the GIL released. */
+        gil_state = PyGILState_Ensure();
+        *value = PyOS_string_to_double(number, &parsed_end, NULL);
+        failed = *value == -1.0 && PyErr_Occurred();
+        if (failed) {
+            PyErr_Clear();
+        }
+        PyGILState_Release(gil_state);
+        if (failed || parsed_end != number + length) {
+            return -1;
+        }
+    }
+    *cursor = p;
+    return 0;
+}
+
+PyDoc_STRVAR(parse_node_block_doc,
+"parse_node_block(data, node_numbers, node_coordinates)\n"
+"--\n"
+"\n"
+"Parse node data lines of the form 'number, x, y, z'.\n"
+"\n"
+"Node numbers are written to node_numbers, a writable int64 buffer,\n"
+"and coordinates to node_coordinates, a writable float64 buffer,\n"
+"with room for a node per line.\n"
+"\n"
+"Return the number of nodes, or None if the block isn't regular.");
+
+static PyObject *
+parse_node_block(PyObject *module, PyObject *args)
+{
+    Py_buffer data, numbers, coordinates;
+    const char *p, *end;
+    int64_t *numbers_out;
+    double *coordinates_out;
+    Py_ssize_t capacity, count = 0;
+    int regular = 1;
+
+    if (!PyArg_ParseTuple(args, "y*w*w*:parse_node_block", &data, &numbers, &coordinates)) {
+        return NULL;
+    }
+    p = data.buf;
+    end = p + data.len;
+    numbers_out = numbers.buf;
+    coordinates_out = coordinates.buf;
+    capacity = Py_MIN(numbers.len / (Py_ssize_t)sizeof(int64_t),
+                      coordinates.len / (Py_ssize_t)(3 * sizeof(double)));
+
+    Py_BEGIN_ALLOW_THREADS
+    while (p < end && regular) {
+        int i;
+        if (count == capacity || read_int(&p, end, 0, &numbers_out[count]) != 0) {
+            regular = 0;
+            break;
+        }
+        for (i = 0; i < 3 && regular; i++) {
+            if (p == end || *p != ',') {
+                regular = 0;
+                break;
+            }
+            p++;
+            regular = read_double(&p, end, &coordinates_out[3 * count + i]) == 0;
+        }
+        if (!regular || (p < end && *p != '\n')) {
+            regular = 0;
+            break;
+        }
+        count++;
+        if (p < end) {
+            p++;
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&data);
+    PyBuffer_Release(&numbers);
+    PyBuffer_Release(&coordinates);
+    if (!regular) {
+        Py_RETURN_NONE;
+    }
+    return PyLong_FromSsize_t(count);
+}
+
+PyDoc_STRVAR(parse_element_block_doc,
+"parse_element_block(data, element_numbers, connectivity)\n"
+"--\n"
+"\n"
+"Parse element data lines of the form 'number, node, node, ...'.\n"
+"\n"
+"Lines ending with a comma are continued on the next line,\n"
+"and empty fields are read as 0.\n"
+"Element numbers are written to element_numbers, a writable int64 buffer,\n"
+"and node numbers, element after element, to connectivity, a writable int64 buffer.\n"
+"\n"
+"Return a tuple of the number of elements and nodes per element,\n"
+"or None if the block isn't regular or the buffers are too small.");
+
+static PyObject *
+parse_element_block(PyObject *module, PyObject *args)
+{
+    Py_buffer data, numbers, connectivity;
+    const char *p, *end;
+    int64_t *numbers_out, *connectivity_out;
+    Py_ssize_t numbers_capacity, connectivity_capacity;
+    Py_ssize_t count = 0, connectivity_length = 0;
+    Py_ssize_t fields_per_element = -1, fields_in_element = 0;
+    int regular = 1;
+
+    if (!PyArg_ParseTuple(args, "y*w*w*:parse_element_block", &data, &numbers, &connectivity)) {
+        return NULL;
+    }
+    p = data.buf;
+    end = p + data.len;
+    numbers_out = numbers.buf;
+    connectivity_out = connectivity.buf;
+    numbers_capacity = numbers.len / (Py_ssize_t)sizeof(int64_t);
+    connectivity_capacity = connectivity.len / (Py_ssize_t)sizeof(int64_t);
+
+    Py_BEGIN_ALLOW_THREADS
+    while (p < end && regular) {
+        int parts = 0;
+        const char *line_start = skip_spaces(p, end);
+        if (line_start == end || *line_start == '\n') {
+            /* Blank line. */
+            regular = 0;
+            break;
+        }
+        for (;;) {
+            int64_t value;
+            const char *next_line;
+            if (++parts > MAX_ELEMENT_DATA_LINE_PARTS || read_int(&p, end, 1, &value) != 0) {
+                regular = 0;
+                break;
+            }
+            if (fields_in_element == 0) {
+                if (count == numbers_capacity) {
+                    regular = 0;
+                    break;
+                }
+                numbers_out[count] = value;
+            }
+            else {
+                if (connectivity_length == connectivity_capacity) {
+                    regular = 0;
+                    break;
+                }
+                connectivity_out[connectivity_length++] = value;
+            }
+            fields_in_element++;
+            if (p == end || *p == '\n') {
+                /* The line ends the element. */
+                if (fields_per_element == -1) {
+                    fields_per_element = fields_in_element;
+                }
+                else if (fields_in_element != fields_per_element) {
+                    regular = 0;
+                }
+                count++;
+                fields_in_element = 0;
+                if (p < end) {
+                    p++;
+                }
+                break;
+            }
+            next_line = skip_spaces(++p, end);
+            if (next_line == end || *next_line == '\n') {
+                /* A trailing comma continues the element on the next line. */
+                p = next_line < end ? next_line + 1 : end;
+                break;
+            }
+        }
+    }
+    if (regular && fields_in_element > 0) {
+        /* The last line was continued. */
+        if (fields_per_element == -1) {
+            fields_per_element = fields_in_element;
+        }
+        else if (fields_in_element != fields_per_element) {
+            regular = 0;
+        }
+        count++;
+    }
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&data);
+    PyBuffer_Release(&numbers);
+    PyBuffer_Release(&connectivity);
+    if (!regular || count == 0) {
+        Py_RETURN_NONE;
+    }
+    return Py_BuildValue("nn", count, fields_per_element - 1);
+}
+
+static PyMethodDef tokenizer_methods[] = {
+    {"parse_node_block", parse_node_block, METH_VARARGS, parse_node_block_doc},
+    {"parse_element_block", parse_element_block, METH_VARARGS, parse_element_block_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef tokenizer_module = {
+    PyModuleDef_HEAD_INIT,
+    "_tokenizer",
+    "Parses blocks of *NODE and *ELEMENT data lines into preallocated buffers.",
+    -1,
+    tokenizer_methods
+};
+
+PyMODINIT_FUNC
+PyInit__tokenizer(void)
+{
+    return PyModule_Create(&tokenizer_module);
+}
@@ -0,0 +1,323 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .element_set import ElementSet
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+# Faces of each element type, as zero-based indices of their corner nodes.
+# Faces of 2D elements are their edges, and faces of 1D elements their end nodes.
+TETRAHEDRON_FACES = ((0, 1, 2), (0, 3, 1), (1, 3, 2), (2, 3, 0))
+HEXAHEDRON_FACES = ((0, 1, 2, 3), (4, 7, 6, 5), (0, 4, 5, 1),
+                    (1, 5, 6, 2), (2, 6, 7, 3), (3, 7, 4, 0))
+WEDGE_FACES = ((0, 1, 2), (3, 5, 4), (0, 3, 4, 1), (1, 4, 5, 2), (2, 5, 3, 0))
+TRIANGLE_EDGES = ((0, 1), (1, 2), (2, 0))
+QUADRILATERAL_EDGES = ((0, 1), (1, 2), (2, 3), (3, 0))
+
+# Edges of each element type, as zero-based indices of their end nodes.
+TETRAHEDRON_EDGES = ((0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3))
+HEXAHEDRON_EDGES = ((0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6),
+                    (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7))
+WEDGE_EDGES = ((0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (0, 3), (1, 4), (2, 5))
+
+TETRAHEDRON = {'face': TETRAHEDRON_FACES, 'edge': TETRAHEDRON_EDGES}
+HEXAHEDRON = {'face': HEXAHEDRON_FACES, 'edge': HEXAHEDRON_EDGES}
+WEDGE = {'face': WEDGE_FACES, 'edge': WEDGE_EDGES}
+TRIANGLE = {'face': TRIANGLE_EDGES, 'edge': TRIANGLE_EDGES}
+QUADRILATERAL = {'face': QUADRILATERAL_EDGES, 'edge': QUADRILATERAL_EDGES}
+# Quadratic line elements have their middle node second.
+LINEAR_LINE = {'face': ((0,), (1,)), 'edge': ((0, 1),)}
+QUADRATIC_LINE = {'face': ((0,), (2,)), 'edge': ((0, 2),)}
+
+TOPOLOGY_BY_ELEMENT_TYPE = {
+    **dict.fromkeys(['C3D4', 'C3D10', 'C3D10T'], TETRAHEDRON),
+    **dict.fromkeys(['C3D8', 'C3D8R', 'C3D8I', 'C3D20', 'C3D20R'], HEXAHEDRON),
+    **dict.fromkeys(['C3D6', 'C3D15'], WEDGE),
+    **dict.fromkeys(['S3', 'S6', 'CPS3', 'CPS6', 'CPE3', 'CPE6',
+                     'CAX3', 'CAX6', 'M3D3', 'M3D6'], TRIANGLE),
+    **dict.fromkeys(['S4', 'S4R', 'S8', 'S8R', 'CPS4', 'CPS4R', 'CPS8', 'CPS8R',
+                     'CPE4', 'CPE4R', 'CPE8', 'CPE8R', 'CAX4', 'CAX4R', 'CAX8', 'CAX8R',
+                     'M3D4', 'M3D4R', 'M3D8', 'M3D8R'], QUADRILATERAL),
+    **dict.fromkeys(['B31', 'B31R', 'T2D2', 'T3D2'], LINEAR_LINE),
+    **dict.fromkeys(['B32', 'B32R', 'T3D3'], QUADRATIC_LINE)
+}
+
+
+class CompressedRows(NamedTuple):
+    """Rows of numbers of varying length, in compressed sparse row (CSR) form.
+
+    The row of numbers[i] is values[offsets[i]:offsets[i + 1]].
+    numbers are sorted, and so are the values of each row.
+    """
+    numbers: 'np.ndarray'  # (N,) int64
+    offsets: 'np.ndarray'  # (N + 1,) int64
+    values: 'np.ndarray'  # (offsets[-1],) int64
+
+    def row(self, number: int) -> 'np.ndarray':
+        """Gets the row of a number.
+
+        :param number: Node or element number.
+        :return: Values of the row, or an empty array if there's no row for the number.
+        """
+        i = np.searchsorted(self.numbers, number)
+        if i == len(self.numbers) or self.numbers[i] != number:
+            return self.values[:0]
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def counts(self) -> 'np.ndarray':
+        """Gets the number of values in each row.
+
+        :return: (N,) int64 array.
+        """
+        return np.diff(self.offsets)
+
+
+class MeshConnectivity:
+    """Connectivity indexes derived from a mesh read by read_mesh.
+
+    Indexes are built on first use with vectorized numpy operations, and kept.
+    Node number 0, which CalculiX uses for missing nodes, is ignored.
+
+    For meshes read with renumber=True, nodes are node indices rather than numbers,
+    as in their connectivity, and index -1 is ignored instead.
+    """
+
+    def __init__(self, mesh: dict):
+        """
+        :param mesh: Mesh from read_mesh, with either backend, and optionally renumbered.
+        :raises ImportError: When numpy isn't installed.
+        """
+        if np is None:
+            raise ImportError(
+                'MeshConnectivity requires numpy. '
+                'Install it with: pip install ccxmeshreader[numpy]')
+        self.missing_node = get_missing_node(mesh)
+        self.element_arrays_by_type = get_element_arrays_by_type(mesh)
+        self.element_set_by_name = mesh['element_set_by_name']
+        self._node_elements = None
+        self._element_neighbors_by_key = {}
+        self._element_set_nodes_by_name = {}
+
+    def node_elements(self) -> CompressedRows:
+        """Gets the elements each node belongs to.
+
+        :return: Element numbers by node number, for every node used by an element.
+        """
+        if self._node_elements is None:
+            element_numbers = []
+            node_numbers = []
+            for numbers, connectivity in self.element_arrays_by_type.values():
+                element_numbers.append(np.repeat(numbers, connectivity.shape[1]))
+                node_numbers.append(connectivity.ravel())
+            self._node_elements = group_pairs(
+                concatenate(node_numbers), concatenate(element_numbers), self.missing_node)
+        return self._node_elements
+
+    def element_neighbors(self,
+                          by: str = 'face',
+                          element_types: Optional[Iterable[str]] = None) -> CompressedRows:
+        """Gets the elements sharing a face or edge with each element.
+
+        Faces and edges are matched by their corner nodes,
+        so elements of different types sharing a face are neighbors.
+        Faces of 2D elements are their edges, and faces of beams and trusses are their end nodes.
+
+        :param by: 'face' (default) or 'edge'.
+        :param element_types: Element types to include.
+                              If None (default), every type with known faces is included.
+        :raises ValueError: When by is unknown, or an element type's faces aren't known.
+        :return: Neighboring element numbers by element number,
+                 for every element of the included types.
+        """
+        if by not in ('face', 'edge'):
+            raise ValueError("by must be 'face' or 'edge', not {!r}.".format(by))
+        if element_types is None:
+            element_types = [element_type for element_type in self.element_arrays_by_type
+                             if element_type in TOPOLOGY_BY_ELEMENT_TYPE]
+        key = (by, tuple(sorted(element_types)))
+        if key not in self._element_neighbors_by_key:
+            self._element_neighbors_by_key[key] = self.build_element_neighbors(by, key[1])
+        return self._element_neighbors_by_key[key]
+
+    def element_set_nodes(self, name: str) -> 'np.ndarray':
+        """Gets the nodes used by the elements of an element set.
+
+        :param name: Name of element set.
+        :raises KeyError: When the element set isn't defined.
+        :return: Sorted node numbers.
+        """
+        if name not in self.element_set_by_name:
+            raise KeyError(name)
+        if name not in self._element_set_nodes_by_name:
+            element_numbers = element_set_to_array(self.element_set_by_name[name])
+            node_numbers = [
+                connectivity[np.isin(numbers, element_numbers)].ravel()
+                for numbers, connectivity in self.element_arrays_by_type.values()
+            ]
+            node_numbers = np.unique(concatenate(node_numbers))
+            self._element_set_nodes_by_name[name] = node_numbers[node_numbers != self.missing_node]
+        return self._element_set_nodes_by_name[name]
+
+    def build_element_neighbors(self, by: str, element_types: Tuple[str, ...]) -> CompressedRows:
+        # Element numbers and sorted corner nodes of each face, by number of corner nodes.
+        faces_by_size = {}
+        all_element_numbers = []
+        for element_type in element_types:
+            if element_type not in TOPOLOGY_BY_ELEMENT_TYPE:
+                raise ValueError('Faces of element type {} aren\'t known.'.format(element_type))
+            if element_type not in self.element_arrays_by_type:
+                continue
+            numbers, connectivity = self.element_arrays_by_type[element_type]
+            all_element_numbers.append(numbers)
+            for face in TOPOLOGY_BY_ELEMENT_TYPE[element_type][by]:
+                corners = np.sort(connectivity[:, face], axis=1)
+                faces_by_size.setdefault(len(face), []).append((numbers, corners))
+        element_numbers = []
+        neighbor_numbers = []
+        for faces in faces_by_size.values():
+            pairs = find_shared_rows(concatenate([numbers for numbers, _ in faces]),
+                                     np.concatenate([corners for _, corners in faces]),
+                                     self.missing_node)
+            element_numbers.append(pairs[0])
+            neighbor_numbers.append(pairs[1])
+        neighbors = group_pairs(concatenate(element_numbers), concatenate(neighbor_numbers))
+        # Include elements without neighbors as empty rows.
+        return add_empty_rows(neighbors, np.unique(concatenate(all_element_numbers)))
+
+
+def get_element_arrays_by_type(mesh: dict) -> Dict[str, Tuple['np.ndarray', 'np.ndarray']]:
+    """Gets element numbers and (M, k) connectivity by type from a mesh of either backend.
+
+    Elements of the 'dict' backend with fewer nodes than others of their type
+    are padded with the missing node from get_missing_node.
+    Types without elements are left out, as in the 'numpy' backend.
+    """
+    if 'element_numbers_by_type' in mesh:
+        return {
+            element_type: (numbers, mesh['element_connectivity_by_type'][element_type])
+            for element_type, numbers in mesh['element_numbers_by_type'].items()
+        }
+    arrays_by_type = {}
+    for element_type, element_dict in mesh['element_dict_by_type'].items():
+        if not element_dict:
+            continue
+        numbers = np.fromiter(element_dict.keys(), dtype=np.int64, count=len(element_dict))
+        node_lists = list(element_dict.values())
+        nodes_per_element = max(map(len, node_lists), default=0)
+        if all(len(node_list) == nodes_per_element for node_list in node_lists):
+            connectivity = np.array(node_lists, dtype=np.int64).reshape(-1, nodes_per_element)
+        else:
+            connectivity = np.full((len(node_lists), nodes_per_element), get_missing_node(mesh),
+                                   dtype=np.int64)
+            for row, node_list in zip(connectivity, node_lists):
+                row[:len(node_list)] = node_list
+        arrays_by_type[element_type] = (numbers, connectivity)
+    return arrays_by_type
+
+
+def get_missing_node(mesh: dict) -> int:
+    """Gets the node in connectivity standing for a missing node,
+    which is node number 0, or index -1 for meshes read with renumber=True."""
+    return -1 if 'node_index_by_number' in mesh else 0
+
+
+def group_pairs(keys: 'np.ndarray', values: 'np.ndarray', missing: int = 0) -> CompressedRows:
+    """Groups values by key, dropping duplicate pairs and pairs with a missing key or value.
+
+    :param keys: (P,) int64 array.
+    :param values: (P,) int64 array.
+    :param missing: Key or value standing for a missing node or element.
+    :return: Values by key.
+    """
+    present = (keys != missing) & (values != missing)
+    keys = keys[present]
+    values = values[present]
+    order = np.lexsort((values, keys))
+    keys = keys[order]
+    values = values[order]
+    if len(keys):
+        unique = np.empty(len(keys), dtype=bool)
+        unique[0] = True
+        unique[1:] = (keys[1:] != keys[:-1]) | (values[1:] != values[:-1])
+        keys = keys[unique]
+        values = values[unique]
+    numbers, counts = np.unique(keys, return_counts=True)
+    offsets = np.zeros(len(numbers) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return CompressedRows(numbers.astype(np.int64), offsets, values)
+
+
+def find_shared_rows(element_numbers: 'np.ndarray',
+                     corners: 'np.ndarray',
+                     missing_node: int = 0) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Finds pairs of different elements with the same row of corner nodes.
+
+    :param element_numbers: (F,) element number of each face.
+    :param corners: (F, c) sorted corner nodes of each face.
+    :param missing_node: Node standing for a missing node.
+    :return: Two-element tuple containing element numbers and neighbor numbers, in both orders.
+    """
+    # Faces missing a corner node aren't matched.
+    complete = np.all(corners != missing_node, axis=1)
+    element_numbers = element_numbers[complete]
+    corners = corners[complete]
+    order = np.lexsort(corners.T[::-1])
+    corners = corners[order]
+    element_numbers = element_numbers[order]
+    if len(corners) == 0:
+        return element_numbers, element_numbers
+    # Start index and size of the group of equal faces each face belongs to.
+    is_start = np.empty(len(corners), dtype=bool)
+    is_start[0] = True
+    is_start[1:] = np.any(corners[1:] != corners[:-1], axis=1)
+    starts = np.flatnonzero(is_start)
+    sizes = np.diff(np.append(starts, len(corners)))
+    shared = sizes > 1
+    starts = starts[shared]
+    sizes = sizes[shared]
+    # Pair every face of a group with every face of the same group.
+    member_starts = np.repeat(starts, sizes)
+    member_sizes = np.repeat(sizes, sizes)
+    members = member_starts + (np.arange(len(member_starts)) -
+                               np.repeat(np.cumsum(sizes) - sizes, sizes))
+    faces = np.repeat(members, member_sizes)
+    pair_offsets = np.repeat(np.cumsum(member_sizes) - member_sizes, member_sizes)
+    partners = np.repeat(member_starts, member_sizes) + (np.arange(len(faces)) - pair_offsets)
+    element_numbers_a = element_numbers[faces]
+    element_numbers_b = element_numbers[partners]
+    different = element_numbers_a != element_numbers_b
+    return element_numbers_a[different], element_numbers_b[different]
+
+
+def add_empty_rows(rows: CompressedRows, numbers: 'np.ndarray') -> CompressedRows:
+    """Adds empty rows for numbers without a row.
+
+    :param rows: Rows, whose numbers are a subset of numbers.
+    :param numbers: Sorted unique numbers.
+    :return: Rows for every number.
+    """
+    counts = np.zeros(len(numbers), dtype=np.int64)
+    counts[np.searchsorted(numbers, rows.numbers)] = rows.counts()
+    offsets = np.zeros(len(numbers) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return CompressedRows(numbers, offsets, rows.values)
+
+
+def element_set_to_array(element_set: Union[set, ElementSet, 'np.ndarray']) -> 'np.ndarray':
+    if isinstance(element_set, np.ndarray):
+        return element_set
+    if isinstance(element_set, ElementSet):
+        return concatenate([np.arange(run.start, run.stop, dtype=np.int64)
+                            for run in element_set.ranges()])
+    return np.fromiter(element_set, dtype=np.int64, count=len(element_set))
+
+
+def concatenate(arrays: List['np.ndarray']) -> 'np.ndarray':
+    if not arrays:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(arrays)
+
+
+__all__ = ['CompressedRows', 'MeshConnectivity']
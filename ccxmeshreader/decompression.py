@@ -0,0 +1,100 @@
+import bz2
+import gzip
+import io
+import lzma
+from typing import BinaryIO, Callable, Optional
+
+try:
+    from compression import zstd  # >=3.14
+
+    def open_zstd(f: BinaryIO) -> BinaryIO:
+        return zstd.ZstdFile(f)
+except ImportError:  # <=3.13
+    try:
+        import zstandard
+    except ImportError:  # zstandard is an optional dependency
+        zstandard = None
+
+    def open_zstd(f: BinaryIO) -> BinaryIO:
+        if zstandard is None:
+            raise ImportError(
+                'Reading zstd-compressed files requires zstandard. '
+                'Install it with: pip install ccxmeshreader[zstd]')
+        return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+
+
+# Number of bytes to decompress at a time.
+DECOMPRESS_CHUNK_BYTES = 1 << 20
+
+# Number of bytes needed to recognize a compressed file.
+HEADER_BYTES = 6
+
+
+def open_gzip(f: BinaryIO) -> BinaryIO:
+    return gzip.GzipFile(fileobj=f, mode='rb')
+
+
+def get_decompressing_opener(header: bytes) -> Optional[Callable[[BinaryIO], BinaryIO]]:
+    """Gets a function which opens a compressed file for reading, given the start of the file.
+
+    gzip, bzip2, xz, and zstd files are recognized by their magic numbers,
+    regardless of file extension.
+
+    :param header: First HEADER_BYTES bytes of the file.
+    :return: Function taking a binary file and returning a file of its decompressed contents,
+             or None if the file isn't compressed.
+    """
+    if header.startswith(b'\x1f\x8b'):
+        return open_gzip
+    if header.startswith(b'BZh') and header[3:4].isdigit() and header[3:4] != b'0':
+        return bz2.BZ2File
+    if header.startswith(b'\xfd7zXZ\x00'):
+        return lzma.LZMAFile
+    if header.startswith(b'\x28\xb5\x2f\xfd'):
+        return open_zstd
+    return None
+
+
+def is_compressed_file(path: str) -> bool:
+    """Checks if a file is compressed.
+
+    :param path: Path to file.
+    :return: True if the file is gzip, bzip2, xz, or zstd-compressed, False otherwise.
+    """
+    with open(path, 'rb') as f:
+        return get_decompressing_opener(f.read(HEADER_BYTES)) is not None
+
+
+def decompress(f: BinaryIO, open_decompressing: Callable[[BinaryIO], BinaryIO]) -> bytearray:
+    """Decompresses a file into memory, a chunk at a time.
+
+    Used where the whole file is needed at once, as by MeshIndex.
+    read_mesh streams compressed files instead, so it holds only a chunk or data block at a time.
+
+    :param f: Binary file positioned at the start of the compressed data.
+    :param open_decompressing: Function from get_decompressing_opener.
+    :return: Decompressed contents.
+    """
+    buffer = bytearray()
+    with open_decompressing(f) as decompressing_file:
+        while True:
+            chunk = decompressing_file.read(DECOMPRESS_CHUNK_BYTES)
+            if not chunk:
+                break
+            buffer += chunk
+    return buffer
+
+
+def decompress_buffer(buffer):
+    """Decompresses an in-memory buffer if it's compressed.
+
+    :param buffer: bytes, bytearray, or mmap.
+    :return: Decompressed contents, as for decompress, or buffer if it isn't compressed.
+    """
+    open_decompressing = get_decompressing_opener(bytes(buffer[:HEADER_BYTES]))
+    if open_decompressing is None:
+        return buffer
+    return decompress(io.BytesIO(buffer), open_decompressing)
+
+
+__all__ = ['decompress', 'get_decompressing_opener', 'is_compressed_file']
@@ -0,0 +1,170 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableSet
+from typing import Iterable, Iterator, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+# Number of added element numbers to buffer before merging them into runs.
+MAX_PENDING = 1 << 20
+
+
+class ElementSet(MutableSet):
+    """A set of element numbers stored as sorted runs of consecutive numbers.
+
+    Each run is stored as a start and stop in typed arrays,
+    so a range of elements such as those from GENERATE
+    takes the same 16 bytes as a single element.
+
+    Added numbers are buffered, and merged into runs
+    when the set is next read, or when the buffer fills.
+    """
+
+    def __init__(self, numbers: Iterable[int] = ()):
+        self.starts = array('q')
+        self.stops = array('q')
+        self.pending = array('q')
+        self.update(numbers)
+
+    @classmethod
+    def _from_iterable(cls, numbers: Iterable[int]) -> 'ElementSet':
+        return cls(numbers)
+
+    def __contains__(self, number: object) -> bool:
+        self.compact()
+        i = bisect_right(self.starts, number) - 1
+        return i >= 0 and number < self.stops[i]
+
+    def __iter__(self) -> Iterator[int]:
+        self.compact()
+        for start, stop in zip(self.starts, self.stops):
+            yield from range(start, stop)
+
+    def __len__(self) -> int:
+        self.compact()
+        return sum(self.stops) - sum(self.starts)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ElementSet):
+            self.compact()
+            other.compact()
+            return self.starts == other.starts and self.stops == other.stops
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return 'ElementSet({})'.format(self.ranges())
+
+    def add(self, number: int) -> None:
+        self.pending.append(number)
+        if len(self.pending) >= MAX_PENDING:
+            self.compact()
+
+    def discard(self, number: int) -> None:
+        self.compact()
+        i = bisect_right(self.starts, number) - 1
+        if i < 0 or number >= self.stops[i]:
+            return
+        start, stop = self.starts[i], self.stops[i]
+        del self.starts[i]
+        del self.stops[i]
+        for run_start, run_stop in ((number + 1, stop), (start, number)):
+            if run_start < run_stop:
+                self.starts.insert(i, run_start)
+                self.stops.insert(i, run_stop)
+
+    def update(self, *others: Iterable[int]) -> None:
+        """Adds element numbers from each iterable.
+
+        Ranges with a step of 1 and other element sets are merged as runs,
+        without adding their numbers one at a time.
+        """
+        for numbers in others:
+            if isinstance(numbers, ElementSet):
+                numbers.compact()
+                self.merge_runs(numbers.starts, numbers.stops)
+            elif isinstance(numbers, range) and numbers.step == 1:
+                if numbers:
+                    self.merge_runs([numbers.start], [numbers.stop])
+            elif np is not None and isinstance(numbers, np.ndarray):
+                self.pending.frombytes(numbers.astype(np.int64).tobytes())
+            else:
+                self.pending.extend(numbers)
+        if len(self.pending) >= MAX_PENDING:
+            self.compact()
+
+    def union(self, *others: Iterable[int]) -> 'ElementSet':
+        element_set = self.copy()
+        element_set.update(*others)
+        return element_set
+
+    def copy(self) -> 'ElementSet':
+        element_set = ElementSet()
+        element_set.update(self)
+        return element_set
+
+    def ranges(self) -> List[range]:
+        """Gets the runs of consecutive element numbers.
+
+        :return: Ranges in ascending order.
+        """
+        self.compact()
+        return [range(start, stop) for start, stop in zip(self.starts, self.stops)]
+
+    def compact(self) -> None:
+        """Merges buffered element numbers into runs."""
+        if not self.pending:
+            return
+        starts, stops = runs_from_numbers(self.pending)
+        self.pending = array('q')
+        self.merge_runs(starts, stops)
+
+    def merge_runs(self, starts: Iterable[int], stops: Iterable[int]) -> None:
+        """Merges runs into this set, joining runs that overlap or touch.
+
+        :param starts: Start of each run.
+        :param stops: Stop of each run, exclusive.
+        """
+        runs = sorted(zip(self.starts, self.stops))
+        runs.extend(zip(starts, stops))
+        runs.sort()
+        merged_starts = array('q')
+        merged_stops = array('q')
+        for start, stop in runs:
+            if merged_stops and start <= merged_stops[-1]:
+                if stop > merged_stops[-1]:
+                    merged_stops[-1] = stop
+            else:
+                merged_starts.append(start)
+                merged_stops.append(stop)
+        self.starts = merged_starts
+        self.stops = merged_stops
+
+
+def runs_from_numbers(numbers: array) -> Tuple[Iterable[int], Iterable[int]]:
+    """Finds runs of consecutive numbers.
+
+    :param numbers: Numbers in any order, possibly repeated.
+    :return: Two-element tuple containing start of each run,
+             and stop of each run, exclusive.
+    """
+    if np is not None:
+        unique_numbers = np.unique(np.frombuffer(numbers, dtype=np.int64))
+        breaks = np.flatnonzero(np.diff(unique_numbers) != 1) + 1
+        starts = unique_numbers[np.concatenate(([0], breaks))]
+        stops = unique_numbers[np.concatenate((breaks - 1, [len(unique_numbers) - 1]))] + 1
+        return starts.tolist(), stops.tolist()
+    starts = []
+    stops = []
+    for number in sorted(set(numbers)):
+        if stops and number == stops[-1]:
+            stops[-1] = number + 1
+        else:
+            starts.append(number)
+            stops.append(number + 1)
+    return starts, stops
+
+
+__all__ = ['ElementSet']
@@ -0,0 +1,108 @@
+from typing import Any, Dict, Iterable, Optional, Union
+
+
+class ReaderState:
+    """State of a CalculiX input file being read, shared with keyword handlers.
+
+    :ivar handler: Handler of the data lines being read, or None between sections.
+    :ivar parameters: Parameters of the last keyword line.
+    :ivar material_name: Name of the last *MATERIAL, or None before the first.
+    :ivar generate: Whether the next *ELSET data block is a GENERATE range.
+    :ivar path: Path of the file being read, or None if it isn't read from a path.
+    :ivar include_path: INPUT of a file to read before the next line, set by *INCLUDE,
+                        and resolved by the include resolver.
+    """
+    __slots__ = ('path', 'handler', 'parameters', 'material_name', 'generate', 'include_path')
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.handler = None
+        self.parameters = {}
+        self.material_name = None
+        self.generate = False
+        self.include_path = None
+
+
+class KeywordHandler:
+    """Handles a keyword line, and the data lines after it.
+
+    The base class skips the data lines,
+    and handles keywords without a registered handler.
+
+    Subclasses may override keyword_line and data_line to return records,
+    which are yielded by iter_mesh, and ignored by read_mesh.
+
+    Data lines of handlers with a data_type ('node', 'element', or 'element_set')
+    are read in blocks and parsed by iter_mesh instead of passed to data_line.
+    """
+    data_type = ''
+
+    def keyword_line(self,
+                     state: ReaderState,
+                     parameters: Dict[str, Union[str, bool]],
+                     line_num: int,
+                     stripped_line: str) -> Iterable[Any]:
+        """Handles a keyword line.
+
+        By default, the data lines after it are passed to this handler,
+        and its parameters are kept in state.parameters.
+
+        :param state: State of the file being read.
+        :param parameters: Parameters of the keyword line. Keys are upper-cased.
+        :param line_num: Line number.
+        :param stripped_line: Keyword line stripped of surrounding white-space.
+        :return: Records to yield.
+        """
+        state.handler = self
+        state.parameters = parameters
+        return ()
+
+    def data_line(self, state: ReaderState, stripped_line: str, line_num: int) -> Iterable[Any]:
+        """Handles a data line after the keyword line.
+
+        :param state: State of the file being read.
+        :param stripped_line: Data line stripped of surrounding white-space.
+        :param line_num: Line number.
+        :return: Records to yield.
+        """
+        return ()
+
+
+# Handlers by keyword, normalized by normalize_keyword.
+keyword_handlers: Dict[str, KeywordHandler] = {}
+
+unknown_keyword_handler = KeywordHandler()
+
+
+def register_keyword_handler(keyword: str, handler: Optional[KeywordHandler]) -> None:
+    """Registers a handler for a keyword, replacing any handler already registered.
+
+    :param keyword: Keyword, such as '*NSET'. Case and white-space are ignored.
+    :param handler: Handler, or None to remove the registered handler.
+    """
+    keyword = normalize_keyword(keyword)
+    if handler is None:
+        keyword_handlers.pop(keyword, None)
+    else:
+        keyword_handlers[keyword] = handler
+
+
+def get_keyword_handler(keyword: str) -> KeywordHandler:
+    """Gets the handler for a keyword.
+
+    :param keyword: Keyword, such as '*Element'.
+    :return: Registered handler, or a handler which skips data lines.
+    """
+    return keyword_handlers.get(normalize_keyword(keyword), unknown_keyword_handler)
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Upper-cases a keyword, and removes white-space within it.
+
+    :param keyword: Keyword, such as '*Specific Heat'.
+    :return: Normalized keyword, such as '*SPECIFICHEAT'.
+    """
+    return ''.join(keyword.upper().split())
+
+
+__all__ = ['KeywordHandler', 'ReaderState', 'register_keyword_handler']
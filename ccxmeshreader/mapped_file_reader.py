@@ -0,0 +1,201 @@
+import mmap
+import os
+import re
+from typing import BinaryIO, Callable, Optional, TextIO, Union
+
+from .decompression import (HEADER_BYTES, decompress, decompress_buffer,
+                            get_decompressing_opener)
+
+ENCODING = 'utf-8'
+
+# A path to a CalculiX input file, its contents, or a binary or text file-like object to read it from.
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO, TextIO]
+
+# Resolves the INPUT of an *INCLUDE, given the path of the file being read,
+# or None if it isn't read from a path, to a source to read.
+IncludeResolver = Callable[[str, Optional[str]], Source]
+
+# Maximum number of bytes in a data block before splitting it into batches.
+DATA_BLOCK_BYTES = 1 << 22
+
+# Matches the end of a line followed by a blank line or an indented keyword,
+# either of which ends a data block.
+DATA_BLOCK_END_PATTERN = re.compile(rb'\n[ \t\r]*(?=[\n*])')
+
+
+class MappedFileReader:
+    """Reads lines and data blocks from a memory-mapped file, or a buffer in memory.
+
+    Keyword lines are found by searching the mapped bytes for b'\\n*',
+    so data blocks are sliced out as bytes
+    without creating a Python str for every line.
+
+    gzip, bzip2, xz, and zstd-compressed sources are decompressed into memory,
+    for random access by MeshIndex.
+    read_mesh streams them with StreamingFileReader instead.
+
+    :ivar path: Path of the file, or None if the source isn't a path.
+    :ivar name: Path of the file, or a name for the source.
+    """
+
+    def __init__(self, source: Source, name: Optional[str] = None):
+        if isinstance(source, (str, os.PathLike)):
+            self.path = self.name = os.fspath(source)
+            with open(self.path, 'rb') as f:
+                open_decompressing = get_decompressing_opener(f.read(HEADER_BYTES))
+                f.seek(0)
+                if open_decompressing is not None:
+                    self.buffer = decompress(f, open_decompressing)
+                else:
+                    try:
+                        self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except ValueError:  # empty files can't be mapped
+                        self.buffer = b''
+        else:
+            self.path = None
+            self.name = get_source_name(source, name)
+            buffer = read_buffer(source)
+            self.buffer = decompress_buffer(buffer)
+        # Buffers of in-memory sources belong to the caller, unless they were decompressed.
+        self.owns_buffer = self.path is not None or self.buffer is not buffer
+        self.position = 0
+        self.line_start = 0
+
+    @property
+    def size(self) -> int:
+        """Size of the file, decompressed if compressed."""
+        return len(self.buffer)
+
+    def readline(self) -> str:
+        """Reads the next line.
+
+        :return: Line including the trailing newline, or '' at end of file.
+        """
+        start = self.position
+        end = self.buffer.find(b'\n', start)
+        end = len(self.buffer) if end == -1 else end + 1
+        self.line_start = start
+        self.position = end
+        return self.buffer[start:end].decode(ENCODING)
+
+    def read_data_block(self) -> bytes:
+        """Reads a data block starting with the last line read.
+
+        The block ends before the next keyword, comment, or blank line,
+        or after DATA_BLOCK_BYTES at the end of a line that isn't continued.
+
+        :return: Data block including the trailing newline, if any.
+        """
+        start = self.line_start
+        end = self._find_data_block_end(start)
+        if end - start > DATA_BLOCK_BYTES:
+            end = self._find_batch_end(start + DATA_BLOCK_BYTES, end)
+        self.position = end
+        return self.buffer[start:end]
+
+    def skip_data_block(self) -> int:
+        """Skips a data block starting with the last line read, without copying it.
+
+        :return: Number of lines skipped.
+        """
+        start = self.line_start
+        end = self.position = self._find_data_block_end(start)
+        num_lines = self.count_lines(end, start)
+        if self.buffer[end - 1:end] != b'\n':
+            num_lines += 1
+        return num_lines
+
+    def rewind(self) -> None:
+        """Moves back to the start of the file, to read it again."""
+        self.position = 0
+        self.line_start = 0
+
+    def count_lines(self, end: int, start: int = 0) -> int:
+        """Counts newlines between offsets.
+
+        :param end: Offset to count newlines before.
+        :param start: Offset to count newlines from.
+        :return: Number of newlines.
+        """
+        count = 0
+        for chunk_start in range(start, end, DATA_BLOCK_BYTES):
+            count += self.buffer[chunk_start:min(chunk_start + DATA_BLOCK_BYTES, end)].count(b'\n')
+        return count
+
+    def close(self) -> None:
+        if self.owns_buffer and isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _find_data_block_end(self, start: int) -> int:
+        """Finds the end of a data block, before the next keyword, comment, or blank line.
+
+        :param start: Start of the data block.
+        :return: Position after the newline ending the last data line, or the end of the file.
+        """
+        end = self.buffer.find(b'\n*', start)
+        end = len(self.buffer) if end == -1 else end + 1
+        match = DATA_BLOCK_END_PATTERN.search(self.buffer, start, end)
+        if match:
+            end = match.start() + 1
+        return end
+
+    def _find_batch_end(self, position: int, end: int) -> int:
+        """Finds the end of the first line after position that isn't continued.
+
+        :param position: Position to start searching from.
+        :param end: End of the data block.
+        :return: Position after the newline ending the line, or end.
+        """
+        while position < end:
+            newline = self.buffer.find(b'\n', position, end)
+            if newline == -1:
+                return end
+            line_start = self.buffer.rfind(b'\n', 0, newline) + 1
+            if not self.buffer[line_start:newline].rstrip().endswith(b','):
+                return newline + 1
+            position = newline + 1
+        return end
+
+
+def get_source_name(source: Source, name: Optional[str] = None) -> str:
+    """Names a source that isn't a path, for messages and stats.
+
+    :param source: Contents of a CalculiX input file, or a file-like object to read it from.
+    :param name: Name given by the caller, if any.
+    :return: name, the name of a file object, or the type of the source in angle brackets.
+    """
+    return name or getattr(source, 'name', None) or '<{}>'.format(type(source).__name__)
+
+
+def read_buffer(source: Union[bytes, bytearray, memoryview, BinaryIO, TextIO]):
+    """Gets a searchable buffer of the contents of an in-memory source.
+
+    bytes and bytearray are used as is, as is the object a memoryview of all of one refers to.
+    Other memoryviews are copied, and file-like objects read from their current position.
+
+    :param source: Contents of a CalculiX input file, or a file-like object to read it from.
+    :raises TypeError: When source isn't bytes-like or file-like.
+    :return: bytes, bytearray, or mmap.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return source
+    if isinstance(source, memoryview):
+        if (isinstance(source.obj, (bytes, bytearray, mmap.mmap)) and
+                source.contiguous and source.nbytes == len(source.obj)):
+            return source.obj
+        return source.tobytes()
+    if not hasattr(source, 'read'):
+        raise TypeError(
+            'Expected a path, bytes, memoryview, or file-like object, not {}.'.format(
+                type(source).__name__))
+    data = source.read()
+    return data.encode(ENCODING) if isinstance(data, str) else data
+
+
+__all__ = ['IncludeResolver', 'MappedFileReader', 'Source']
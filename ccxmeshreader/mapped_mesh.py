@@ -0,0 +1,273 @@
+import json
+import os
+from array import array
+from typing import BinaryIO, Dict, List, Tuple, Union
+
+from .element_set import ElementSet
+from .parser_error import ParserError
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+# Bump when the layout of mapped mesh directories changes.
+MAPPED_MESH_FORMAT_VERSION = 1
+
+# Number of bytes buffered per array before writing them to its file.
+CHUNK_BYTES = 1 << 24
+
+# Size of .npy headers, which are written before the shape of an array is known,
+# and rewritten once it is.
+NPY_HEADER_BYTES = 128
+
+METADATA_FILENAME = 'mesh.json'
+
+
+class NpyWriter:
+    """Appends values to a .npy file in chunks."""
+
+    def __init__(self, path: str, typecode: str, columns: int = 1):
+        """
+        :param path: Path to .npy file, which is replaced.
+        :param typecode: 'q' for int64, or 'd' for float64 values.
+        :param columns: Number of columns of the array, or 1 for a one-dimensional array.
+        """
+        self.path = path
+        self.typecode = typecode
+        self.columns = columns
+        self.buffer = array(typecode)
+        self.size = 0
+        self.file = open(path, 'wb')
+        self.file.write(b'\0' * NPY_HEADER_BYTES)
+
+    def append(self, value: Union[int, float]) -> None:
+        self.buffer.append(value)
+        if self.buffer.itemsize * len(self.buffer) >= CHUNK_BYTES:
+            self.flush()
+
+    def extend(self, values) -> None:
+        self.buffer.extend(values)
+        if self.buffer.itemsize * len(self.buffer) >= CHUNK_BYTES:
+            self.flush()
+
+    def write_array(self, values: 'np.ndarray') -> None:
+        """Writes values from an array without buffering them.
+
+        :param values: Array of the same dtype as the file.
+        """
+        self.flush()
+        self.file.write(values.tobytes())
+        self.size += values.size
+
+    def flush(self) -> None:
+        self.buffer.tofile(self.file)
+        self.size += len(self.buffer)
+        self.buffer = array(self.typecode)
+
+    def close(self) -> None:
+        """Writes buffered values, and the header with the shape of the array."""
+        self.flush()
+        shape = (self.size,) if self.columns == 1 else (self.size // self.columns, self.columns)
+        self.file.seek(0)
+        write_npy_header(self.file, np.dtype(self.typecode), shape)
+        self.file.close()
+
+    def discard(self) -> None:
+        """Closes the file without finishing it, and removes it."""
+        self.file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class MappedMeshBuilder:
+    """Writes nodes, elements, and element sets to .npy files in a directory, in chunks.
+
+    Arrays are returned as read-only memory maps of the files,
+    so meshes larger than memory can be read.
+
+    The metadata of a mesh already in the directory is removed first,
+    so it isn't loaded if reading fails before the new mesh is built.
+    """
+
+    def __init__(self, directory: str):
+        if np is None:
+            raise ImportError(
+                "backend='memmap' requires numpy. "
+                'Install it with: pip install ccxmeshreader[numpy]')
+        os.makedirs(directory, exist_ok=True)
+        metadata_path = os.path.join(directory, METADATA_FILENAME)
+        if os.path.exists(metadata_path):
+            os.remove(metadata_path)
+        self.directory = directory
+        self.node_numbers = NpyWriter(self.get_path('node_numbers'), 'q')
+        self.node_coordinates = NpyWriter(self.get_path('node_coordinates'), 'd', 3)
+        # Element numbers and connectivity writers by type.
+        self.element_writers_by_type: Dict[str, Tuple[NpyWriter, NpyWriter]] = {}
+        self.nodes_per_element_by_type = {}
+
+    def add_node(self, node_number: int, coordinates: Tuple[float, float, float]) -> None:
+        self.node_numbers.append(node_number)
+        self.node_coordinates.extend(coordinates)
+
+    def add_element(self, element_type: str, element_number: int, node_numbers: List[int]) -> None:
+        element_numbers, connectivity = self.get_element_writers(element_type, len(node_numbers))
+        element_numbers.append(element_number)
+        connectivity.extend(node_numbers)
+
+    def add_node_block(self, node_numbers, node_coordinates) -> None:
+        self.node_numbers.write_array(node_numbers)
+        self.node_coordinates.write_array(node_coordinates)
+
+    def add_element_block(self, element_type: str, element_numbers, connectivity) -> None:
+        element_numbers_writer, connectivity_writer = self.get_element_writers(
+            element_type, connectivity.shape[1])
+        element_numbers_writer.write_array(element_numbers)
+        connectivity_writer.write_array(connectivity)
+
+    def get_element_writers(self,
+                            element_type: str,
+                            nodes_per_element: int) -> Tuple[NpyWriter, NpyWriter]:
+        """Gets the writers of element numbers and connectivity of a type.
+
+        :param element_type: Element type.
+        :param nodes_per_element: Number of nodes of the element being added.
+        :raises ParserError: When element node counts differ within a type.
+        :return: Two-element tuple containing element number and connectivity writers.
+        """
+        writers = self.element_writers_by_type.get(element_type)
+        if writers is None:
+            i = len(self.element_writers_by_type)
+            writers = self.element_writers_by_type[element_type] = (
+                NpyWriter(self.get_path('element_numbers_{}'.format(i)), 'q'),
+                NpyWriter(self.get_path('element_connectivity_{}'.format(i)), 'q',
+                          nodes_per_element))
+            self.nodes_per_element_by_type[element_type] = nodes_per_element
+        elif self.nodes_per_element_by_type[element_type] != nodes_per_element:
+            raise ParserError(
+                'Elements of type {} must all have {} nodes.'.format(
+                    element_type, self.nodes_per_element_by_type[element_type]))
+        return writers
+
+    def build(self,
+              element_set_by_name: Dict[str, ElementSet],
+              materials: List[dict]) -> dict:
+        """Finishes writing the mesh, and opens it.
+
+        :param element_set_by_name: Element sets by name.
+        :param materials: Materials.
+        :return: Mesh with arrays mapped from their files.
+        """
+        for writer in self.get_writers():
+            writer.close()
+        element_set_names = list(element_set_by_name)
+        for i, element_set_name in enumerate(element_set_names):
+            write_element_set(self.get_path('element_set_{}'.format(i)),
+                              element_set_by_name[element_set_name])
+        metadata = {
+            'version': MAPPED_MESH_FORMAT_VERSION,
+            'element_types': list(self.element_writers_by_type),
+            'element_set_names': element_set_names,
+            'materials': materials
+        }
+        # The metadata is written last, so directories of meshes still being written aren't loaded.
+        temp_path = os.path.join(self.directory, METADATA_FILENAME + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(metadata, f)
+        os.replace(temp_path, os.path.join(self.directory, METADATA_FILENAME))
+        return load_mapped_mesh(self.directory)
+
+    def discard(self) -> None:
+        """Closes and removes the files written so far, when reading fails."""
+        for writer in self.get_writers():
+            writer.discard()
+
+    def get_writers(self) -> List[NpyWriter]:
+        writers = [self.node_numbers, self.node_coordinates]
+        for element_writers in self.element_writers_by_type.values():
+            writers.extend(element_writers)
+        return writers
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory, name + '.npy')
+
+
+def load_mapped_mesh(directory: str) -> dict:
+    """Opens a mesh written by read_mesh with backend='memmap', without parsing it again.
+
+    :param directory: Directory the mesh was written to.
+    :raises ImportError: When numpy isn't installed.
+    :raises FileNotFoundError: When no mesh was written to directory,
+                               or it wasn't finished being written.
+    :raises ValueError: When the mesh was written by an incompatible version.
+    :return: Mesh in the same form as the 'numpy' backend of read_mesh,
+             with element sets as sorted arrays of element numbers,
+             and arrays as read-only memory maps.
+    """
+    if np is None:
+        raise ImportError(
+            'load_mapped_mesh requires numpy. '
+            'Install it with: pip install ccxmeshreader[numpy]')
+    with open(os.path.join(directory, METADATA_FILENAME)) as f:
+        metadata = json.load(f)
+    if metadata.get('version') != MAPPED_MESH_FORMAT_VERSION:
+        raise ValueError(
+            'Mesh in {} has format version {}, expected {}.'.format(
+                directory, metadata.get('version'), MAPPED_MESH_FORMAT_VERSION))
+
+    def load(name: str) -> 'np.ndarray':
+        return np.load(os.path.join(directory, name + '.npy'), mmap_mode='r')
+
+    element_types = metadata['element_types']
+    return {
+        'node_numbers': load('node_numbers'),
+        'node_coordinates': load('node_coordinates'),
+        'element_numbers_by_type': {
+            element_type: load('element_numbers_{}'.format(i))
+            for i, element_type in enumerate(element_types)
+        },
+        'element_connectivity_by_type': {
+            element_type: load('element_connectivity_{}'.format(i))
+            for i, element_type in enumerate(element_types)
+        },
+        'element_set_by_name': {
+            element_set_name: load('element_set_{}'.format(i))
+            for i, element_set_name in enumerate(metadata['element_set_names'])
+        },
+        'materials': metadata['materials']
+    }
+
+
+def write_element_set(path: str, element_set: ElementSet) -> None:
+    """Writes the element numbers of an element set to a .npy file, sorted, in chunks.
+
+    :param path: Path to .npy file.
+    :param element_set: Element set.
+    """
+    writer = NpyWriter(path, 'q')
+    chunk_size = CHUNK_BYTES // writer.buffer.itemsize
+    for run in element_set.ranges():
+        for start in range(run.start, run.stop, chunk_size):
+            writer.write_array(np.arange(start, min(start + chunk_size, run.stop), dtype=np.int64))
+    writer.close()
+
+
+def write_npy_header(f: BinaryIO, dtype: 'np.dtype', shape: Tuple[int, ...]) -> None:
+    """Writes a version 1.0 .npy header of NPY_HEADER_BYTES bytes.
+
+    :param f: File positioned at its start.
+    :param dtype: Data type of the array.
+    :param shape: Shape of the array.
+    """
+    header = repr({'descr': np.lib.format.dtype_to_descr(dtype),
+                   'fortran_order': False,
+                   'shape': shape}).encode('latin1')
+    # Magic string, version, and header length, then the header padded with spaces, ending in a newline.
+    prefix = np.lib.format.MAGIC_PREFIX + bytes([1, 0])
+    header_bytes = NPY_HEADER_BYTES - len(prefix) - 2
+    f.write(prefix)
+    f.write(header_bytes.to_bytes(2, 'little'))
+    f.write(header.ljust(header_bytes - 1) + b'\n')
+
+
+__all__ = ['load_mapped_mesh']
@@ -0,0 +1,170 @@
+from array import array
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from .mapped_mesh import MappedMeshBuilder
+from .parser_error import ParserError
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+
+class DictMeshBuilder:
+    """Collects nodes and elements into dictionaries.
+
+    This is the default representation returned by read_mesh.
+    """
+
+    def __init__(self):
+        self.node_coordinates_by_number = {}
+        self.element_dict_by_type = defaultdict(dict)
+
+    def add_node(self,
+                 node_number: int,
+                 coordinates: Tuple[float, float, float]) -> None:
+        self.node_coordinates_by_number[node_number] = coordinates
+
+    def add_element(self,
+                    element_type: str,
+                    element_number: int,
+                    node_numbers: List[int]) -> None:
+        self.element_dict_by_type[element_type][element_number] = node_numbers
+
+    def add_node_block(self, node_numbers, node_coordinates) -> None:
+        self.node_coordinates_by_number.update(zip(
+            node_numbers.tolist(), map(tuple, node_coordinates.tolist())))
+
+    def add_element_block(self,
+                          element_type: str,
+                          element_numbers,
+                          connectivity) -> None:
+        self.element_dict_by_type[element_type].update(zip(
+            element_numbers.tolist(), connectivity.tolist()))
+
+    def build(self) -> dict:
+        return {
+            'node_coordinates_by_number': self.node_coordinates_by_number,
+            'element_dict_by_type': self.element_dict_by_type
+        }
+
+
+class ArrayMeshBuilder:
+    """Collects nodes and elements into flat typed arrays.
+
+    Values are appended to array.array buffers while parsing,
+    so no intermediate tuple or list is kept per node or element.
+    The buffers are exposed as numpy arrays without copying on build.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError(
+                "backend='numpy' requires numpy. "
+                'Install it with: pip install ccxmeshreader[numpy]')
+        self.node_numbers = array('q')
+        self.node_coordinates = array('d')
+        self.element_numbers_by_type = defaultdict(lambda: array('q'))
+        self.element_connectivity_by_type = defaultdict(lambda: array('q'))
+        self.nodes_per_element_by_type = {}
+
+    def add_node(self,
+                 node_number: int,
+                 coordinates: Tuple[float, float, float]) -> None:
+        self.node_numbers.append(node_number)
+        self.node_coordinates.extend(coordinates)
+
+    def add_element(self,
+                    element_type: str,
+                    element_number: int,
+                    node_numbers: List[int]) -> None:
+        self._check_previous_element(element_type)
+        self.element_numbers_by_type[element_type].append(element_number)
+        self.element_connectivity_by_type[element_type].extend(node_numbers)
+
+    def add_node_block(self, node_numbers, node_coordinates) -> None:
+        self.node_numbers.frombytes(node_numbers.tobytes())
+        self.node_coordinates.frombytes(node_coordinates.tobytes())
+
+    def add_element_block(self,
+                          element_type: str,
+                          element_numbers,
+                          connectivity) -> None:
+        self._check_previous_element(element_type)
+        self.element_numbers_by_type[element_type].frombytes(
+            element_numbers.tobytes())
+        self.element_connectivity_by_type[element_type].frombytes(
+            connectivity.tobytes())
+        self.nodes_per_element_by_type.setdefault(
+            element_type, connectivity.shape[1])
+        self._check_previous_element(element_type)
+
+    def build(self) -> dict:
+        for element_type in self.element_numbers_by_type:
+            self._check_previous_element(element_type)
+        return {
+            'node_numbers': np.frombuffer(self.node_numbers, dtype=np.int64),
+            'node_coordinates': np.frombuffer(
+                self.node_coordinates, dtype=np.float64).reshape(-1, 3),
+            'element_numbers_by_type': {
+                element_type: np.frombuffer(numbers, dtype=np.int64)
+                for element_type, numbers in self.element_numbers_by_type.items()
+            },
+            'element_connectivity_by_type': {
+                element_type: np.frombuffer(
+                    self.element_connectivity_by_type[element_type],
+                    dtype=np.int64
+                ).reshape(len(numbers), -1)
+                for element_type, numbers in self.element_numbers_by_type.items()
+            }
+        }
+
+    def _check_previous_element(self, element_type: str) -> None:
+        """Checks the last element of a type has the same number of nodes as the first.
+
+        Connectivity is stored as a fixed-width (M, k) array,
+        so every element of a type must reference k nodes.
+
+        :param element_type: Element type.
+        :raises ParserError: When element node counts differ within a type.
+        """
+        num_elements = len(self.element_numbers_by_type[element_type])
+        if num_elements == 0:
+            return
+        num_values = len(self.element_connectivity_by_type[element_type])
+        if element_type not in self.nodes_per_element_by_type:
+            self.nodes_per_element_by_type[element_type] = num_values
+        nodes_per_element = self.nodes_per_element_by_type[element_type]
+        if num_values != num_elements * nodes_per_element:
+            raise ParserError(
+                'Elements of type {} must all have {} nodes.'.format(
+                    element_type, nodes_per_element))
+
+
+def get_mesh_builder(backend: str, directory: Optional[str] = None):
+    """Gets a builder for the requested result backend.
+
+    :param backend: 'dict', 'numpy', or 'memmap'.
+    :param directory: Directory to write arrays to for the 'memmap' backend.
+    :raises ValueError: When backend is unknown,
+                        or is 'memmap' without a directory.
+    :return: Mesh builder.
+    """
+    builder_by_backend = {
+        'dict': DictMeshBuilder,
+        'numpy': ArrayMeshBuilder,
+        'memmap': MappedMeshBuilder
+    }
+    if backend not in builder_by_backend:
+        raise ValueError(
+            "Unknown backend '{}'. Expected one of: {}.".format(
+                backend, ', '.join(builder_by_backend)))
+    if backend == 'memmap':
+        if directory is None:
+            raise ValueError("backend='memmap' requires a directory to write arrays to.")
+        return MappedMeshBuilder(directory)
+    return builder_by_backend[backend]()
+
+
+__all__ = ['ArrayMeshBuilder', 'DictMeshBuilder', 'get_mesh_builder']
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import defaultdict
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .element_set import ElementSet
+from .mesh_records import IncludeStart
+from .parser_error import ParserError
+from .read_mesh import (ArrayMesh, Mesh, MeshRecord, build_mesh, iter_mesh,
+                        iter_mesh_in_parallel)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+# Bump when the layout of cache entries changes.
+CACHE_FORMAT_VERSION = 1
+
+
+class MeshCache:
+    """Caches meshes read from CalculiX input files on disk.
+
+    Each mesh is saved as a .npz file of arrays,
+    keyed by the absolute path of the input file.
+    An entry is used as long as the modification time and size
+    of the input file, and every file it includes, are unchanged.
+
+    When the cache grows past max_bytes,
+    the least recently used entries are removed.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        if np is None:
+            raise ImportError(
+                'MeshCache requires numpy. '
+                'Install it with: pip install ccxmeshreader[numpy]')
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def read_mesh(self,
+                  path: str,
+                  backend: str = 'dict',
+                  workers: Optional[int] = None,
+                  compact_element_sets: bool = False) -> Union[Mesh, ArrayMesh]:
+        """Reads a CalculiX input file from the cache, or parses and caches it.
+
+        :param path: Path to CalculiX input file.
+        :param backend: 'dict' (default) or 'numpy'. See read_mesh.
+        :param workers: Number of processes to parse data blocks with. See read_mesh.
+        :param compact_element_sets: Whether to return element sets as ElementSet objects.
+        :return: a dictionary with nodes, elements, and element sets.
+        """
+        path = os.path.abspath(path)
+        entry_path = self.get_entry_path(path)
+        mesh = self.load(entry_path, path, backend, compact_element_sets)
+        if mesh is not None:
+            return mesh
+        include_paths = []
+        if workers is not None and workers > 1:
+            records = iter_mesh_in_parallel(path, workers)
+        else:
+            records = iter_mesh(path, blocks=True)
+        mesh = build_mesh(record_include_paths(records, include_paths),
+                          backend, compact_element_sets)
+        self.save(entry_path, mesh, [path] + include_paths)
+        self.evict()
+        return mesh
+
+    def get_entry_path(self, path: str) -> str:
+        key = hashlib.sha256(path.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directory, key + '.npz')
+
+    def load(self,
+             entry_path: str,
+             path: str,
+             backend: str,
+             compact_element_sets: bool = False) -> Optional[Union[Mesh, ArrayMesh]]:
+        """Loads a mesh from a cache entry if it's up-to-date.
+
+        :param entry_path: Path to cache entry.
+        :param path: Absolute path to CalculiX input file.
+        :param backend: 'dict' or 'numpy'.
+        :param compact_element_sets: Whether to return element sets as ElementSet objects.
+        :return: Mesh, or None if there's no up-to-date entry.
+        """
+        try:
+            with np.load(entry_path) as arrays:
+                metadata = json.loads(str(arrays['metadata']))
+                if (metadata['version'] != CACHE_FORMAT_VERSION or
+                        metadata['files'][0]['path'] != path or
+                        not all(stat_file(f['path']) == f for f in metadata['files'])):
+                    return None
+                mesh = arrays_to_mesh(arrays, metadata, backend, compact_element_sets)
+        except (OSError, KeyError, ValueError):
+            return None
+        os.utime(entry_path)
+        return mesh
+
+    def save(self, entry_path: str, mesh: Union[Mesh, ArrayMesh], paths: List[str]) -> None:
+        """Saves a mesh to a cache entry.
+
+        :param entry_path: Path to cache entry.
+        :param mesh: Mesh to save.
+        :param paths: Paths of the CalculiX input file, and files it includes.
+        """
+        arrays, metadata = mesh_to_arrays(mesh)
+        metadata['version'] = CACHE_FORMAT_VERSION
+        metadata['files'] = [stat_file(path) for path in paths]
+        arrays['metadata'] = np.array(json.dumps(metadata))
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                os.remove(entry.path)
+
+
+def record_include_paths(records: Iterable[MeshRecord],
+                         include_paths: List[str]) -> Iterator[MeshRecord]:
+    """Passes records through, appending the path of each included file to a list."""
+    for record in records:
+        if type(record) is IncludeStart:
+            include_paths.append(os.path.abspath(record.path))
+        yield record
+
+
+def stat_file(path: str) -> dict:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {'path': path, 'mtime_ns': None, 'size': None}
+    return {'path': path, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def mesh_to_arrays(mesh: Union[Mesh, ArrayMesh]) -> Tuple[dict, dict]:
+    """Converts a mesh from either backend to arrays.
+
+    Connectivity is stored flat, with offsets to the start of each element,
+    so elements of a type don't need the same number of nodes.
+
+    :param mesh: Mesh.
+    :return: Two-element tuple containing arrays by name, and metadata.
+    """
+    arrays = {}
+    if 'node_coordinates' in mesh:
+        arrays['node_numbers'] = mesh['node_numbers']
+        arrays['node_coordinates'] = mesh['node_coordinates']
+        element_types = list(mesh['element_numbers_by_type'])
+        for i, element_type in enumerate(element_types):
+            connectivity = mesh['element_connectivity_by_type'][element_type]
+            num_elements, nodes_per_element = connectivity.shape
+            arrays['element_numbers_{}'.format(i)] = mesh['element_numbers_by_type'][element_type]
+            arrays['element_offsets_{}'.format(i)] = np.arange(
+                num_elements + 1, dtype=np.int64) * nodes_per_element
+            arrays['element_connectivity_{}'.format(i)] = connectivity.ravel()
+    else:
+        node_coordinates_by_number = mesh['node_coordinates_by_number']
+        arrays['node_numbers'] = np.fromiter(
+            node_coordinates_by_number, dtype=np.int64,
+            count=len(node_coordinates_by_number))
+        arrays['node_coordinates'] = np.array(
+            list(node_coordinates_by_number.values()),
+            dtype=np.float64).reshape(-1, 3)
+        element_types = list(mesh['element_dict_by_type'])
+        for i, element_type in enumerate(element_types):
+            element_dict = mesh['element_dict_by_type'][element_type]
+            lengths = np.fromiter(map(len, element_dict.values()),
+                                  dtype=np.int64, count=len(element_dict))
+            arrays['element_numbers_{}'.format(i)] = np.fromiter(
+                element_dict, dtype=np.int64, count=len(element_dict))
+            arrays['element_offsets_{}'.format(i)] = np.concatenate(
+                ([0], np.cumsum(lengths)))
+            arrays['element_connectivity_{}'.format(i)] = np.fromiter(
+                chain.from_iterable(element_dict.values()),
+                dtype=np.int64, count=int(lengths.sum()))
+    element_set_names = list(mesh['element_set_by_name'])
+    for i, element_set_name in enumerate(element_set_names):
+        element_set = mesh['element_set_by_name'][element_set_name]
+        arrays['element_set_{}'.format(i)] = np.sort(np.fromiter(
+            element_set, dtype=np.int64, count=len(element_set)))
+    metadata = {
+        'element_types': element_types,
+        'element_set_names': element_set_names,
+        'materials': mesh['materials']
+    }
+    return arrays, metadata
+
+
+def arrays_to_mesh(arrays,
+                   metadata: dict,
+                   backend: str,
+                   compact_element_sets: bool = False) -> Union[Mesh, ArrayMesh]:
+    """Converts arrays saved by mesh_to_arrays to a mesh.
+
+    :param arrays: Arrays by name.
+    :param metadata: Metadata.
+    :param backend: 'dict' or 'numpy'.
+    :param compact_element_sets: Whether to return element sets as ElementSet objects.
+    :raises ValueError: When backend is unknown.
+    :raises ParserError: When elements of a type have differing numbers of nodes
+                         and backend is 'numpy'.
+    :return: Mesh.
+    """
+    if backend == 'numpy':
+        mesh = {
+            'node_numbers': arrays['node_numbers'],
+            'node_coordinates': arrays['node_coordinates'],
+            'element_numbers_by_type': {},
+            'element_connectivity_by_type': {}
+        }
+        for i, element_type in enumerate(metadata['element_types']):
+            element_numbers = arrays['element_numbers_{}'.format(i)]
+            offsets = arrays['element_offsets_{}'.format(i)]
+            lengths = np.diff(offsets)
+            if len(lengths) and np.any(lengths != lengths[0]):
+                raise ParserError(
+                    'Elements of type {} must all have {} nodes.'.format(
+                        element_type, lengths[0]))
+            mesh['element_numbers_by_type'][element_type] = element_numbers
+            mesh['element_connectivity_by_type'][element_type] = arrays[
+                'element_connectivity_{}'.format(i)].reshape(len(element_numbers), -1)
+    elif backend == 'dict':
+        mesh = {
+            'node_coordinates_by_number': dict(zip(
+                arrays['node_numbers'].tolist(),
+                map(tuple, arrays['node_coordinates'].tolist()))),
+            'element_dict_by_type': defaultdict(dict)
+        }
+        for i, element_type in enumerate(metadata['element_types']):
+            element_numbers = arrays['element_numbers_{}'.format(i)]
+            offsets = arrays['element_offsets_{}'.format(i)]
+            connectivity = arrays['element_connectivity_{}'.format(i)]
+            lengths = np.diff(offsets)
+            if len(lengths) and np.all(lengths == lengths[0]):
+                node_numbers = connectivity.reshape(len(element_numbers), -1).tolist()
+            else:
+                node_numbers = [n.tolist() for n in np.split(connectivity, offsets[1:-1])]
+            mesh['element_dict_by_type'][element_type] = dict(zip(
+                element_numbers.tolist(), node_numbers))
+    else:
+        raise ValueError("Unknown backend '{}'.".format(backend))
+    if compact_element_sets:
+        mesh['element_set_by_name'] = defaultdict(ElementSet, {
+            element_set_name: ElementSet(arrays['element_set_{}'.format(i)])
+            for i, element_set_name in enumerate(metadata['element_set_names'])
+        })
+    else:
+        mesh['element_set_by_name'] = defaultdict(set, {
+            element_set_name: set(arrays['element_set_{}'.format(i)].tolist())
+            for i, element_set_name in enumerate(metadata['element_set_names'])
+        })
+    mesh['materials'] = metadata['materials']
+    return mesh
+
+
+__all__ = ['MeshCache']
@@ -0,0 +1,492 @@
+import os
+import re
+from collections import defaultdict
+from typing import (Dict, Generator, Iterator, List, NamedTuple, Optional, Set,
+                    Tuple, Union)
+
+from .keyword_handlers import get_keyword_handler, normalize_keyword
+from .mapped_file_reader import (ENCODING, IncludeResolver, MappedFileReader,
+                                 Source)
+from .mesh_builder import get_mesh_builder
+from .mesh_records import (Element, ElementBlock, ElementSetMembers,
+                           ElementSetRange, Material)
+from .parser_error import ParserError
+from .read_mesh import (DataBlock, MeshRecord, add_record, get_include_key,
+                        is_comment, iter_data_records, parse_elastic_data_line,
+                        parse_keyword_line, raise_parser_error, resolve_include)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+# Matches the start of a keyword or comment line after the first line.
+KEYWORD_LINE_PATTERN = re.compile(rb'\n[ \t]*\*')
+# Matches a keyword or comment on the first line.
+FIRST_KEYWORD_LINE_PATTERN = re.compile(rb'[ \t]*\*')
+# Matches the end of a line followed by a blank line, which ends a section's data lines.
+BLANK_LINE_PATTERN = re.compile(rb'\n[ \t\r]*\n')
+# Matches a blank first line.
+FIRST_BLANK_LINE_PATTERN = re.compile(rb'[ \t\r]*\n')
+
+
+class Section(NamedTuple):
+    """A keyword line, and the data lines up to the next keyword line.
+
+    Offsets are in bytes from the start of the file at path,
+    and line_num is the line number of the keyword line.
+
+    Data lines after an *INCLUDE, at the start of the included file
+    or after the *INCLUDE line, continue the section before it,
+    as they do for read_mesh.
+    They're listed as a section of the same keyword, line, and parameters,
+    without a keyword line of its own, so start equals data_start,
+    and line_num is the number of the line before data_start.
+    """
+    path: str
+    keyword: str
+    parameters: Dict[str, Union[str, bool]]
+    line: str
+    start: int
+    data_start: int
+    end: int
+    line_num: int
+
+    @property
+    def is_continuation(self) -> bool:
+        """Whether the section continues one before an *INCLUDE."""
+        return self.start == self.data_start
+
+
+class OpenSection(NamedTuple):
+    """A section whose data lines may continue after an *INCLUDE,
+    and the range of its data lines last scanned."""
+    section: Section
+    buffer: Union[bytes, memoryview]
+    data_start: int
+    end: int
+
+    def is_ended(self) -> bool:
+        """Checks if a blank line ends the section's data lines."""
+        if self.data_start >= self.end:
+            return False
+        if self.data_start == 0 and FIRST_BLANK_LINE_PATTERN.match(self.buffer, 0, self.end):
+            return True
+        # Data lines start after a newline, unless they start the file.
+        start = max(self.data_start - 1, 0)
+        return BLANK_LINE_PATTERN.search(self.buffer, start, self.end) is not None
+
+
+class MeshIndex:
+    """Index of the keyword sections of a CalculiX input file.
+
+    The index is built by one scan for keyword lines,
+    without parsing any data lines.
+    Accessors parse only the sections they need.
+
+    Results are in the same form as read_mesh for the given backend.
+    Files stay mapped until the index is closed.
+    """
+
+    def __init__(self,
+                 path: str,
+                 backend: str = 'dict',
+                 include_resolver: Optional[IncludeResolver] = None):
+        """
+        :param path: Path to CalculiX input file.
+        :param backend: 'dict' (default) or 'numpy'. See read_mesh.
+        :param include_resolver: Resolves *INCLUDE files. See read_mesh.
+        :raises ParserError: When an *INCLUDE definition doesn't have INPUT,
+                             or a file includes itself, directly or through other files.
+        """
+        get_mesh_builder(backend)
+        self.path = path
+        self.backend = backend
+        self.readers: Dict[str, MappedFileReader] = {}
+        try:
+            self.sections = list(scan_sections(
+                self.get_reader(path), include_resolver or resolve_include, self.readers))
+        except BaseException:
+            self.close()
+            raise
+        # Resolved element sets by name, and index of the first section ignored.
+        self.element_sets: Dict[Tuple[str, int], Optional[Set[int]]] = {}
+
+    def find(self, keyword: str, **parameters: Union[str, bool]) -> List[Section]:
+        """Finds sections by keyword and parameters.
+
+        :param keyword: Keyword, such as '*ELEMENT'. Case-insensitive.
+        :param parameters: Parameter values the sections must have, such as TYPE='C3D10'.
+        :return: Matching sections in file order.
+        """
+        keyword = normalize_keyword(keyword)
+        return [
+            section for section in self.sections
+            if section.keyword == keyword and all(
+                section.parameters.get(key.upper()) == value
+                for key, value in parameters.items())
+        ]
+
+    def nodes(self):
+        """Parses every *NODE section.
+
+        :return: Node coordinates by number for the 'dict' backend,
+                 otherwise a two-element tuple containing node numbers and coordinates.
+        """
+        mesh = self.build(self.find('*NODE'))
+        if self.backend == 'dict':
+            return mesh['node_coordinates_by_number']
+        return mesh['node_numbers'], mesh['node_coordinates']
+
+    def elements(self, element_type: str):
+        """Parses every *ELEMENT section of a type.
+
+        :param element_type: Element type, such as 'C3D10'.
+        :return: Node numbers by element number for the 'dict' backend,
+                 otherwise a two-element tuple containing element numbers and connectivity.
+        """
+        mesh = self.build(self.find('*ELEMENT', TYPE=element_type))
+        if self.backend == 'dict':
+            return mesh['element_dict_by_type'].get(element_type, {})
+        if element_type not in mesh['element_numbers_by_type']:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.int64)
+        return (mesh['element_numbers_by_type'][element_type],
+                mesh['element_connectivity_by_type'][element_type])
+
+    def element_set(self, name: str) -> Set[int]:
+        """Parses the *ELEMENT and *ELSET sections defining an element set.
+
+        Element sets it references are resolved the same way.
+
+        :param name: Name of element set.
+        :raises KeyError: When the element set isn't defined.
+        :return: Element numbers.
+        """
+        element_set = self.resolve_element_set(name, len(self.sections))
+        if element_set is None:
+            raise KeyError(name)
+        return set(element_set)
+
+    def materials(self) -> List[dict]:
+        """Parses every *MATERIAL section and its properties.
+
+        :return: Materials.
+        """
+        materials = []
+        material_name = None
+        # Whether the last *ELASTIC section has yet to have a data line.
+        reading_elastic = False
+        for section in self.sections:
+            if section.keyword == '*MATERIAL' and not section.is_continuation:
+                if 'NAME' not in section.parameters:
+                    raise_parser_error(
+                        '*MATERIAL definition must have NAME.',
+                        section.line_num,
+                        section.line)
+                material_name = section.parameters['NAME']
+                add_record(Material(material_name), None, None, materials)
+            elif section.keyword == '*ELASTIC' and material_name is not None:
+                if not section.is_continuation:
+                    reading_elastic = True
+                if not reading_elastic:
+                    continue
+                for line_num, stripped_line in self.iter_data_lines(section):
+                    reading_elastic = False
+                    elastic_type = str(section.parameters.get('TYPE', 'ISO')).upper()
+                    elastic = parse_elastic_data_line(
+                        stripped_line, line_num, material_name, elastic_type)
+                    add_record(elastic, None, None, materials)
+                    break
+        return materials
+
+    def build(self, sections: List[Section]) -> dict:
+        builder = get_mesh_builder(self.backend)
+        element_set_by_name = defaultdict(set)
+        for section in sections:
+            for record in self.iter_section_records(section):
+                add_record(record, builder, element_set_by_name, [])
+        return builder.build()
+
+    def resolve_element_set(self, name: str, before: int) -> Optional[Set[int]]:
+        """Resolves an element set from sections before an index.
+
+        Results are kept, so element sets referenced many times are only parsed once.
+
+        :param name: Name of element set.
+        :param before: Index of the first section to ignore.
+        :raises ParserError: When a referenced element set isn't defined.
+        :return: Element numbers, which must not be modified,
+                 or None if the element set isn't defined.
+        """
+        key = (name, before)
+        if key not in self.element_sets:
+            self.element_sets[key] = self.parse_element_set(name, before)
+        return self.element_sets[key]
+
+    def parse_element_set(self, name: str, before: int) -> Optional[Set[int]]:
+        element_set = None
+        for i, section in enumerate(self.sections[:before]):
+            if (section.keyword not in ('*ELEMENT', '*ELSET') or
+                    section.parameters.get('ELSET') != name):
+                continue
+            if element_set is None:
+                element_set = set()
+            for record in self.iter_section_records(section):
+                record_type = type(record)
+                if record_type is ElementBlock:
+                    element_set.update(record.element_numbers.tolist())
+                elif record_type is Element:
+                    element_set.add(record.number)
+                elif record_type is ElementSetRange:
+                    element_set = set(
+                        range(record.start, record.end + 1, record.step))
+                elif record_type is ElementSetMembers:
+                    element_set.update(record.element_numbers)
+                    for element_set_name in record.element_set_names:
+                        referenced_set = self.resolve_element_set(
+                            element_set_name, i)
+                        if referenced_set is None:
+                            raise ParserError(
+                                '*ELSET {} references undefined element set {}.'.format(
+                                    name, element_set_name))
+                        element_set.update(referenced_set)
+        return element_set
+
+    def iter_section_records(self, section: Section) -> Iterator[MeshRecord]:
+        """Parses the data lines of a *NODE, *ELEMENT, or *ELSET section.
+
+        :param section: Section.
+        :raises ParserError: When an *ELEMENT section doesn't have TYPE.
+        :return: Iterator of records.
+        """
+        data_type = get_keyword_handler(section.keyword).data_type
+        if data_type == 'element' and 'TYPE' not in section.parameters:
+            raise_parser_error(
+                '*ELEMENT definition must have TYPE.',
+                section.line_num,
+                section.line)
+        element_set = section.parameters.get('ELSET') or None
+        generate = self.generates(section)
+        reader = self.get_reader(section.path)
+        line_num = section.line_num + 1
+        position = section.data_start
+        while position < section.end:
+            # Other sections of the file may be read while records are consumed.
+            reader.position = position
+            stripped_line = reader.readline().strip()
+            if is_comment(stripped_line):
+                position = reader.position
+                line_num += 1
+                continue
+            if stripped_line == '':
+                break
+            start = reader.line_start
+            data = reader.read_data_block()
+            position = reader.position
+            block = DataBlock(
+                section.path, start, position, data,
+                data_type, line_num,
+                section.parameters.get('TYPE', ''), element_set, generate)
+            yield from iter_data_records(block, True)
+            generate = False
+            line_num += data.rstrip(b'\n').count(b'\n') + 1
+
+    def generates(self, section: Section) -> bool:
+        """Checks if the first data block of a section is generated.
+
+        Like read_mesh, only the first data block after a keyword line with GENERATE is,
+        which may be in a section continuing it.
+        """
+        if 'GENERATE' not in section.parameters:
+            return False
+        if not section.is_continuation:
+            return True
+        # Sections between a section and those continuing it are *INCLUDE sections.
+        for previous in reversed(self.sections[:self.sections.index(section)]):
+            if previous.keyword == '*INCLUDE':
+                continue
+            if next(self.iter_data_lines(previous), None) is not None:
+                return False
+            if not previous.is_continuation:
+                break
+        return True
+
+    def iter_data_lines(self, section: Section) -> Iterator[tuple]:
+        """Iterates over the data lines of a section, one at a time.
+
+        :param section: Section.
+        :return: Iterator of two-element tuples containing line number,
+                 and line stripped of surrounding white-space.
+        """
+        reader = self.get_reader(section.path)
+        line_num = section.line_num + 1
+        position = section.data_start
+        while position < section.end:
+            reader.position = position
+            stripped_line = reader.readline().strip()
+            position = reader.position
+            if stripped_line == '':
+                return
+            if not is_comment(stripped_line):
+                yield line_num, stripped_line
+            line_num += 1
+
+    def get_reader(self, path: str) -> MappedFileReader:
+        """Gets the reader of a file, mapping it on first use.
+
+        Included sources that aren't paths are read when scanning, by their name.
+        """
+        reader = self.readers.get(path)
+        if reader is None:
+            reader = self.readers[path] = MappedFileReader(path)
+        return reader
+
+    def close(self) -> None:
+        """Unmaps the files read."""
+        for reader in self.readers.values():
+            reader.close()
+        self.readers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def scan_sections(reader: MappedFileReader,
+                  include_resolver: IncludeResolver,
+                  readers: Dict[str, MappedFileReader],
+                  include_keys: Tuple[str, ...] = (),
+                  open_section: Optional[OpenSection] = None
+                  ) -> Generator[Section, None, Optional[OpenSection]]:
+    """Scans a CalculiX input file, and files it includes, for keyword lines.
+
+    Comment lines are skipped, and don't end a section.
+
+    :param reader: Reader of CalculiX input file.
+    :param include_resolver: Resolves *INCLUDE files. See read_mesh.
+    :param readers: Readers by path, or name for sources that aren't paths,
+                    to which the readers of included files are added.
+    :param include_keys: Keys from get_include_key of the files including this one, outermost first.
+    :param open_section: Section whose data lines may continue at the start of the file.
+    :raises ParserError: When an *INCLUDE definition doesn't have INPUT,
+                         or a file includes itself, directly or through other files.
+    :return: Iterator of sections in file order,
+             returning the section whose data lines may continue after the file.
+    """
+    include_keys += (get_include_key(reader),)
+    buffer = reader.buffer
+    line_starts = [match.start() + 1
+                   for match in KEYWORD_LINE_PATTERN.finditer(buffer)]
+    if FIRST_KEYWORD_LINE_PATTERN.match(buffer):
+        line_starts.insert(0, 0)
+    keyword_lines = []
+    line_num = 1
+    position = 0
+    for start in line_starts:
+        line_num += reader.count_lines(start, position)
+        position = start
+        data_start = buffer.find(b'\n', start)
+        data_start = len(buffer) if data_start == -1 else data_start + 1
+        stripped_line = buffer[start:data_start].decode(ENCODING).strip()
+        if not is_comment(stripped_line):
+            keyword_lines.append((start, data_start, stripped_line, line_num))
+    ends = [start for start, _, _, _ in keyword_lines] + [len(buffer)]
+    # Data lines before the first keyword line continue the section before the *INCLUDE.
+    open_section = yield from continue_section(open_section, reader, 0, ends[0], 0)
+    for (start, data_start, stripped_line, line_num), end in zip(keyword_lines, ends[1:]):
+        keyword, parameters = parse_keyword_line(stripped_line)
+        keyword = normalize_keyword(keyword)
+        if keyword != '*INCLUDE':
+            section = Section(reader.name, keyword, parameters, stripped_line,
+                              start, data_start, end, line_num)
+            yield section
+            open_section = OpenSection(section, buffer, data_start, end)
+            continue
+        yield Section(reader.name, keyword, parameters, stripped_line,
+                      start, data_start, data_start, line_num)
+        if 'INPUT' not in parameters:
+            raise_parser_error(
+                '*INCLUDE definition must have INPUT.',
+                line_num,
+                stripped_line)
+        include_reader = open_include(
+            include_resolver(parameters['INPUT'], reader.path), parameters['INPUT'], readers)
+        include_key = get_include_key(include_reader)
+        if include_key in include_keys:
+            raise_parser_error(
+                '*INCLUDE cycle: {}.'.format(' -> '.join(
+                    include_keys[include_keys.index(include_key):] + (include_key,))),
+                line_num,
+                stripped_line)
+        open_section = yield from scan_sections(
+            include_reader, include_resolver, readers, include_keys, open_section)
+        open_section = yield from continue_section(open_section, reader, data_start, end, line_num)
+    return open_section
+
+
+def continue_section(open_section: Optional[OpenSection],
+                     reader: MappedFileReader,
+                     data_start: int,
+                     end: int,
+                     line_num: int) -> Generator[Section, None, Optional[OpenSection]]:
+    """Continues a section with data lines after an *INCLUDE.
+
+    :param open_section: Section whose data lines may continue, or None.
+    :param reader: Reader of the file the data lines are in.
+    :param data_start: Offset of the data lines.
+    :param end: Offset of the next keyword line, or the end of the file.
+    :param line_num: Number of the line before data_start.
+    :return: Iterator of the section continuing it, if there are data lines,
+             returning the section whose data lines may continue after them.
+    """
+    if open_section is None:
+        return None
+    first_line = get_first_line(reader.buffer, data_start, end)
+    if first_line is None:
+        return open_section
+    if first_line == '' or open_section.is_ended():
+        return None
+    yield open_section.section._replace(
+        path=reader.name, start=data_start, data_start=data_start, end=end, line_num=line_num)
+    return open_section._replace(buffer=reader.buffer, data_start=data_start, end=end)
+
+
+def get_first_line(buffer: Union[bytes, memoryview], start: int, end: int) -> Optional[str]:
+    """Gets the first line of a range of lines that isn't a comment.
+
+    :param buffer: Contents of file.
+    :param start: Offset of the first line.
+    :param end: Offset after the last line.
+    :return: Line stripped of surrounding white-space, which is empty for a blank line,
+             or None if every line is a comment.
+    """
+    while start < end:
+        line_end = buffer.find(b'\n', start, end)
+        line_end = end if line_end == -1 else line_end + 1
+        stripped_line = buffer[start:line_end].decode(ENCODING).strip()
+        if not is_comment(stripped_line):
+            return stripped_line
+        start = line_end
+    return None
+
+
+def open_include(source: Source,
+                 name: str,
+                 readers: Dict[str, MappedFileReader]) -> MappedFileReader:
+    """Opens a file to include, reusing its reader if it was included before.
+
+    :param source: Source from the include resolver.
+    :param name: INPUT of the *INCLUDE, naming sources that aren't paths.
+    :param readers: Readers by path, or name for sources that aren't paths.
+    :return: Reader of the file.
+    """
+    key = os.fspath(source) if isinstance(source, (str, os.PathLike)) else name
+    reader = readers.get(key)
+    if reader is None:
+        reader = readers[key] = MappedFileReader(source, name)
+    return reader
+
+
+__all__ = ['MeshIndex', 'Section']
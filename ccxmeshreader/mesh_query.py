@@ -0,0 +1,465 @@
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+from .connectivity import element_set_to_array, get_element_arrays_by_type
+from .renumbering import get_index_by_number, get_max
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+# Average number of nodes per cell of the grid indexing node coordinates.
+NODES_PER_CELL = 2
+
+# Number of points whose nearest nodes are searched for at once, bounding memory use.
+NEAREST_BATCH_POINTS = 1 << 14
+# Number of cells whose nodes are compared with points at once, bounding memory use.
+NEAREST_BATCH_CELLS = 1 << 20
+
+
+class MeshQuery:
+    """Spatial and element set queries over a mesh read by read_mesh.
+
+    Arrays are derived from the mesh with vectorized numpy operations on first use, and kept,
+    so repeated queries don't scan the mesh again.
+    Node coordinates are indexed by a uniform grid for nearest node, box, and radius queries,
+    and node numbers by a dense lookup array, sized by the largest node number, as with renumber=True.
+
+    Node number 0, which CalculiX uses for missing nodes, is ignored,
+    as are nodes elements reference that aren't defined.
+    """
+
+    def __init__(self, mesh: dict):
+        """
+        :param mesh: Mesh from read_mesh, with any backend,
+                     and optionally renumbered, or from SharedMesh.
+        :raises ImportError: When numpy isn't installed.
+        """
+        if np is None:
+            raise ImportError(
+                'MeshQuery requires numpy. '
+                'Install it with: pip install ccxmeshreader[numpy]')
+        if 'node_coordinates' in mesh:
+            self.node_numbers = np.asarray(mesh['node_numbers'])
+            self.node_coordinates = np.asarray(mesh['node_coordinates'])
+        else:
+            node_coordinates_by_number = mesh['node_coordinates_by_number']
+            self.node_numbers = np.fromiter(node_coordinates_by_number, dtype=np.int64,
+                                            count=len(node_coordinates_by_number))
+            self.node_coordinates = np.array(list(node_coordinates_by_number.values()),
+                                             dtype=np.float64).reshape(-1, 3)
+        # Connectivity is in node indices rather than numbers for renumbered meshes.
+        self.is_renumbered = 'node_index_by_number' in mesh
+        self.element_arrays_by_type = get_element_arrays_by_type(mesh)
+        self.element_set_by_name = mesh['element_set_by_name']
+        self._node_index_by_number = None
+        self._element_rows_by_type = {}
+        self._element_set_nodes_by_name = {}
+        self._element_centroids_by_type = {}
+        self._bounding_boxes = {}
+        self._grid = None
+
+    def node_rows(self, node_numbers: 'np.ndarray') -> 'np.ndarray':
+        """Gets the rows of node_coordinates of nodes.
+
+        :param node_numbers: Node numbers.
+        :return: Rows, which are -1 for numbers without a node.
+        """
+        if self._node_index_by_number is None:
+            # A dense lookup, as renumber=True adds, rather than a binary search.
+            self._node_index_by_number = get_index_by_number(self.node_numbers,
+                                                              get_max(self.node_numbers))
+        index_by_number = self._node_index_by_number
+        node_numbers = np.asarray(node_numbers, dtype=np.int64)
+        is_in_range = (node_numbers >= 0) & (node_numbers < len(index_by_number))
+        return np.where(is_in_range, index_by_number[np.where(is_in_range, node_numbers, 0)], -1)
+
+    def element_rows(self, element_type: str) -> 'np.ndarray':
+        """Gets the connectivity of elements of a type as rows of node_coordinates.
+
+        :param element_type: Element type.
+        :raises KeyError: When there are no elements of the type.
+        :return: (M, k) int64 array, which is -1 for missing nodes.
+        """
+        if element_type not in self._element_rows_by_type:
+            connectivity = self.element_arrays_by_type[element_type][1]
+            if self.is_renumbered:
+                rows = np.asarray(connectivity)
+            else:
+                rows = np.where(connectivity != 0, self.node_rows(connectivity), -1)
+            self._element_rows_by_type[element_type] = rows
+        return self._element_rows_by_type[element_type]
+
+    def element_set_nodes(self, name: str) -> 'np.ndarray':
+        """Gets the nodes used by the elements of an element set.
+
+        :param name: Name of element set.
+        :raises KeyError: When the element set isn't defined.
+        :return: Sorted node numbers.
+        """
+        if name not in self._element_set_nodes_by_name:
+            self._element_set_nodes_by_name[name] = np.unique(
+                self.node_numbers[self.get_used_nodes(self.iter_element_set_rows(name))])
+        return self._element_set_nodes_by_name[name]
+
+    def element_centroids(self, element_type: str) -> 'np.ndarray':
+        """Gets the centroids of elements of a type, as the average of their nodes' coordinates.
+
+        :param element_type: Element type.
+        :raises KeyError: When there are no elements of the type.
+        :return: (M, 3) float64 array, in the order of the elements' numbers in the mesh.
+        """
+        if element_type not in self._element_centroids_by_type:
+            rows = self.element_rows(element_type)
+            is_defined = rows >= 0
+            coordinates = self.node_coordinates[np.maximum(rows, 0)] * is_defined[:, :, np.newaxis]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                centroids = coordinates.sum(axis=1) / is_defined.sum(axis=1)[:, np.newaxis]
+            self._element_centroids_by_type[element_type] = centroids
+        return self._element_centroids_by_type[element_type]
+
+    def bounding_box(self,
+                     element_set: Optional[str] = None,
+                     element_type: Optional[str] = None) -> 'np.ndarray':
+        """Gets the bounding box of the nodes of elements in an element set, of a type, or both.
+
+        :param element_set: Name of element set. If None (default), elements of any set.
+        :param element_type: Element type. If None (default), elements of any type.
+                             If both are None, the bounding box of every node.
+        :raises KeyError: When the element set isn't defined.
+        :return: (2, 3) float64 array of the lower and upper corners,
+                 which are NaN if there are no nodes.
+        """
+        key = (element_set, element_type)
+        if key not in self._bounding_boxes:
+            if element_set is None and element_type is None:
+                coordinates = self.node_coordinates
+            elif element_set is None:
+                coordinates = self.node_coordinates[self.get_used_nodes(
+                    [self.element_rows(element_type)])]
+            else:
+                coordinates = self.node_coordinates[self.get_used_nodes(
+                    self.iter_element_set_rows(element_set, element_type))]
+            if len(coordinates) == 0:
+                self._bounding_boxes[key] = np.full((2, 3), np.nan)
+            else:
+                self._bounding_boxes[key] = np.array([coordinates.min(axis=0),
+                                                      coordinates.max(axis=0)])
+        return self._bounding_boxes[key]
+
+    def nearest_nodes(self, points: Sequence) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Finds the nearest node to each of some points.
+
+        Points are searched for in batches of NEAREST_BATCH_POINTS, without a Python loop per point.
+        Points outside the mesh are searched for from the nearest cells of the grid,
+        and only cells that may be nearer than a node found are searched.
+
+        :param points: (P, 3) array of points, or a single point.
+        :raises ValueError: When the mesh has no nodes.
+        :return: Two-element tuple containing node numbers and distances,
+                 each a (P,) array, or a scalar for a single point.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if len(self.node_numbers) == 0:
+            raise ValueError('Mesh has no nodes.')
+        grid = self.get_grid()
+        all_points = points.reshape(-1, 3)
+        rows = np.empty(len(all_points), dtype=np.int64)
+        distances = np.empty(len(rows))
+        for start in range(0, len(all_points), NEAREST_BATCH_POINTS):
+            stop = start + NEAREST_BATCH_POINTS
+            rows[start:stop], distances[start:stop] = grid.nearest(all_points[start:stop])
+        numbers = self.node_numbers[rows]
+        if points.ndim == 1:
+            return numbers[0], distances[0]
+        return numbers, distances
+
+    def nodes_within(self,
+                     point: Sequence[float],
+                     radius: float,
+                     element_set: Optional[str] = None) -> 'np.ndarray':
+        """Finds the nodes within a distance of a point.
+
+        :param point: Point.
+        :param radius: Distance.
+        :param element_set: Name of element set to find nodes of elements of. If None (default), any node.
+        :raises KeyError: When the element set isn't defined.
+        :return: Sorted node numbers.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        rows = self.get_grid().rows_in_box(point - radius, point + radius)
+        distances = np.linalg.norm(self.node_coordinates[rows] - point, axis=1)
+        return self.filter_nodes(self.node_numbers[rows[distances <= radius]], element_set)
+
+    def nodes_in_box(self,
+                     lower: Sequence[float],
+                     upper: Sequence[float],
+                     element_set: Optional[str] = None) -> 'np.ndarray':
+        """Finds the nodes within an axis-aligned box, including its boundary.
+
+        :param lower: Lower corner.
+        :param upper: Upper corner.
+        :param element_set: Name of element set to find nodes of elements of. If None (default), any node.
+        :raises KeyError: When the element set isn't defined.
+        :return: Sorted node numbers.
+        """
+        rows = self.get_grid().rows_in_box(np.asarray(lower, dtype=np.float64),
+                                           np.asarray(upper, dtype=np.float64))
+        return self.filter_nodes(self.node_numbers[rows], element_set)
+
+    def filter_nodes(self, node_numbers: 'np.ndarray', element_set: Optional[str]) -> 'np.ndarray':
+        node_numbers = np.unique(node_numbers)
+        if element_set is None:
+            return node_numbers
+        return node_numbers[np.isin(node_numbers, self.element_set_nodes(element_set))]
+
+    def iter_element_set_rows(self,
+                              name: str,
+                              element_type: Optional[str] = None) -> Iterator['np.ndarray']:
+        """Iterates over the connectivity, as rows of node_coordinates, of elements in an element set.
+
+        :param name: Name of element set.
+        :param element_type: Element type, or None for every type.
+        :raises KeyError: When the element set isn't defined.
+        :return: Iterator of (M, k) arrays, one per element type.
+        """
+        if name not in self.element_set_by_name:
+            raise KeyError(name)
+        element_numbers = element_set_to_array(self.element_set_by_name[name])
+        for current_type, (numbers, _) in self.element_arrays_by_type.items():
+            if element_type is None or current_type == element_type:
+                yield self.element_rows(current_type)[np.isin(numbers, element_numbers)]
+
+    def get_used_nodes(self, element_rows: Iterable['np.ndarray']) -> 'np.ndarray':
+        """Marks the rows of node_coordinates used by elements.
+
+        :param element_rows: Connectivity of elements as rows of node_coordinates.
+        :return: (N,) bool array.
+        """
+        # Marks rows by indexing, rather than sorting them with numpy.unique.
+        is_used = np.zeros(len(self.node_numbers) + 1, dtype=bool)
+        for rows in element_rows:
+            # Missing nodes, which are -1, mark the extra last row.
+            is_used[rows.ravel()] = True
+        return is_used[:-1]
+
+    def get_grid(self) -> 'UniformGrid':
+        if self._grid is None:
+            self._grid = UniformGrid(self.node_coordinates)
+        return self._grid
+
+
+class UniformGrid:
+    """Points binned into the cells of a uniform grid over their bounding box.
+
+    Rows of points in each cell are contiguous in sorted_rows,
+    with cells numbered x first, then y, then z.
+    """
+
+    def __init__(self, points: 'np.ndarray'):
+        """
+        :param points: (N, 3) float64 array of points.
+        """
+        self.points = points
+        if len(points):
+            self.lower = points.min(axis=0)
+            self.upper = points.max(axis=0)
+        else:
+            self.lower = self.upper = np.zeros(3)
+        extent = self.upper - self.lower
+        # Cells are cubes sized for NODES_PER_CELL points on average, over dimensions the points span.
+        is_spanned = extent > 0
+        num_cells = max(len(points) / NODES_PER_CELL, 1)
+        if is_spanned.any():
+            self.cell_size = (np.prod(extent[is_spanned]) / num_cells) ** (1 / is_spanned.sum())
+        else:
+            self.cell_size = 1.0
+        self.shape = np.maximum(np.ceil(extent / self.cell_size), 1).astype(np.int64)
+        # Cells of points barely spanning a dimension are too small, and too many.
+        while np.prod(self.shape) > 8 * num_cells:
+            self.cell_size *= 2
+            self.shape = np.maximum(np.ceil(extent / self.cell_size), 1).astype(np.int64)
+        cells = self.get_cell_ids(self.get_cells(points))
+        self.sorted_rows = np.argsort(cells, kind='stable')
+        self.cell_starts = np.searchsorted(cells[self.sorted_rows],
+                                           np.arange(np.prod(self.shape) + 1))
+
+    def get_cells(self, points: 'np.ndarray') -> 'np.ndarray':
+        """Gets the cell indices of points, clipped to the grid."""
+        cells = np.floor((points - self.lower) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.shape - 1)
+
+    def get_cell_ids(self, cells: 'np.ndarray') -> 'np.ndarray':
+        return cells[..., 0] + self.shape[0] * (cells[..., 1] + self.shape[1] * cells[..., 2])
+
+    def rows_in_cells(self, lower_cell: 'np.ndarray', upper_cell: 'np.ndarray') -> 'np.ndarray':
+        """Gets the rows of points in a box of cells, including its upper cell.
+
+        :param lower_cell: Lower cell index.
+        :param upper_cell: Upper cell index.
+        :return: Rows of points.
+        """
+        return self.rows_in_boxes(lower_cell[np.newaxis], upper_cell[np.newaxis])[1]
+
+    def rows_in_boxes(self,
+                      lower_cells: 'np.ndarray',
+                      upper_cells: 'np.ndarray',
+                      inner_lower_cells: Optional['np.ndarray'] = None,
+                      inner_upper_cells: Optional['np.ndarray'] = None
+                      ) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Gets the rows of points in each of some boxes of cells, including their upper cells.
+
+        :param lower_cells: (B, 3) lower cell indices.
+        :param upper_cells: (B, 3) upper cell indices.
+        :param inner_lower_cells: (B, 3) lower cell indices of boxes within the boxes,
+                                  whose cells are left out, if any.
+        :param inner_upper_cells: (B, 3) upper cell indices of inner boxes.
+        :return: Two-element tuple containing the box of each row, in increasing order,
+                 and rows of points.
+        """
+        if inner_lower_cells is None:
+            # Empty inner boxes.
+            inner_lower_cells = lower_cells
+            inner_upper_cells = lower_cells - 1
+        # Cells of a box along x are contiguous, so each row of cells along x is one slice,
+        # or two slices on either side of the inner box.
+        sizes = upper_cells - lower_cells + 1
+        row_counts = sizes[:, 1] * sizes[:, 2]
+        boxes = np.repeat(np.arange(len(lower_cells)), row_counts)
+        i = np.arange(len(boxes)) - np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+        y = lower_cells[boxes, 1] + i % sizes[boxes, 1]
+        z = lower_cells[boxes, 2] + i // sizes[boxes, 1]
+        first_ids = self.shape[0] * (y + self.shape[1] * z)
+        inner_lower = inner_lower_cells[boxes]
+        inner_upper = inner_upper_cells[boxes]
+        is_inner = ((y >= inner_lower[:, 1]) & (y <= inner_upper[:, 1]) &
+                    (z >= inner_lower[:, 2]) & (z <= inner_upper[:, 2]))
+        x_starts = lower_cells[boxes, 0]
+        x_stops = upper_cells[boxes, 0] + 1
+        inner_x_start = np.clip(np.where(is_inner, inner_lower[:, 0], x_stops), x_starts, x_stops)
+        inner_x_stop = np.clip(np.where(is_inner, inner_upper[:, 0] + 1, x_stops),
+                               inner_x_start, x_stops)
+        x_bounds = np.stack([x_starts, inner_x_start, inner_x_stop, x_stops], axis=1)
+        cell_starts = self.cell_starts[first_ids[:, np.newaxis] + x_bounds]
+        starts = cell_starts[:, 0::2].ravel()
+        stops = cell_starts[:, 1::2].ravel()
+        rows = self.sorted_rows[ranges_to_indices(starts, stops)]
+        return np.repeat(np.repeat(boxes, 2), stops - starts), rows
+
+    def rows_in_box(self, lower: 'np.ndarray', upper: 'np.ndarray') -> 'np.ndarray':
+        """Gets the rows of points within a box, including its boundary.
+
+        :param lower: Lower corner.
+        :param upper: Upper corner.
+        :return: Rows of points.
+        """
+        if np.any(lower > upper) or len(self.points) == 0:
+            return np.empty(0, dtype=np.int64)
+        rows = self.rows_in_cells(self.get_cells(lower), self.get_cells(upper))
+        points = self.points[rows]
+        return rows[np.all((points >= lower) & (points <= upper), axis=1)]
+
+    def nearest(self, points: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        """Finds the point nearest each of some other points, searching for every point at once.
+
+        Rings of cells around each point's cell, clipped to the grid,
+        are searched until a point is found.
+        Then the cells that may hold a nearer point are searched,
+        which are fewer for points outside the bounding box, the farther they are.
+
+        :param points: (P, 3) array of points.
+        :return: Two-element tuple containing the row of the nearest point to each point,
+                 and its distance, each a (P,) array.
+        """
+        cells = self.get_cells(points)
+        distances = np.full(len(points), np.inf)
+        searching = np.arange(len(points))
+        ring = 0
+        while len(searching):
+            # Only the cells of the ring are searched, not those of rings inside it.
+            boxes, rows = self.rows_in_boxes(np.maximum(cells[searching] - ring, 0),
+                                             np.minimum(cells[searching] + ring, self.shape - 1),
+                                             cells[searching] - ring + 1,
+                                             cells[searching] + ring - 1)
+            found, found_distances = get_min_distances(
+                boxes, np.linalg.norm(self.points[rows] - points[searching[boxes]], axis=1))
+            distances[searching[found]] = found_distances
+            is_found = np.zeros(len(searching), dtype=bool)
+            is_found[found] = True
+            searching = searching[~is_found]
+            ring += 1
+        # Padded, so the point found is within the box despite rounding.
+        distances = distances * (1 + 1e-9)
+        # Distances along each axis from points to the bounding box, which nearer points are in,
+        # so are at most as far along each axis as the distance found allows.
+        excess = np.maximum(np.maximum(self.lower - points, points - self.upper), 0)
+        radii = np.sqrt(np.maximum(
+            (distances ** 2 - np.sum(excess ** 2, axis=1))[:, np.newaxis] + excess ** 2, 0))
+        lower_cells = self.get_cells(points - radii)
+        upper_cells = self.get_cells(points + radii)
+        rows = np.empty(len(points), dtype=np.int64)
+        for start, stop in iter_batches(np.prod(upper_cells - lower_cells + 1, axis=1),
+                                        NEAREST_BATCH_CELLS):
+            boxes, box_rows = self.rows_in_boxes(lower_cells[start:stop], upper_cells[start:stop])
+            box_distances = np.linalg.norm(
+                self.points[box_rows] - points[start:stop][boxes], axis=1)
+            # Every box has a row, so the smallest distances line up with points.
+            distances[start:stop] = get_min_distances(boxes, box_distances)[1]
+            nearest = np.flatnonzero(box_distances == distances[start:stop][boxes])
+            # Keep the first of equally near rows.
+            rows[start:stop] = box_rows[nearest[np.diff(boxes[nearest], prepend=-1) != 0]]
+        return rows, distances
+
+
+def get_min_distances(boxes: 'np.ndarray',
+                      distances: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """Gets the smallest distance in each box with any rows.
+
+    :param boxes: Box of each row, in increasing order.
+    :param distances: Distance of each row.
+    :return: Two-element tuple containing boxes with any rows, and their smallest distances.
+    """
+    if len(boxes) == 0:
+        return boxes, distances
+    starts = np.flatnonzero(np.diff(boxes, prepend=-1))
+    return boxes[starts], np.minimum.reduceat(distances, starts)
+
+
+def iter_batches(sizes: 'np.ndarray', max_size: int) -> Iterator[Tuple[int, int]]:
+    """Splits items into consecutive batches whose total size is at most max_size,
+    except for batches of a single larger item.
+
+    :param sizes: Size of each item.
+    :param max_size: Maximum total size of a batch.
+    :return: Iterator of two-element tuples containing the start and stop of each batch.
+    """
+    ends = np.cumsum(sizes)
+    start = 0
+    while start < len(sizes):
+        offset = ends[start - 1] if start else 0
+        stop = max(int(np.searchsorted(ends, offset + max_size, side='right')), start + 1)
+        yield start, stop
+        start = stop
+
+
+def ranges_to_indices(starts: 'np.ndarray', stops: 'np.ndarray') -> 'np.ndarray':
+    """Concatenates ranges of indices without a Python loop.
+
+    :param starts: Starts of ranges.
+    :param stops: Stops of ranges.
+    :return: Indices of every range, in order.
+    """
+    lengths = stops - starts
+    indices = np.ones(lengths.sum(), dtype=np.int64)
+    if len(indices) == 0:
+        return indices
+    nonempty = lengths > 0
+    starts = starts[nonempty]
+    offsets = np.cumsum(lengths[nonempty])[:-1]
+    # Each range continues from its start, rather than the end of the previous one.
+    indices[0] = starts[0]
+    indices[offsets] = starts[1:] - (starts[:-1] + lengths[nonempty][:-1] - 1)
+    return np.cumsum(indices)
+
+
+__all__ = ['MeshQuery']
@@ -0,0 +1,88 @@
+import os
+from typing import Dict, Iterator, List, Union
+
+from .mesh_builder import get_mesh_builder
+from .mesh_cache import stat_file
+from .mesh_records import IncludeStart
+from .read_mesh import (ArrayMesh, DataBlock, Mesh, MeshRecord, build_mesh,
+                        iter_data_records, iter_records)
+
+
+class MeshReader:
+    """Reads a CalculiX input file, and re-reads it after files change.
+
+    Records parsed from each data block are kept between calls to refresh,
+    keyed by the file and byte offsets of the block.
+    On refresh, keyword lines are scanned again,
+    but only data blocks of files whose modification time or size changed are parsed,
+    before the mesh is rebuilt from the records.
+    """
+
+    def __init__(self,
+                 path: str,
+                 backend: str = 'dict',
+                 compact_element_sets: bool = False):
+        get_mesh_builder(backend)
+        self.path = os.path.abspath(path)
+        self.backend = backend
+        self.compact_element_sets = compact_element_sets
+        self.mesh = None
+        # Modification time and size of the input file, and files it includes, by path.
+        self.files = {}
+        self.records_by_block = {}
+
+    def refresh(self) -> Union[Mesh, ArrayMesh]:
+        """Reads the CalculiX input file,
+        re-parsing only the files that changed since the last call.
+
+        :return: a dictionary with nodes, elements, and element sets,
+                 the same as read_mesh.
+        """
+        changed_paths = self.get_changed_paths()
+        if self.mesh is not None and not changed_paths:
+            return self.mesh
+        for block in list(self.records_by_block):
+            if os.path.abspath(block.path) in changed_paths:
+                del self.records_by_block[block]
+        files = {self.path: stat_file(self.path)}
+        records_by_block = {}
+        records = self.iter_refreshed_records(files, records_by_block)
+        self.mesh = build_mesh(records, self.backend, self.compact_element_sets)
+        self.files = files
+        self.records_by_block = records_by_block
+        return self.mesh
+
+    def get_changed_paths(self) -> List[str]:
+        """Gets the paths of files that changed since the last call to refresh.
+
+        :return: Paths of changed files.
+        """
+        return [path for path, stat in self.files.items() if stat_file(path) != stat]
+
+    def iter_refreshed_records(self,
+                               files: Dict[str, dict],
+                               records_by_block: Dict[DataBlock, List[MeshRecord]]) -> Iterator[MeshRecord]:
+        """Iterates over records, re-using records of unchanged data blocks.
+
+        :param files: Modification time and size by path,
+                      which each included file is added to.
+        :param records_by_block: Records by data block without data,
+                                 which each data block read is added to.
+        :return: Iterator of records.
+        """
+        for record in iter_records(self.path):
+            if type(record) is DataBlock:
+                block = record._replace(data=None)
+                block_records = self.records_by_block.get(block)
+                if block_records is None:
+                    block_records = list(iter_data_records(record, True))
+                records_by_block[block] = block_records
+                yield from block_records
+            else:
+                if type(record) is IncludeStart:
+                    path = os.path.abspath(record.path)
+                    files[path] = stat_file(path)
+                yield record
+
+
+__all__ = ['MeshReader']
@@ -0,0 +1,87 @@
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+
+class Node(NamedTuple):
+    """A node from a *NODE data line."""
+    number: int
+    coordinates: Tuple[float, float, float]
+
+
+class NodeBlock(NamedTuple):
+    """Nodes from a batch of *NODE data lines parsed at once."""
+    node_numbers: Any  # numpy.ndarray of shape (N,) and dtype int64
+    node_coordinates: Any  # numpy.ndarray of shape (N, 3) and dtype float64
+
+
+class Element(NamedTuple):
+    """An element from one or more *ELEMENT data lines."""
+    number: int
+    type: str
+    node_numbers: List[int]
+    element_set: Optional[str]
+
+
+class ElementBlock(NamedTuple):
+    """Elements from a batch of *ELEMENT data lines parsed at once."""
+    type: str
+    element_numbers: Any  # numpy.ndarray of shape (M,) and dtype int64
+    connectivity: Any  # numpy.ndarray of shape (M, k) and dtype int64
+    element_set: Optional[str]
+
+
+class ElementSetMembers(NamedTuple):
+    """Members of an element set from an *ELSET data line.
+
+    Members are element numbers, or names of previously defined element sets.
+    """
+    name: str
+    element_numbers: List[int]
+    element_set_names: List[str]
+
+
+class ElementSetRange(NamedTuple):
+    """Members of an element set from an *ELSET data line with GENERATE."""
+    name: str
+    start: int
+    end: int
+    step: int
+
+
+class Material(NamedTuple):
+    """A *MATERIAL definition."""
+    name: str
+
+
+class Elastic(NamedTuple):
+    """An *ELASTIC definition belonging to the last material.
+
+    Young's modulus and Poisson's ratio are only parsed for type ISO.
+    """
+    material_name: str
+    type: str
+    youngs_modulus: Optional[float]
+    poissons_ratio: Optional[float]
+
+
+class IncludeStart(NamedTuple):
+    """Start of a file read by *INCLUDE."""
+    path: str
+
+
+class IncludeEnd(NamedTuple):
+    """End of a file read by *INCLUDE."""
+    path: str
+
+
+__all__ = [
+    'Elastic',
+    'Element',
+    'ElementBlock',
+    'ElementSetMembers',
+    'ElementSetRange',
+    'IncludeEnd',
+    'IncludeStart',
+    'Material',
+    'Node',
+    'NodeBlock'
+]
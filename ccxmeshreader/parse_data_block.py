@@ -0,0 +1,214 @@
+import warnings
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+try:
+    from . import _tokenizer
+except ImportError:  # the extension is optional, see setup.py
+    _tokenizer = None
+
+MAX_ELEMENT_DATA_LINE_PARTS = 16
+
+COMMA = ord(',')
+NEWLINE = ord('\n')
+
+
+def parse_node_block(data: bytes) -> Optional[Tuple[object, object]]:
+    """Parse a block of node data lines in one batch.
+
+    The block is parsed by the _tokenizer extension if it was built,
+    otherwise it's handed to numpy as comma-separated text,
+    instead of splitting and converting each line in Python.
+
+    :param data: Node data lines without blank lines.
+    :return: Two-element tuple containing a (N,) array of node numbers,
+             and a (N, 3) array of node coordinates.
+             None if numpy isn't installed or the block isn't regular,
+             in which case lines should be parsed one at a time.
+    """
+    if np is None:
+        return None
+    if _tokenizer is not None:
+        parsed_block = tokenize_node_block(data)
+        if parsed_block is not None:
+            return parsed_block
+    data = data.rstrip()
+    if not data:
+        return None
+    commas_per_line, _ = count_commas_per_line(data)
+    if np.any(commas_per_line != 3):
+        return None
+    values = parse_numbers(data.replace(b'\n', b','), np.float64)
+    if values is None or len(values) != 4 * len(commas_per_line):
+        return None
+    # Node numbers are parsed again as integers, as float64 can't hold every int64.
+    node_numbers = parse_numbers(get_first_fields(data), np.int64)
+    if node_numbers is None or len(node_numbers) != len(commas_per_line):
+        return None
+    return node_numbers, np.ascontiguousarray(values.reshape(-1, 4)[:, 1:])
+
+
+def parse_element_block(data: bytes) -> Optional[Tuple[object, object]]:
+    """Parse a block of element data lines in one batch.
+
+    Continuation lines are joined onto the line they continue,
+    and empty fields are read as 0.
+    The block is parsed by the _tokenizer extension if it was built.
+
+    :param data: Element data lines without blank lines.
+    :return: Two-element tuple containing a (M,) array of element numbers,
+             and a (M, k) array of node numbers.
+             None if numpy isn't installed or the block isn't regular,
+             in which case lines should be parsed one at a time.
+    """
+    if np is None:
+        return None
+    if _tokenizer is not None:
+        parsed_block = tokenize_element_block(data)
+        if parsed_block is not None:
+            return parsed_block
+    data = remove_whitespace(data.rstrip())
+    if not data:
+        return None
+    commas_per_line, continued = count_commas_per_line(data)
+    if np.any(commas_per_line - continued >= MAX_ELEMENT_DATA_LINE_PARTS):
+        return None
+    data = fill_empty_fields(data.replace(b',\n', b',').rstrip(b','))
+    fields_per_record = count_commas_per_line(data)[0] + 1
+    num_fields = fields_per_record[0]
+    if np.any(fields_per_record != num_fields):
+        return None
+    values = parse_numbers(data.replace(b'\n', b','), np.int64)
+    if values is None or len(values) != num_fields * len(fields_per_record):
+        return None
+    values = values.reshape(-1, num_fields)
+    return values[:, 0].copy(), np.ascontiguousarray(values[:, 1:])
+
+
+def tokenize_node_block(data: bytes) -> Optional[Tuple[object, object]]:
+    """Parse a block of node data lines with the _tokenizer extension.
+
+    :param data: Node data lines without blank lines.
+    :return: Same as parse_node_block.
+    """
+    num_lines = data.count(b'\n') + 1
+    node_numbers = np.empty(num_lines, dtype=np.int64)
+    node_coordinates = np.empty((num_lines, 3), dtype=np.float64)
+    num_nodes = _tokenizer.parse_node_block(data, node_numbers, node_coordinates)
+    if not num_nodes:
+        return None
+    return node_numbers[:num_nodes], node_coordinates[:num_nodes]
+
+
+def tokenize_element_block(data: bytes) -> Optional[Tuple[object, object]]:
+    """Parse a block of element data lines with the _tokenizer extension.
+
+    :param data: Element data lines without blank lines.
+    :return: Same as parse_element_block.
+    """
+    num_lines = data.count(b'\n') + 1
+    element_numbers = np.empty(num_lines, dtype=np.int64)
+    # Every field is on a line and followed by a comma, except the last on each line.
+    connectivity = np.empty(data.count(b',') + num_lines, dtype=np.int64)
+    shape = _tokenizer.parse_element_block(data, element_numbers, connectivity)
+    if shape is None:
+        return None
+    num_elements, nodes_per_element = shape
+    return (element_numbers[:num_elements],
+            connectivity[:num_elements * nodes_per_element].reshape(
+                num_elements, nodes_per_element))
+
+
+def remove_whitespace(data: bytes) -> bytes:
+    """Remove white-space other than newlines from text.
+
+    :param data: Text.
+    :return: Text without spaces, tabs, or carriage returns.
+    """
+    return data.replace(b' ', b'').replace(b'\t', b'').replace(b'\r', b'')
+
+
+def fill_empty_fields(data: bytes) -> bytes:
+    """Fill empty fields in comma-separated text with 0.
+
+    :param data: Comma-separated text without white-space other than newlines,
+                 or trailing commas.
+    :return: Text with a 0 in place of each empty field.
+    """
+    if data.startswith(b','):
+        data = b'0' + data
+    if b'\n,' in data:
+        data = data.replace(b'\n,', b'\n0,')
+    while b',,' in data:
+        data = data.replace(b',,', b',0,')
+    return data
+
+
+def count_commas_per_line(data: bytes) -> Tuple[object, object]:
+    """Count commas on each line of text without splitting it into lines.
+
+    :param data: Text without a trailing newline.
+    :return: Two-element tuple containing an array with the number of commas on each line,
+             and a boolean array of whether each line ends with a comma.
+    """
+    chars = np.frombuffer(data, dtype=np.uint8)
+    line_ends = np.append(np.flatnonzero(chars == NEWLINE), len(chars))
+    comma_positions = np.flatnonzero(chars == COMMA)
+    commas_before_line_end = np.searchsorted(comma_positions, line_ends)
+    commas_per_line = np.diff(commas_before_line_end, prepend=0)
+    ends_with_comma = chars[line_ends - 1] == COMMA
+    return commas_per_line, ends_with_comma
+
+
+def get_first_fields(data: bytes) -> bytes:
+    """Get the first field of each line of comma-separated text.
+
+    :param data: Comma-separated text without a trailing newline,
+                 with a comma on every line.
+    :return: First fields of lines, separated by commas.
+    """
+    chars = np.frombuffer(data, dtype=np.uint8)
+    line_starts = np.append(0, np.flatnonzero(chars == NEWLINE) + 1)
+    comma_positions = np.flatnonzero(chars == COMMA)
+    first_commas = comma_positions[np.searchsorted(comma_positions, line_starts)]
+    # Positions from the start of each line up to and including its first comma.
+    lengths = first_commas + 1 - line_starts
+    ends = np.cumsum(lengths)
+    positions = np.arange(ends[-1]) + np.repeat(line_starts - (ends - lengths), lengths)
+    return chars[positions].tobytes()[:-1]
+
+
+def parse_numbers(data: bytes, dtype) -> Optional[object]:
+    """Parse comma-separated numbers into a one-dimensional array.
+
+    :param data: Comma-separated numbers.
+    :param dtype: numpy data type of the numbers.
+    :return: Array of numbers, or None if data contains something other than numbers.
+    """
+    # numpy.fromstring only accepts read-only buffers, unlike slices of bytearray sources.
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    with warnings.catch_warnings():
+        # numpy warns, rather than raises, on text it can't parse.
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(data, dtype=dtype, sep=',')
+        except (DeprecationWarning, ValueError):
+            return None
+
+
+def split_data_lines(data: bytes, encoding: str) -> List[str]:
+    """Split a data block into lines stripped of surrounding white-space.
+
+    :param data: Data lines without blank lines.
+    :param encoding: Encoding of data.
+    :return: Data lines.
+    """
+    return [line.strip() for line in data.decode(encoding).splitlines()]
+
+
+__all__ = ['parse_element_block', 'parse_node_block', 'split_data_lines']
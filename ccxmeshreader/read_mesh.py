@@ -1,16 +1,109 @@
 import os
-from collections import defaultdict
-from typing import Callable, Dict, List, Set, Tuple
-import re
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+from functools import partial
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (Any, Callable, Dict, Iterable, Iterator, List,
+                    NamedTuple, Optional, Set, Tuple, TypeVar, Union)
+from .decompression import is_compressed_file
+from .element_set import ElementSet
+from .keyword_handlers import (KeywordHandler, ReaderState, get_keyword_handler,
+                               normalize_keyword, register_keyword_handler)
+from .mesh_builder import get_mesh_builder
+from .mesh_records import (Elastic, Element, ElementBlock, ElementSetMembers,
+                           ElementSetRange, IncludeEnd, IncludeStart, Material,
+                           Node, NodeBlock)
+from .mapped_file_reader import (ENCODING, IncludeResolver, MappedFileReader,
+                                 Source, read_buffer)
+from .parse_data_block import (parse_element_block, parse_node_block,
+                               split_data_lines)
 from .parser_error import ParserError
+from .renumbering import renumber_mesh
+from .read_stats import (KEYWORD_BY_DATA_TYPE, KEYWORD_BY_RECORD_TYPE,
+                         ReadStats, count_items)
+from .selection import MeshSelection
+from .streaming_file_reader import FileReader, open_file_reader
 
 try:
     from typing import TypedDict  # >=3.8
     MeshType = TypedDict
-except ImportError:
-    from typing import NamedTuple  # <=3.7
+except ImportError:  # <=3.7
     MeshType = NamedTuple
 
+# Minimum size of a data block to parse in another process.
+PARALLEL_DATA_BLOCK_BYTES = 1 << 16
+
+MeshRecord = Union[Node, NodeBlock, Element, ElementBlock,
+                   ElementSetMembers, ElementSetRange,
+                   Material, Elastic, IncludeStart, IncludeEnd]
+
+
+class DataBlock(NamedTuple):
+    """Unparsed *NODE, *ELEMENT, or *ELSET data lines.
+
+    data is None when the block is sent to another process,
+    which reads it from path between the start and end offsets.
+    path is None when the block isn't read from a file.
+    """
+    path: Optional[str]
+    start: int
+    end: int
+    data: Optional[bytes]
+    data_type: str
+    line_num: int
+    element_type: str
+    element_set: Optional[str]
+    generate: bool
+
+
+ParsedRecords = TypeVar('ParsedRecords')
+
+
+class RepeatedIncludeCache:
+    """Records parsed from data blocks of files included more than once.
+
+    Blocks of an included file are cached from its second inclusion on,
+    and reused by later inclusions,
+    so records of files included once aren't kept.
+    """
+
+    def __init__(self):
+        self.include_counts = Counter()
+        # Paths of files being included, innermost last.
+        self.include_stack = []
+        self.records_by_block = {}
+
+    def add_record(self, record: MeshRecord) -> None:
+        """Tracks the file being read.
+
+        :param record: Record from iter_records, other than a data block.
+        """
+        record_type = type(record)
+        if record_type is IncludeStart:
+            self.include_stack.append(record.path)
+            self.include_counts[record.path] += 1
+        elif record_type is IncludeEnd:
+            self.include_stack.pop()
+
+    def get_records(self,
+                    block: DataBlock,
+                    parse_block: Callable[[DataBlock], ParsedRecords]) -> ParsedRecords:
+        """Gets the records of a data block, parsing it unless it's cached.
+
+        :param block: Data block from iter_records.
+        :param parse_block: Parses a data block.
+                            Its result must be reusable, such as a list or future of records.
+        :return: Result of parse_block for the block.
+        """
+        if not self.include_stack or self.include_counts[self.include_stack[-1]] < 2:
+            return parse_block(block)
+        key = (self.include_stack[-1], block._replace(data=None))
+        records = self.records_by_block.get(key)
+        if records is None:
+            records = self.records_by_block[key] = parse_block(block)
+        return records
+
 
 class Mesh(MeshType):
     node_coordinates_by_number: Dict[int, Tuple[float, float, float]]
@@ -18,7 +111,25 @@ class Mesh(MeshType):
     element_set_by_name: Dict[str, Set[int]]
 
 
-def read_mesh(path: str) -> Mesh:
+class ArrayMesh(MeshType):
+    node_numbers: Any  # numpy.ndarray of shape (N,) and dtype int64
+    node_coordinates: Any  # numpy.ndarray of shape (N, 3) and dtype float64
+    element_numbers_by_type: Dict[str, Any]  # (M,) int64 per type
+    element_connectivity_by_type: Dict[str, Any]  # (M, k) int64 per type
+    element_set_by_name: Dict[str, Set[int]]
+
+
+def read_mesh(path: Source,
+              backend: str = 'dict',
+              workers: Optional[int] = None,
+              compact_element_sets: bool = False,
+              include_resolver: Optional[IncludeResolver] = None,
+              stats: Optional[ReadStats] = None,
+              include: Optional[Iterable[str]] = None,
+              element_types: Optional[Iterable[str]] = None,
+              element_sets: Optional[Iterable[str]] = None,
+              renumber: bool = False,
+              directory: Optional[str] = None) -> Union[Mesh, ArrayMesh]:
     """Reads a CalculiX input file.
 
     Nodes are returned in a dictionary under the node_coordinates_by_number key,
@@ -34,181 +145,790 @@ def read_mesh(path: str) -> Mesh:
     where the key is the name of the element set,
     and value is a set of element numbers.
 
-    :param path: Path to CalculiX input file.
+    When backend is 'numpy', nodes and elements are instead returned as arrays.
+    Node numbers are under the node_numbers key,
+    and coordinates are a (N, 3) array under the node_coordinates key.
+    Element numbers and fixed-width (M, k) connectivity arrays
+    are under the element_numbers_by_type and element_connectivity_by_type keys,
+    where the key is the element type.
+    Rows of connectivity line up with element numbers.
+
+    When backend is 'memmap', arrays are the same as for 'numpy',
+    but are written to .npy files in directory in chunks while reading,
+    and returned as read-only memory maps of the files,
+    so meshes larger than memory can be read.
+    Element sets are sorted arrays of element numbers, also written to directory.
+    load_mapped_mesh opens the written mesh again without reading the file.
+
+    When compact_element_sets is True, element sets are instead ElementSet objects,
+    which store runs of consecutive element numbers rather than each number,
+    and support the same membership tests and set operations as set.
+
+    The file may instead be read from memory,
+    by passing its contents as bytes or a memoryview,
+    or a binary or text file-like object to read it from.
+
+    Parts of the mesh may be selected with include, element_types, and element_sets,
+    so data lines of other sections are skipped without being parsed or kept.
+    When elements are selected by type or element set,
+    only nodes referenced by the elements read are kept.
+
+    When renumber is True, node numbers in element connectivity are replaced by dense node indices,
+    into node_numbers, and the node_coordinates of the 'numpy' backend.
+    Dense lookup arrays from numbers to indices are under the node_index_by_number
+    and element_index_by_number keys, where entries are -1 for numbers without a node or element.
+    element_numbers are the numbers of elements by index,
+    which are ordered by type, then in file order.
+
+    :param path: Path to CalculiX input file, its contents, or a file-like object.
+    :param backend: 'dict' (default), 'numpy', or 'memmap'.
+                    The 'numpy' and 'memmap' backends require numpy.
+    :param workers: Number of processes to parse data blocks with.
+                    If None (default) or 1, data blocks are parsed in this process.
+    :param compact_element_sets: Whether to return element sets as ElementSet objects.
+    :param include_resolver: Called with the INPUT of each *INCLUDE,
+                             and the path of the file being read, or None if it isn't read from a path,
+                             to get a path, contents, or file-like object to read.
+                             Defaults to resolve_include.
+    :param stats: Collects time spent, and lines, bytes, and items read, per keyword and file.
+                  With workers, time spent parsing in other processes isn't collected.
+    :param include: Parts of the mesh to read,
+                    among 'nodes', 'elements', 'element_sets', and 'materials'.
+                    Defaults to every part.
+    :param element_types: Types of elements to read, such as 'C3D10'.
+                          Defaults to every type.
+    :param element_sets: Names of element sets to read, whose members are the only elements read.
+                         Element sets are resolved by a first pass over the file,
+                         parsing only *ELSET sections, and *ELEMENT sections with ELSET,
+                         so element sets they reference needn't be selected.
+                         Defaults to every element set, and every element.
+                         Unless element sets are selected, they're read from *ELEMENT sections
+                         with ELSET, even if their elements aren't, unless 'element_sets' isn't included.
+    :param renumber: Whether to add dense lookup arrays, and give connectivity in node indices.
+                     Requires numpy.
+    :param directory: Directory to write arrays to for the 'memmap' backend, which is created if needed.
+    :raises ValueError: When backend or a part to include is unknown,
+                        or backend is 'memmap' without a directory,
+                        or with renumber, element_types, or element_sets.
     :return: a dictionary with nodes, elements, and element sets.
     """
-    result = {
-        'node_coordinates_by_number': {},
-        'element_dict_by_type': defaultdict(dict),
-        'element_set_by_name': defaultdict(set),
-        'materials': []
-    }
-    with open(path, 'r') as f:
-        line_num = 1
+    selection = get_selection(include, element_types, element_sets)
+    if backend == 'memmap' and (renumber or (selection is not None and
+                                             selection.referenced_nodes_only)):
+        # Both replace arrays after they're written, so they'd differ from load_mapped_mesh.
+        raise ValueError(
+            "backend='memmap' doesn't support renumber, or selecting elements by type or element set.")
+    if selection is not None and selection.element_sets is not None:
+        path = resolve_element_sets(path, include_resolver, selection)
+    if workers is not None and workers > 1:
+        records = iter_mesh_in_parallel(path, workers, include_resolver, stats, selection)
+    else:
+        records = iter_selected_mesh(path, True, include_resolver, stats, selection)
+    mesh = build_mesh(records, backend, compact_element_sets, stats, directory)
+    if selection is not None:
+        selection.keep_referenced_nodes(mesh)
+    if renumber:
+        renumber_mesh(mesh)
+    return mesh
+
+
+def get_selection(include: Optional[Iterable[str]] = None,
+                  element_types: Optional[Iterable[str]] = None,
+                  element_sets: Optional[Iterable[str]] = None) -> Optional[MeshSelection]:
+    """Gets the parts of a mesh to read, or None to read every part.
+
+    :raises ValueError: When a part to include is unknown.
+    """
+    if include is None and element_types is None and element_sets is None:
+        return None
+    return MeshSelection(include, element_types, element_sets)
+
+
+def resolve_element_sets(path: Source,
+                         include_resolver: Optional[IncludeResolver],
+                         selection: MeshSelection) -> Source:
+    """Reads every element set of a file, resolving references to other element sets,
+    so elements can be selected by element set.
+
+    Only *ELSET sections, and *ELEMENT sections with ELSET, are parsed,
+    and only for their element numbers.
+
+    :param path: Path to CalculiX input file, its contents, or a file-like object.
+    :param include_resolver: Resolves *INCLUDE files. See read_mesh.
+    :param selection: Selection to resolve element sets of.
+    :raises ParserError: When an element set references an undefined element set.
+    :return: Source to read the file from again,
+             which is the contents of file-like objects, as they can only be read once.
+    """
+    if hasattr(path, 'read'):
+        path = read_buffer(path)
+    element_set_by_name = defaultdict(ElementSet)
+    records = iter_selected_mesh(path, True, include_resolver, None,
+                                 MeshSelection(include=('element_sets',)))
+    for record in records:
+        add_record(record, None, element_set_by_name, [])
+    selection.resolve_element_sets(element_set_by_name)
+    return path
+
+
+def build_mesh(records: Iterable[MeshRecord],
+               backend: str = 'dict',
+               compact_element_sets: bool = False,
+               stats: Optional[ReadStats] = None,
+               directory: Optional[str] = None) -> Union[Mesh, ArrayMesh]:
+    """Builds a mesh from records in file order.
+
+    :param records: Records from iter_mesh.
+    :param backend: 'dict' (default), 'numpy', or 'memmap'.
+    :param compact_element_sets: Whether to build element sets as ElementSet objects.
+    :param stats: Collects time spent adding records, and items added, per keyword.
+    :param directory: Directory to write arrays to for the 'memmap' backend.
+    :raises ValueError: When backend is unknown, or is 'memmap' without a directory.
+    :return: a dictionary with nodes, elements, and element sets.
+    """
+    builder = get_mesh_builder(backend, directory)
+    # Element sets of the 'memmap' backend are kept as runs until they're written.
+    compact_element_sets = compact_element_sets or backend == 'memmap'
+    element_set_by_name = defaultdict(ElementSet if compact_element_sets else set)
+    materials = []
+    try:
+        if stats is None:
+            for record in records:
+                add_record(record, builder, element_set_by_name, materials)
+        else:
+            for record in records:
+                start = time.perf_counter()
+                add_record(record, builder, element_set_by_name, materials)
+                keyword = KEYWORD_BY_RECORD_TYPE.get(type(record))
+                stats.add_build(keyword, time.perf_counter() - start,
+                                count_items(record) if keyword else 0)
+    except BaseException:
+        if backend == 'memmap':
+            builder.discard()
+        raise
+    start = time.perf_counter()
+    if backend == 'memmap':
+        try:
+            mesh = builder.build(element_set_by_name, materials)
+        except BaseException:
+            builder.discard()
+            raise
+    else:
+        mesh = builder.build()
+        mesh['element_set_by_name'] = element_set_by_name
+        mesh['materials'] = materials
+    if stats is not None:
+        stats.add_build(None, time.perf_counter() - start)
+    return mesh
+
+
+def add_record(record: MeshRecord,
+               builder,
+               element_set_by_name: Dict[str, Set[int]],
+               materials: List[dict]) -> None:
+    """Adds a record to the mesh being read.
 
-        # mutable variables
-        data_type_to_read = ''
-        previous_element_number = None
-        element_type = ''
-        element_set = ''
-        generate_element = False
-        include_file = None
-        prev_line_num = None
-        # If None, then don't read keyword lines as part of current *MATERIAL definition.
-        material_index = None
-
-        line = True
-        while line:
-            if include_file:
-                line = include_file.readline()
-                if line == '':
-                    include_file.close()
-                    include_file = None
-                    line_num = prev_line_num + 1
-                    line = f.readline()
+    Records must be added in file order,
+    as element sets may reference previously defined element sets,
+    and material properties belong to the last material.
+
+    :param record: Record from iter_mesh.
+    :param builder: Mesh builder to add nodes and elements to.
+    :param element_set_by_name: Element sets by name, either set or ElementSet objects.
+    :param materials: Materials.
+    """
+    record_type = type(record)
+    if record_type is NodeBlock:
+        builder.add_node_block(record.node_numbers, record.node_coordinates)
+    elif record_type is Node:
+        builder.add_node(record.number, record.coordinates)
+    elif record_type is ElementBlock:
+        builder.add_element_block(
+            record.type, record.element_numbers, record.connectivity)
+        if record.element_set:
+            element_set = element_set_by_name[record.element_set]
+            if isinstance(element_set, ElementSet):
+                element_set.update(record.element_numbers)
             else:
-                line = f.readline()
+                element_set.update(record.element_numbers.tolist())
+    elif record_type is Element:
+        builder.add_element(record.type, record.number, record.node_numbers)
+        if record.element_set:
+            element_set_by_name[record.element_set].add(record.number)
+    elif record_type is ElementSetMembers:
+        add_element_set_members(record, element_set_by_name)
+    elif record_type is ElementSetRange:
+        # A range with a step of 1 is stored as a single run by ElementSet.
+        element_set_type = type(element_set_by_name[record.name])
+        element_set_by_name[record.name] = element_set_type(
+            range(record.start, record.end + 1, record.step))
+    elif record_type is Material:
+        materials.append({'name': record.name})
+    elif record_type is Elastic:
+        elastic = {}
+        if record.type == 'ISO':
+            elastic['type'] = record.type
+            elastic['youngs_modulus'] = record.youngs_modulus
+            elastic['poissons_ratio'] = record.poissons_ratio
+        materials[-1]['elastic'] = elastic
+
+
+def iter_mesh(path: Source,
+              blocks: bool = False,
+              include_resolver: Optional[IncludeResolver] = None,
+              stats: Optional[ReadStats] = None,
+              include: Optional[Iterable[str]] = None,
+              element_types: Optional[Iterable[str]] = None,
+              element_sets: Optional[Iterable[str]] = None) -> Iterator[MeshRecord]:
+    """Iterates over the records of a CalculiX input file as they're read.
+
+    Unlike read_mesh, nothing is kept after a record is yielded,
+    so arbitrarily large files can be read with constant memory.
+
+    Records are named tuples from ccxmeshreader.mesh_records:
+    Node, Element, ElementSetMembers, ElementSetRange,
+    Material, Elastic, IncludeStart, and IncludeEnd.
+
+    Element records are yielded once all continuation lines are read.
+    Element set members may reference previously defined element sets by name,
+    which are left for the caller to resolve.
+
+    :param path: Path to CalculiX input file, its contents, or a file-like object.
+    :param blocks: If True and numpy is installed, yield NodeBlock and ElementBlock records
+                   containing arrays for batches of data lines,
+                   instead of a Node or Element record per node or element.
+    :param include_resolver: Resolves *INCLUDE files. See read_mesh.
+    :param stats: Collects time spent reading lines and parsing data blocks,
+                  and lines and bytes read, per keyword and file.
+    :param include: Parts of the mesh to read. See read_mesh.
+                    Records of other parts aren't yielded, and their data lines aren't parsed.
+    :param element_types: Types of elements to read. See read_mesh.
+    :param element_sets: Names of element sets to read. See read_mesh.
+                         Unlike read_mesh, every node is yielded.
+                         Each element set is yielded first, as one ElementSetMembers record
+                         with references resolved.
+    :raises ValueError: When a part to include is unknown.
+    :return: Iterator of records.
+    """
+    selection = get_selection(include, element_types, element_sets)
+    if selection is not None and selection.element_sets is not None:
+        path = resolve_element_sets(path, include_resolver, selection)
+    yield from iter_selected_mesh(path, blocks, include_resolver, stats, selection)
+
+
+def iter_selected_mesh(path: Source,
+                       blocks: bool,
+                       include_resolver: Optional[IncludeResolver],
+                       stats: Optional[ReadStats],
+                       selection: Optional[MeshSelection]) -> Iterator[MeshRecord]:
+    """Iterates over the records of a CalculiX input file as they're read. See iter_mesh.
+
+    :param selection: Parts of the mesh to read, with element sets resolved if selected.
+    """
+    if selection is not None:
+        yield from selection.iter_element_set_records()
+    repeated_includes = RepeatedIncludeCache()
+    records = iter_records(path, include_resolver, stats, selection)
+
+    def parse_block(block: DataBlock) -> List[MeshRecord]:
+        records = iter_data_records(block, blocks)
+        return list(records if selection is None else selection.filter_records(records))
+
+    if stats is not None:
+        records = iter_timed(records, stats)
+        parse_block = partial(parse_block_timed, parse_block, stats)
+    for record in records:
+        if type(record) is DataBlock:
+            yield from repeated_includes.get_records(record, parse_block)
+        else:
+            repeated_includes.add_record(record)
+            yield record
+
+
+def iter_mesh_in_parallel(path: Source,
+                          workers: int,
+                          include_resolver: Optional[IncludeResolver] = None,
+                          stats: Optional[ReadStats] = None,
+                          selection: Optional[MeshSelection] = None) -> Iterator[MeshRecord]:
+    """Iterates over the records of a CalculiX input file,
+    parsing data blocks in a pool of processes.
+
+    Keyword lines are read in this process,
+    while data blocks at least PARALLEL_DATA_BLOCK_BYTES long
+    are sent to the pool by file offset, and parsed in one pass.
+    Data blocks not read from a file, or read from a compressed file, are sent with their data.
+    Records are yielded in file order.
+
+    :param path: Path to CalculiX input file, its contents, or a file-like object.
+    :param workers: Number of processes.
+    :param include_resolver: Resolves *INCLUDE files. See read_mesh.
+    :param stats: Collects time spent reading lines, and lines and bytes read,
+                  per keyword and file.
+    :param selection: Parts of the mesh to read, with element sets resolved if selected.
+    :return: Iterator of records.
+    """
+    # Records, or futures of records, waiting to be yielded in file order.
+    pending = deque()
+    max_pending = 4 * workers
+    # Whether data blocks of each file can be read from it by offset.
+    is_mapped_by_path = {None: False}
+    repeated_includes = RepeatedIncludeCache()
+    if selection is not None:
+        yield from selection.iter_element_set_records()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        def parse_block(block: DataBlock) -> Union[List[MeshRecord], Future]:
+            if block.end - block.start < PARALLEL_DATA_BLOCK_BYTES:
+                return list(iter_data_records(block, True))
+            if block.path not in is_mapped_by_path:
+                is_mapped_by_path[block.path] = not is_compressed_file(block.path)
+            if is_mapped_by_path[block.path]:
+                block = block._replace(data=None)
+            return executor.submit(read_data_block_records, block)
+
+        records = iter_records(path, include_resolver, stats, selection)
+        if stats is not None:
+            records = iter_timed(records, stats)
+        for record in records:
+            if type(record) is DataBlock:
+                pending.append(repeated_includes.get_records(record, parse_block))
+            else:
+                repeated_includes.add_record(record)
+                pending.append([record])
+            while len(pending) > max_pending:
+                yield from get_selected_records(pending.popleft(), selection)
+        while pending:
+            yield from get_selected_records(pending.popleft(), selection)
+
+
+def iter_timed(records: Iterator[Union[MeshRecord, DataBlock]],
+               stats: ReadStats) -> Iterator[Union[MeshRecord, DataBlock]]:
+    """Times reading records from iter_records, excluding time spent by the caller between records."""
+    while True:
+        stats.resume()
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        finally:
+            stats.pause()
+        yield record
+
+
+def parse_block_timed(parse_block: Callable[[DataBlock], List[MeshRecord]],
+                      stats: ReadStats,
+                      block: DataBlock) -> List[MeshRecord]:
+    start = time.perf_counter()
+    records = parse_block(block)
+    stats.add_tokenize(KEYWORD_BY_DATA_TYPE[block.data_type],
+                       time.perf_counter() - start,
+                       sum(map(count_items, records)))
+    return records
+
+
+def get_records(records: Union[List[MeshRecord], Future]) -> List[MeshRecord]:
+    return records.result() if isinstance(records, Future) else records
+
+
+def get_selected_records(records: Union[List[MeshRecord], Future],
+                         selection: Optional[MeshSelection]) -> Iterable[MeshRecord]:
+    records = get_records(records)
+    return records if selection is None else selection.filter_records(records)
+
+
+def read_data_block_records(block: 'DataBlock') -> List[MeshRecord]:
+    """Reads and parses a data block by its file offsets, unless it has data.
+
+    Runs in a worker process of iter_mesh_in_parallel.
+
+    :param block: Data block.
+    :return: Records from the data block.
+    """
+    if block.data is None:
+        with MappedFileReader(block.path) as reader:
+            block = block._replace(data=reader.buffer[block.start:block.end])
+    return list(iter_data_records(block, True))
+
+
+def iter_records(path: Source,
+                 include_resolver: Optional[IncludeResolver] = None,
+                 stats: Optional[ReadStats] = None,
+                 selection: Optional[MeshSelection] = None) -> Iterator[Union[MeshRecord, 'DataBlock']]:
+    """Iterates over the records of a CalculiX input file,
+    yielding *NODE, *ELEMENT, and *ELSET data blocks unparsed.
+
+    Each keyword line is dispatched to the handler registered for its keyword,
+    which handles the data lines after it.
+
+    Files read by *INCLUDE may include other files.
+    A file included more than once is read from disk once,
+    and its contents kept until the iterator is exhausted or closed.
+
+    :param path: Path to CalculiX input file, its contents, or a file-like object.
+    :param include_resolver: Resolves *INCLUDE files. See read_mesh.
+    :param stats: Collects lines and bytes read per keyword and file,
+                  and attributes time to them while iter_timed times the iterator.
+    :param selection: Parts of the mesh to read.
+                      Data blocks of other parts are skipped, rather than yielded.
+    :raises ParserError: When a file includes itself, directly or through other files.
+    :return: Iterator of records and data blocks.
+    """
+    if include_resolver is None:
+        include_resolver = resolve_include
+    # Files included from a path by their real path, kept open to be read again.
+    include_file_by_key = {}
+    # Files being included, innermost last, and the line number to resume each at.
+    include_stack = []
+    # Keyword of the section data lines are read for, by stats.
+    section_keyword = None
+    if stats is not None:
+        stats.open_file()
+    with open_file_reader(path) as f, ExitStack() as include_files:
+        if stats is not None:
+            stats.enter_file(f.name, f.size)
+        include_keys = [get_include_key(f)]
+        line_num = 1
+        state = ReaderState(f.path)
+        while True:
+            line = f.readline()
+            if line == '':
+                if stats is not None:
+                    # Compressed files are streamed, so their size is only known at their end.
+                    stats.set_file_bytes(f.size)
+                if not include_stack:
+                    return
+                if stats is not None:
+                    stats.exit_file()
+                yield IncludeEnd(f.name)
+                if f.path is None:
+                    f.close()
+                include_keys.pop()
+                f, line_num = include_stack.pop()
+                state.path = f.path
+                continue
             stripped_line = line.strip()
-            uppercase_stripped_line = stripped_line.upper()
             if is_comment(stripped_line):
                 continue
-            if stripped_line == '' and data_type_to_read:
-                data_type_to_read = ''
-                previous_element_number = None
-                element_type = ''
-                element_set = ''
-                generate_element = False
-            elif uppercase_stripped_line.startswith('*INCLUDE'):
-                keyword, params = parse_keyword_line(stripped_line)
-                parent_path = os.path.abspath(os.path.join(path, os.pardir))
-                try:
-                    path_to_include_file = os.path.join(
-                        parent_path, params['INPUT'])
-                    include_file = open(path_to_include_file)
-                    prev_line_num = line_num + 1
-                    line_num = 0
-                except KeyError:
-                    raise_parser_error(
-                        '*INCLUDE definition must have INPUT.',
-                        line_num,
-                        stripped_line)
-            elif uppercase_stripped_line.startswith('*MATERIAL'):
-                keyword, params = parse_keyword_line(stripped_line)
-                if 'NAME' not in params:
-                    raise_parser_error(
-                        '*MATERIAL definition must have NAME.',
-                        line_num,
-                        stripped_line)
-                material_index = len(result['materials'])
-                result['materials'].append({'name': params['NAME']})
-            elif is_keyword(uppercase_stripped_line):
+            if stripped_line == '':
+                state.handler = None
+            elif stripped_line.startswith('*'):
                 if stripped_line.endswith(','):
                     raise_parser_error(
                         'Continuation of keyword lines not supported.',
                         line_num,
                         stripped_line)
-                if is_material_keyword(uppercase_stripped_line) and material_index is not None:
-                    keyword, params = parse_keyword_line(uppercase_stripped_line)
-                    if keyword == '*ELASTIC':
-                        elastic_type = 'ISO' if 'TYPE' not in params else params['TYPE']
-                        data_type_to_read = 'elastic:{}'.format(elastic_type)
-                elif is_keyword_with_data(uppercase_stripped_line):
-                    data_type_to_read = get_data_type(uppercase_stripped_line)
-                    keyword, params = parse_keyword_line(stripped_line)
-                    if 'ELSET' in params:
-                        element_set = params['ELSET']
-                    if 'GENERATE' in params:
-                        generate_element = True
-                    if data_type_to_read == 'element':
-                        try:
-                            element_type = params['TYPE']
-                        except KeyError:
-                            raise_parser_error(
-                                '*ELEMENT definition must have TYPE.',
-                                line_num,
-                                stripped_line)
-            elif data_type_to_read:
-                if data_type_to_read == 'node':
-                    node_number, coordinates = parse_node_data_line(
-                        stripped_line, line_num)
-                    result['node_coordinates_by_number'][node_number] = coordinates
-                elif data_type_to_read == 'element':
-                    element_data = parse_element_data_line(
-                        stripped_line, line_num)
-                    if previous_element_number is not None:
-                        result['element_dict_by_type'][element_type][previous_element_number].extend(
-                            element_data)
-                        previous_element_number = None
-                    else:
-                        element_number = element_data[0]
-                        node_numbers = element_data[1:]
-                        result['element_dict_by_type'][element_type][element_number] = node_numbers
-                        if element_set:
-                            result['element_set_by_name'][element_set].add(
-                                element_number)
-                    if stripped_line.endswith(','):
-                        previous_element_number = element_number
-                elif data_type_to_read == 'element_set':
-                    if ',' not in stripped_line:
-                        if stripped_line in result['element_set_by_name']:
-                            result['element_set_by_name'][element_set] = result['element_set_by_name'][stripped_line]
-                        else:
-                            element = int(stripped_line)
-                            result['element_set_by_name'][element_set].add(
-                                element)
-                    else:
-                        parts = stripped_line.split(',')
-                        if generate_element:
-                            num_parts = len(parts)
-                            if not 2 <= num_parts <= 3:
-                                raise_parser_error(
-                                    'GENERATE data line must contain 2 or 3 elements.',
-                                    line_num,
-                                    stripped_line)
-                            if num_parts == 2:
-                                start = int(parts[0])
-                                end = int(parts[1])
-                                elements = {e for e in range(start, end + 1)}
-                                result['element_set_by_name'][element_set] = elements
-                            else:
-                                start = int(parts[0])
-                                end = int(parts[1])
-                                step = int(parts[2])
-                                elements = {e for e in range(
-                                    start, end + 1, step)}
-                                result['element_set_by_name'][element_set] = elements
-                            generate_element = False
-                        else:
-                            if stripped_line.endswith(','):
-                                parts = parts[:-1]
-                            for part in parts:
-                                if part in result['element_set_by_name']:
-                                    if len(result['element_set_by_name'][element_set]) == 0:
-                                        result['element_set_by_name'][element_set] = result['element_set_by_name'][part].copy(
-                                        )
-                                    else:
-                                        result['element_set_by_name'][element_set] = result['element_set_by_name'][element_set].union(
-                                            result['element_set_by_name'][part])
-                                else:
-                                    element = int(part)
-                                    result['element_set_by_name'][element_set].add(
-                                        element)
-                elif data_type_to_read.startswith('elastic'):
-                    elastic_type = data_type_to_read.split(':')[1]
-                    result['materials'][material_index]['elastic'] = {}
-                    if elastic_type == 'ISO':
-                        parts = stripped_line.split(',')
-                        if len(parts) < 2:
-                            raise_parser_error(
-                                '*ELASTIC definition for ISO material must define Young\'s modulus and Poisson\'s ratio.',
-                                line_num,
-                                stripped_line)
-                        result['materials'][material_index]['elastic']['type'] = 'ISO'
-                        result['materials'][material_index]['elastic']['youngs_modulus'] = float(parts[0])
-                        result['materials'][material_index]['elastic']['poissons_ratio'] = float(parts[1])
-                    data_type_to_read = ''
+                keyword, parameters = parse_keyword_line(stripped_line)
+                handler = get_keyword_handler(keyword)
+                if stats is not None:
+                    stats.start_section(normalize_keyword(keyword), f.position - f.line_start)
+                records = handler.keyword_line(state, parameters, line_num, stripped_line)
+                yield from records if selection is None else selection.filter_records(records)
+                if state.handler is handler:
+                    section_keyword = normalize_keyword(keyword)
+                if state.include_path is not None:
+                    if stats is not None:
+                        stats.open_file()
+                    include_file = open_include(
+                        include_resolver(state.include_path, state.path),
+                        state.include_path,
+                        include_file_by_key,
+                        include_files)
+                    state.include_path = None
+                    include_key = get_include_key(include_file)
+                    if include_key in include_keys:
+                        raise_parser_error(
+                            '*INCLUDE cycle: {}.'.format(' -> '.join(
+                                map(str, include_keys[include_keys.index(include_key):] + [include_key]))),
+                            line_num,
+                            stripped_line)
+                    if stats is not None:
+                        stats.enter_file(include_file.name, include_file.size)
+                        if state.handler is not None:
+                            stats.set_keyword(section_keyword)
+                    yield IncludeStart(include_file.name)
+                    include_stack.append((f, line_num + 1))
+                    include_keys.append(include_key)
+                    f = include_file
+                    state.path = f.path
+                    line_num = 0
+            elif state.handler is not None:
+                handler = state.handler
+                if handler.data_type and selection is not None and not selection.includes_block(
+                        handler.data_type,
+                        state.parameters.get('TYPE', ''),
+                        state.parameters.get('ELSET') or None):
+                    start = f.line_start
+                    num_lines = f.skip_data_block()
+                    state.generate = False
+                    if stats is not None:
+                        stats.add_lines(num_lines, f.position - start)
+                    line_num += num_lines - 1
+                elif handler.data_type:
+                    start = f.line_start
+                    data = f.read_data_block()
+                    yield DataBlock(
+                        f.path, start, f.position, data,
+                        handler.data_type, line_num,
+                        state.parameters.get('TYPE', ''),
+                        state.parameters.get('ELSET') or None,
+                        state.generate)
+                    state.generate = False
+                    num_lines = data.rstrip(b'\n').count(b'\n')
+                    if stats is not None:
+                        stats.add_lines(num_lines + 1, len(data))
+                    line_num += num_lines
+                else:
+                    if stats is not None:
+                        stats.add_lines(1, f.position - f.line_start)
+                    records = handler.data_line(state, stripped_line, line_num)
+                    yield from records if selection is None else selection.filter_records(records)
             line_num += 1
-    return result
+
+
+def open_include(source: Source,
+                 name: str,
+                 include_file_by_key: Dict[str, FileReader],
+                 include_files: ExitStack) -> FileReader:
+    """Opens a file to include, reusing it if it was included from the same path before.
+
+    Reused compressed files are decompressed again, as they're streamed.
+
+    :param source: Source from the include resolver.
+    :param name: INPUT of the *INCLUDE, naming sources that aren't paths.
+    :param include_file_by_key: Files included from a path, by get_include_key.
+    :param include_files: Closes files included from a path once reading finishes.
+    :return: Reader positioned at the start of the file.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return open_file_reader(source, name)
+    key = os.path.realpath(source)
+    include_file = include_file_by_key.get(key)
+    if include_file is None:
+        include_file = include_file_by_key[key] = include_files.enter_context(
+            open_file_reader(source))
+    else:
+        include_file.rewind()
+    return include_file
+
+
+def get_include_key(f: FileReader) -> str:
+    """Identifies a file for detecting *INCLUDE cycles.
+
+    :param f: Reader of an included file.
+    :return: Real path of the file, or its name if it isn't read from a path.
+    """
+    return f.name if f.path is None else os.path.realpath(f.path)
+
+
+def resolve_include(include_input: str, path: Optional[str]) -> str:
+    """Resolves the INPUT of an *INCLUDE to a path
+    relative to the directory of the file being read,
+    or the current working directory if it isn't read from a path.
+
+    :param include_input: INPUT of the *INCLUDE.
+    :param path: Path of the file being read, or None.
+    :return: Path of the file to include.
+    """
+    if path is None:
+        return os.path.abspath(include_input)
+    parent_path = os.path.abspath(os.path.join(path, os.pardir))
+    return os.path.join(parent_path, include_input)
+
+
+class IncludeHandler(KeywordHandler):
+    """Reads the file named by INPUT before the next line.
+
+    Data lines in the included file continue the section being read.
+    """
+
+    def keyword_line(self, state, parameters, line_num, stripped_line):
+        if 'INPUT' not in parameters:
+            raise_parser_error(
+                '*INCLUDE definition must have INPUT.',
+                line_num,
+                stripped_line)
+        state.include_path = parameters['INPUT']
+        return ()
+
+
+class MaterialHandler(KeywordHandler):
+
+    def keyword_line(self, state, parameters, line_num, stripped_line):
+        if 'NAME' not in parameters:
+            raise_parser_error(
+                '*MATERIAL definition must have NAME.',
+                line_num,
+                stripped_line)
+        super().keyword_line(state, parameters, line_num, stripped_line)
+        state.material_name = parameters['NAME']
+        return (Material(state.material_name),)
+
+
+class ElasticHandler(KeywordHandler):
+    """Parses the first data line of an *ELASTIC definition within a *MATERIAL."""
+
+    def data_line(self, state, stripped_line, line_num):
+        if state.material_name is None:
+            return ()
+        state.handler = None
+        elastic_type = str(state.parameters.get('TYPE', 'ISO')).upper()
+        return (parse_elastic_data_line(
+            stripped_line, line_num, state.material_name, elastic_type),)
+
+
+class DataBlockHandler(KeywordHandler):
+    """Reads the data lines of a *NODE, *ELEMENT, or *ELSET definition as blocks."""
+
+    def __init__(self, data_type: str):
+        self.data_type = data_type
+
+    def keyword_line(self, state, parameters, line_num, stripped_line):
+        if self.data_type == 'element' and 'TYPE' not in parameters:
+            raise_parser_error(
+                '*ELEMENT definition must have TYPE.',
+                line_num,
+                stripped_line)
+        state.generate = 'GENERATE' in parameters
+        return super().keyword_line(state, parameters, line_num, stripped_line)
+
+
+register_keyword_handler('*INCLUDE', IncludeHandler())
+register_keyword_handler('*MATERIAL', MaterialHandler())
+register_keyword_handler('*ELASTIC', ElasticHandler())
+register_keyword_handler('*NODE', DataBlockHandler('node'))
+register_keyword_handler('*ELEMENT', DataBlockHandler('element'))
+register_keyword_handler('*ELSET', DataBlockHandler('element_set'))
+
+
+def add_element_set_members(members: ElementSetMembers,
+                            element_set_by_name: Dict[str, Set[int]]) -> None:
+    """Adds members from an *ELSET data line to an element set.
+
+    :param members: Element set members.
+    :param element_set_by_name: Element sets by name.
+    :raises ParserError: When a referenced element set isn't defined.
+    """
+    element_set = element_set_by_name[members.name]
+    element_set.update(members.element_numbers)
+    for element_set_name in members.element_set_names:
+        if element_set_name not in element_set_by_name:
+            raise ParserError(
+                '*ELSET {} references undefined element set {}.'.format(
+                    members.name, element_set_name))
+        element_set.update(element_set_by_name[element_set_name])
+
+
+def iter_data_records(block: 'DataBlock', blocks: bool) -> Iterator[MeshRecord]:
+    """Iterates over records from a block of data lines.
+
+    *NODE and *ELEMENT blocks are parsed in one pass
+    when blocks is True and numpy is installed.
+    Otherwise, or if the block isn't regular,
+    lines are parsed one at a time.
+
+    :param block: Data block.
+    :param blocks: Whether to parse *NODE and *ELEMENT blocks in one pass.
+    :return: Iterator of records.
+    """
+    if block.data_type == 'node':
+        parsed_block = parse_node_block(block.data) if blocks else None
+        if parsed_block is not None:
+            yield NodeBlock(*parsed_block)
+            return
+        data_lines = split_data_lines(block.data, ENCODING)
+        for line_num, stripped_line in enumerate(data_lines, block.line_num):
+            yield Node(*parse_node_data_line(stripped_line, line_num))
+    elif block.data_type == 'element':
+        parsed_block = parse_element_block(block.data) if blocks else None
+        if parsed_block is not None:
+            yield ElementBlock(block.element_type, *parsed_block, block.element_set)
+            return
+        element = None
+        data_lines = split_data_lines(block.data, ENCODING)
+        for line_num, stripped_line in enumerate(data_lines, block.line_num):
+            element_data = parse_element_data_line(stripped_line, line_num)
+            if element is not None:
+                element.node_numbers.extend(element_data)
+            else:
+                element = Element(element_data[0], block.element_type,
+                                  element_data[1:], block.element_set)
+            if not stripped_line.endswith(','):
+                yield element
+                element = None
+        if element is not None:
+            yield element
+    else:
+        generate_element = block.generate
+        data_lines = split_data_lines(block.data, ENCODING)
+        for line_num, stripped_line in enumerate(data_lines, block.line_num):
+            yield parse_element_set_data_line(
+                stripped_line, line_num, block.element_set, generate_element)
+            if ',' in stripped_line:
+                generate_element = False
+
+
+def parse_element_set_data_line(element_set_data_line: str,
+                                line_num: int,
+                                element_set: str,
+                                generate: bool) -> Union[ElementSetMembers, ElementSetRange]:
+    """Parse members of an element set from an element set data line.
+
+    :param element_set_data_line: Element set data line stripped of surrounding white-space.
+    :param line_num: Line number.
+    :param element_set: Name of element set.
+    :param generate: Whether the line is start, end, and step of a range of elements.
+    :raises ParserError: When a GENERATE data line doesn't contain 2 or 3 parts.
+    :return: Element set members or range.
+    """
+    parts = element_set_data_line.split(',')
+    if generate and ',' in element_set_data_line:
+        num_parts = len(parts)
+        if not 2 <= num_parts <= 3:
+            raise_parser_error(
+                'GENERATE data line must contain 2 or 3 elements.',
+                line_num,
+                element_set_data_line)
+        start = int(parts[0])
+        end = int(parts[1])
+        step = int(parts[2]) if num_parts == 3 else 1
+        return ElementSetRange(element_set, start, end, step)
+    if element_set_data_line.endswith(','):
+        parts = parts[:-1]
+    element_numbers = []
+    element_set_names = []
+    for part in strip_parts(parts):
+        try:
+            element_numbers.append(int(part))
+        except ValueError:
+            element_set_names.append(part)
+    return ElementSetMembers(element_set, element_numbers, element_set_names)
+
+
+def parse_elastic_data_line(elastic_data_line: str,
+                            line_num: int,
+                            material_name: str,
+                            elastic_type: str) -> Elastic:
+    """Parse elastic properties from the first *ELASTIC data line.
+
+    :param elastic_data_line: Elastic data line stripped of surrounding white-space.
+    :param line_num: Line number.
+    :param material_name: Name of material the properties belong to.
+    :param elastic_type: Upper-cased TYPE parameter of *ELASTIC.
+    :raises ParserError: When an ISO data line doesn't define Young's modulus and Poisson's ratio.
+    :return: Elastic properties.
+    """
+    youngs_modulus = None
+    poissons_ratio = None
+    if elastic_type == 'ISO':
+        parts = elastic_data_line.split(',')
+        if len(parts) < 2:
+            raise_parser_error(
+                '*ELASTIC definition for ISO material must define Young\'s modulus and Poisson\'s ratio.',
+                line_num,
+                elastic_data_line)
+        youngs_modulus = float(parts[0])
+        poissons_ratio = float(parts[1])
+    return Elastic(material_name, elastic_type, youngs_modulus, poissons_ratio)
 
 
 def parse_node_data_line(node_data_line: str, line_num: int) -> Tuple[int, Tuple[float, float, float]]:
@@ -279,43 +999,6 @@ def is_keyword(stripped_line: str) -> bool:
     )
 
 
-def is_material_keyword(uppercase_stripped_line: str) -> bool:
-    """Checks if a line is a keyword definition.
-
-    Keywords in CalculiX input files start with an asterisk '*',
-    and comments start with two asterisks '**'.
-
-    :param uppercase_stripped_line: Upper-cased line without surrounding white-space.
-    :return: True if the line is a keyword definition, False otherwise.
-    """
-    if not is_keyword(uppercase_stripped_line):
-        return False
-    keyword, params = parse_keyword_line(uppercase_stripped_line)
-    keyword_no_whitespace = remove_whitespace(keyword)
-    return keyword_no_whitespace in [
-        '*CONDUCTIVITY',
-        '*CREEP',
-        '*DEFORMATIONPLASTICITY',
-        '*DEPVAR',
-        '*ELASTIC',
-        '*ELECTRICALCONDUCTIVITY',
-        '*EXPANSION',
-        '*FLUIDCONSTANTS',
-        '*HYPERELASTIC',
-        '*HYPERFOAM',
-        '*MAGNETICPERMEABILITY',
-        '*PLASTIC',
-        '*SPECIFICGASCONSTANT',
-        '*SPECIFICHEAT',
-        '*USERMATERIAL'
-    ]
-
-
-def remove_whitespace(string: str) -> str:
-    whitespace_pattern = re.compile(r'\s')
-    return re.sub(whitespace_pattern, '', string)
-
-
 def is_comment(stripped_line: str) -> bool:
     """Checks if a line is a comment.
 
@@ -328,71 +1011,6 @@ def is_comment(stripped_line: str) -> bool:
     return stripped_line.startswith('**')
 
 
-def is_keyword_with_data(uppercase_stripped_line: str) -> bool:
-    """Checks if a line is a keyword definition.
-
-    Keywords in CalculiX input files start with an asterisk '*',
-    and comments start with two asterisks '**'.
-
-    :param uppercase_stripped_line: Upper-cased line without surrounding white-space.
-    :return: True if the line is a keyword definition, False otherwise.
-    """
-    predicates = get_predicate_by_data_type().values()
-    return any([predicate(uppercase_stripped_line) for predicate in predicates])
-
-
-def is_node_definition(uppercase_stripped_line: str) -> bool:
-    """Checks if a line is a node definition.
-
-    :param uppercase_stripped_line: Upper-cased line without surrounding white-space.
-    :return: True if the line is a node definition, False otherwise.
-    """
-    return (
-        uppercase_stripped_line.startswith('*NODE') and not
-        (
-            uppercase_stripped_line.startswith('*NODE FILE') or
-            uppercase_stripped_line.startswith('*NODE OUTPUT') or
-            uppercase_stripped_line.startswith('*NODE PRINT')
-        )
-    )
-
-
-def is_element_definition(uppercase_stripped_line: str) -> bool:
-    """Checks if a line is an element definition.
-
-    :param uppercase_stripped_line: Upper-cased line without surrounding white-space.
-    :return: True if the line is an element definition, False otherwise.
-    """
-    return (
-        uppercase_stripped_line.startswith('*ELEMENT') and not
-        uppercase_stripped_line.startswith('*ELEMENT OUTPUT')
-    )
-
-
-def is_element_set_definition(uppercase_stripped_line: str) -> bool:
-    """Checks if a line is an element set definition.
-
-    :param uppercase_stripped_line: Upper-cased line without surrounding white-space.
-    :return: True if the line is an element set definition, False otherwise.
-    """
-    return uppercase_stripped_line.startswith('*ELSET')
-
-
-def get_data_type(uppercase_stripped_line: str) -> str:
-    predicate_by_data_type = get_predicate_by_data_type()
-    for data_type, predicate in predicate_by_data_type.items():
-        if predicate(uppercase_stripped_line):
-            return data_type
-
-
-def get_predicate_by_data_type() -> Dict[str, Callable[[str], bool]]:
-    return {
-        'node': is_node_definition,
-        'element': is_element_definition,
-        'element_set': is_element_set_definition
-    }
-
-
 def parse_keyword_line(stripped_line: str) -> Tuple[str, dict]:
     """Parses a keyword line for the keyword and any parameters.
 
@@ -414,7 +1032,7 @@ def parse_keyword_line(stripped_line: str) -> Tuple[str, dict]:
             key, value = strip_parts(part.split('='))
             parameters[key.upper()] = value
         else:
-            parameters[part] = True
+            parameters[part.strip().upper()] = True
     return keyword, parameters
 
 
@@ -430,4 +1048,4 @@ def raise_parser_error(msg: str, line_num: int, line: str) -> None:
     raise ParserError(msg)
 
 
-__all__ = ['read_mesh']
+__all__ = ['iter_mesh', 'read_mesh']
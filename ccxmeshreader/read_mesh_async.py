@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from concurrent.futures import Executor
+from typing import AsyncIterator, Iterator, List, Optional, Union
+
+from .mapped_file_reader import IncludeResolver, Source
+from .mesh_builder import get_mesh_builder
+from .read_mesh import (ArrayMesh, DataBlock, Mesh, MeshRecord,
+                        RepeatedIncludeCache, build_mesh, iter_data_records,
+                        iter_records)
+
+# Minimum number of data block bytes to parse in the executor before yielding control.
+ASYNC_BATCH_BYTES = 1 << 20
+
+
+async def read_mesh_async(path: Source,
+                          backend: str = 'dict',
+                          compact_element_sets: bool = False,
+                          executor: Optional[Executor] = None,
+                          include_resolver: Optional[IncludeResolver] = None) -> Union[Mesh, ArrayMesh]:
+    """Reads a CalculiX input file without blocking the event loop.
+
+    The file is read and parsed in an executor, a data block at a time,
+    and the mesh is built there once every record is read.
+    Cancelling the returned coroutine stops reading at the next data block.
+
+    :param path: Path to CalculiX input file, its contents, or a file-like object.
+    :param backend: 'dict' (default) or 'numpy'. See read_mesh.
+    :param compact_element_sets: Whether to return element sets as ElementSet objects.
+    :param executor: Executor to read the file in.
+                     If None (default), the event loop's default executor is used.
+    :param include_resolver: Resolves *INCLUDE files. See read_mesh.
+    :raises ValueError: When backend is unknown.
+    :return: a dictionary with nodes, elements, and element sets.
+    """
+    get_mesh_builder(backend)
+    records = [record async for record in iter_mesh_async(
+        path, True, executor, include_resolver)]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, build_mesh, records, backend, compact_element_sets)
+
+
+async def iter_mesh_async(path: Source,
+                          blocks: bool = False,
+                          executor: Optional[Executor] = None,
+                          include_resolver: Optional[IncludeResolver] = None) -> AsyncIterator[MeshRecord]:
+    """Iterates over the records of a CalculiX input file as they're read,
+    without blocking the event loop.
+
+    Records are the same as iter_mesh.
+    Lines are read and data blocks parsed in an executor,
+    in batches of at least ASYNC_BATCH_BYTES of data lines,
+    and control is yielded to the event loop between batches.
+
+    :param path: Path to CalculiX input file, its contents, or a file-like object.
+    :param blocks: If True and numpy is installed, yield NodeBlock and ElementBlock records.
+                   See iter_mesh.
+    :param executor: Executor to read the file in.
+                     If None (default), the event loop's default executor is used.
+    :param include_resolver: Resolves *INCLUDE files. See read_mesh.
+    :return: Async iterator of records.
+    """
+    loop = asyncio.get_running_loop()
+    records = iter_records(path, include_resolver)
+    repeated_includes = RepeatedIncludeCache()
+    # Keeps the records from being closed while a batch is read in another thread.
+    lock = threading.Lock()
+    try:
+        while True:
+            batch = await loop.run_in_executor(
+                executor, read_record_batch, records, blocks, repeated_includes, lock)
+            if not batch:
+                return
+            for record in batch:
+                yield record
+    finally:
+        await loop.run_in_executor(executor, close_records, records, lock)
+
+
+def read_record_batch(records: Iterator[Union[MeshRecord, DataBlock]],
+                      blocks: bool,
+                      repeated_includes: RepeatedIncludeCache,
+                      lock: threading.Lock) -> List[MeshRecord]:
+    """Reads records, parsing data blocks, until ASYNC_BATCH_BYTES of data blocks are parsed.
+
+    Runs in the executor of iter_mesh_async.
+
+    :param records: Records and data blocks from iter_records.
+    :param blocks: Whether to parse *NODE and *ELEMENT blocks in one pass.
+    :param repeated_includes: Records of files included more than once.
+    :param lock: Lock held while reading records.
+    :return: Records, or an empty list at the end of the file.
+    """
+    batch = []
+    num_bytes = 0
+    with lock:
+        for record in records:
+            if type(record) is not DataBlock:
+                repeated_includes.add_record(record)
+                batch.append(record)
+                continue
+            batch.extend(repeated_includes.get_records(
+                record, lambda block: list(iter_data_records(block, blocks))))
+            num_bytes += record.end - record.start
+            if num_bytes >= ASYNC_BATCH_BYTES:
+                break
+    return batch
+
+
+def close_records(records: Iterator[Union[MeshRecord, DataBlock]],
+                  lock: threading.Lock) -> None:
+    with lock:
+        records.close()
+
+
+__all__ = ['iter_mesh_async', 'read_mesh_async']
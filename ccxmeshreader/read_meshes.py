@@ -0,0 +1,137 @@
+import os
+import threading
+import uuid
+from concurrent.futures import (Executor, Future, ProcessPoolExecutor,
+                                as_completed)
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .mesh_builder import get_mesh_builder
+from .read_mesh import (ArrayMesh, DataBlock, Mesh, MeshRecord, build_mesh,
+                        iter_data_records, iter_records)
+
+
+class IncludeCache:
+    """Records parsed from data blocks of included files, shared between decks.
+
+    Blocks are keyed by the absolute path, modification time, and size of the included file,
+    and by their offsets in it, so a block is parsed once
+    no matter how many decks include it.
+    Concurrent requests for the same block wait for the first to parse it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records_by_key = {}
+
+    def get_records(self, block: DataBlock) -> List[MeshRecord]:
+        """Gets the records of a data block, parsing it if it hasn't been.
+
+        :param block: Data block of an included file.
+        :return: Records from the data block.
+        """
+        path = os.path.abspath(block.path)
+        stat = os.stat(path)
+        key = (block._replace(path=path, data=None), stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            records = self.records_by_key.get(key)
+            is_parser = records is None
+            if is_parser:
+                records = self.records_by_key[key] = Future()
+        if is_parser:
+            try:
+                records.set_result(list(iter_data_records(block, True)))
+            except BaseException as exception:
+                with self.lock:
+                    del self.records_by_key[key]
+                records.set_exception(exception)
+        return records.result()
+
+
+# Cache of included blocks in a worker process, and the batch it belongs to.
+process_include_cache = IncludeCache()
+process_batch_id = None
+
+
+def read_meshes(paths: Iterable[str],
+                executor: Optional[Executor] = None,
+                max_workers: Optional[int] = None,
+                backend: str = 'dict') -> Iterator[Tuple[str, Union[Mesh, ArrayMesh, Exception]]]:
+    """Reads CalculiX input files concurrently.
+
+    Data blocks of files included by more than one deck are parsed once,
+    and their records shared between the decks.
+    With a ThreadPoolExecutor, one cache is shared by every thread.
+    With a ProcessPoolExecutor, each process keeps a cache for the call,
+    so an included file is parsed at most once per process.
+
+    :param paths: Paths to CalculiX input files.
+    :param executor: Executor to read files with.
+                     If None (default), a ProcessPoolExecutor is created for the call,
+                     and shut down when the iterator is exhausted or closed.
+    :param max_workers: Number of processes of the executor created when executor is None.
+                        Defaults to the number of CPUs.
+    :param backend: 'dict' (default) or 'numpy'. See read_mesh.
+    :raises ValueError: When backend is unknown.
+    :return: Iterator of two-element tuples containing path,
+             and mesh, or the exception raised reading it, in the order reading finishes.
+    """
+    get_mesh_builder(backend)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=max_workers) as process_executor:
+            yield from read_meshes(paths, process_executor, backend=backend)
+        return
+    if isinstance(executor, ProcessPoolExecutor):
+        include_cache = None
+        batch_id = uuid.uuid4().hex
+    else:
+        include_cache = IncludeCache()
+        batch_id = None
+    path_by_future = {
+        executor.submit(read_mesh_sharing_includes, path, backend, include_cache, batch_id): path
+        for path in paths
+    }
+    try:
+        for future in as_completed(path_by_future):
+            path = path_by_future[future]
+            exception = future.exception()
+            yield path, exception if exception is not None else future.result()
+    finally:
+        for future in path_by_future:
+            future.cancel()
+
+
+def read_mesh_sharing_includes(path: str,
+                               backend: str,
+                               include_cache: Optional[IncludeCache],
+                               batch_id: Optional[str]) -> Union[Mesh, ArrayMesh]:
+    """Reads a CalculiX input file, sharing records of included data blocks.
+
+    Runs in a worker of read_meshes.
+
+    :param path: Path to CalculiX input file.
+    :param backend: 'dict' or 'numpy'.
+    :param include_cache: Cache shared with other threads,
+                          or None to use the cache of this process for batch_id.
+    :param batch_id: Identifies the call to read_meshes when include_cache is None.
+    :return: a dictionary with nodes, elements, and element sets.
+    """
+    global process_include_cache, process_batch_id
+    if include_cache is None:
+        if batch_id != process_batch_id:
+            process_include_cache = IncludeCache()
+            process_batch_id = batch_id
+        include_cache = process_include_cache
+    return build_mesh(iter_sharing_includes(path, include_cache), backend)
+
+
+def iter_sharing_includes(path: str, include_cache: IncludeCache) -> Iterator[MeshRecord]:
+    for record in iter_records(path):
+        if type(record) is not DataBlock:
+            yield record
+        elif record.path == path:
+            yield from iter_data_records(record, True)
+        else:
+            yield from include_cache.get_records(record)
+
+
+__all__ = ['read_meshes']
@@ -0,0 +1,269 @@
+import time
+from typing import Dict, List, Optional
+
+from .mesh_records import (Elastic, Element, ElementBlock, ElementSetMembers,
+                           ElementSetRange, Material, Node, NodeBlock)
+
+KEYWORD_BY_DATA_TYPE = {
+    'node': '*NODE',
+    'element': '*ELEMENT',
+    'element_set': '*ELSET'
+}
+
+KEYWORD_BY_RECORD_TYPE = {
+    Node: '*NODE',
+    NodeBlock: '*NODE',
+    Element: '*ELEMENT',
+    ElementBlock: '*ELEMENT',
+    ElementSetMembers: '*ELSET',
+    ElementSetRange: '*ELSET',
+    Material: '*MATERIAL',
+    Elastic: '*ELASTIC'
+}
+
+
+class KeywordStats:
+    """Time spent on, and lines, bytes, and items read from, sections of a keyword.
+
+    :ivar sections: Number of keyword lines.
+    :ivar lines: Number of keyword and data lines.
+    :ivar bytes: Number of bytes of keyword and data lines.
+    :ivar items: Number of nodes, elements, element set members, or properties read.
+    :ivar max_block_items: Largest number of items parsed from one data block.
+    :ivar io_seconds: Time spent opening files, and reading and scanning lines.
+                      Opening included files counts toward *INCLUDE.
+    :ivar tokenize_seconds: Time spent parsing data blocks.
+    :ivar build_seconds: Time spent adding parsed records to the mesh.
+    """
+    __slots__ = ('sections', 'lines', 'bytes', 'items', 'max_block_items',
+                 'io_seconds', 'tokenize_seconds', 'build_seconds')
+
+    def __init__(self):
+        self.sections = 0
+        self.lines = 0
+        self.bytes = 0
+        self.items = 0
+        self.max_block_items = 0
+        self.io_seconds = 0.0
+        self.tokenize_seconds = 0.0
+        self.build_seconds = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return self.io_seconds + self.tokenize_seconds + self.build_seconds
+
+    def as_dict(self) -> dict:
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats['seconds'] = self.seconds
+        return stats
+
+
+class FileStats:
+    """Time spent on, and size of, a file read directly or by *INCLUDE.
+
+    :ivar inclusions: Number of times the file was read.
+    :ivar bytes: Size of the file, decompressed if compressed.
+    :ivar lines: Number of keyword and data lines read from the file.
+    :ivar open_seconds: Time spent opening the file, including mapping it.
+                        Compressed files are decompressed as they're read, in io_seconds.
+    :ivar io_seconds: Time spent reading and scanning lines of the file, including opening it.
+    """
+    __slots__ = ('inclusions', 'bytes', 'lines', 'open_seconds', 'io_seconds')
+
+    def __init__(self):
+        self.inclusions = 0
+        self.bytes = 0
+        self.lines = 0
+        self.open_seconds = 0.0
+        self.io_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ReadStats:
+    """Collects where time goes while reading a CalculiX input file.
+
+    Pass an instance as the stats argument of read_mesh, iter_mesh, or build_mesh.
+    Time is split into io (opening files, and reading and scanning lines),
+    tokenize (parsing data blocks), and build (adding parsed records to the mesh),
+    per keyword, and io per file.
+    An instance may be passed to more than one read to accumulate their stats.
+
+    :ivar keywords: Stats by normalized keyword, such as '*NODE'.
+    :ivar files: Stats by path or name of file.
+    :ivar io_seconds: Total time spent opening files, and reading and scanning lines.
+    :ivar tokenize_seconds: Total time spent parsing data blocks.
+    :ivar build_seconds: Total time spent building the mesh,
+                         including time not attributed to a keyword.
+    """
+
+    def __init__(self):
+        self.keywords: Dict[str, KeywordStats] = {}
+        self.files: Dict[str, FileStats] = {}
+        self.io_seconds = 0.0
+        self.tokenize_seconds = 0.0
+        self.build_seconds = 0.0
+        # Keyword and file time is currently attributed to, and since when.
+        self._keyword_stats = None
+        self._file_stats = []
+        self._resumed = None
+
+    def get_keyword_stats(self, keyword: str) -> KeywordStats:
+        keyword_stats = self.keywords.get(keyword)
+        if keyword_stats is None:
+            keyword_stats = self.keywords[keyword] = KeywordStats()
+        return keyword_stats
+
+    def resume(self) -> None:
+        """Starts timing reading lines, until pause is called."""
+        self._resumed = time.perf_counter()
+
+    def pause(self) -> None:
+        """Stops timing reading lines,
+        attributing the time since resume to the current keyword and file."""
+        self._attribute_io()
+        self._resumed = None
+
+    def _attribute_io(self) -> None:
+        if self._resumed is None:
+            return
+        now = time.perf_counter()
+        seconds = now - self._resumed
+        self._resumed = now
+        self.io_seconds += seconds
+        if self._keyword_stats is not None:
+            self._keyword_stats.io_seconds += seconds
+        if self._file_stats:
+            self._file_stats[-1].io_seconds += seconds
+
+    def start_section(self, keyword: str, num_bytes: int) -> None:
+        """Attributes the following time and lines to a keyword, from its keyword line.
+
+        :param keyword: Normalized keyword.
+        :param num_bytes: Number of bytes of the keyword line.
+        """
+        self.set_keyword(keyword)
+        self._keyword_stats.sections += 1
+        self.add_lines(1, num_bytes)
+
+    def set_keyword(self, keyword: str) -> None:
+        """Attributes the following time to a keyword."""
+        self._attribute_io()
+        self._keyword_stats = self.get_keyword_stats(keyword)
+
+    def add_lines(self, num_lines: int, num_bytes: int) -> None:
+        """Adds lines read to the current keyword and file."""
+        if self._keyword_stats is not None:
+            self._keyword_stats.lines += num_lines
+            self._keyword_stats.bytes += num_bytes
+        if self._file_stats:
+            self._file_stats[-1].lines += num_lines
+
+    def open_file(self) -> None:
+        """Attributes the following time to opening a file, until enter_file is called."""
+        self._attribute_io()
+
+    def enter_file(self, name: str, num_bytes: int) -> None:
+        """Attributes the time since open_file, and the following time, to a file that was opened.
+
+        :param name: Path or name of file.
+        :param num_bytes: Size of the file, or the part of it decompressed so far if it's streamed.
+        """
+        file_stats = self.files.get(name)
+        if file_stats is None:
+            file_stats = self.files[name] = FileStats()
+        file_stats.inclusions += 1
+        file_stats.bytes = num_bytes
+        if self._resumed is not None:
+            file_stats.open_seconds += time.perf_counter() - self._resumed
+        self._file_stats.append(file_stats)
+        self._attribute_io()
+
+    def set_file_bytes(self, num_bytes: int) -> None:
+        """Sets the size of the current file, once it's been read to its end.
+
+        :param num_bytes: Size of the file, decompressed if compressed.
+        """
+        if self._file_stats:
+            self._file_stats[-1].bytes = num_bytes
+
+    def exit_file(self) -> None:
+        """Attributes the following time to the file that included the current one."""
+        self._attribute_io()
+        self._file_stats.pop()
+
+    def add_tokenize(self, keyword: str, seconds: float, num_items: int) -> None:
+        """Adds time spent parsing a data block of a keyword."""
+        self.tokenize_seconds += seconds
+        keyword_stats = self.get_keyword_stats(keyword)
+        keyword_stats.tokenize_seconds += seconds
+        keyword_stats.max_block_items = max(keyword_stats.max_block_items, num_items)
+
+    def add_build(self, keyword: Optional[str], seconds: float, num_items: int = 0) -> None:
+        """Adds time spent adding records of a keyword to the mesh.
+
+        :param keyword: Normalized keyword, or None for time not attributed to a keyword.
+        """
+        self.build_seconds += seconds
+        if keyword is not None:
+            keyword_stats = self.get_keyword_stats(keyword)
+            keyword_stats.build_seconds += seconds
+            keyword_stats.items += num_items
+
+    def as_dict(self) -> dict:
+        """Gets the stats as a dictionary of numbers, such as for logging as JSON."""
+        return {
+            'io_seconds': self.io_seconds,
+            'tokenize_seconds': self.tokenize_seconds,
+            'build_seconds': self.build_seconds,
+            'keywords': {keyword: keyword_stats.as_dict()
+                         for keyword, keyword_stats in self.keywords.items()},
+            'files': {name: file_stats.as_dict()
+                      for name, file_stats in self.files.items()}
+        }
+
+    def format(self) -> List[str]:
+        """Formats the stats as a table, slowest keywords and files first.
+
+        :return: Lines of the table.
+        """
+        lines = ['io {:.3f}s, tokenize {:.3f}s, build {:.3f}s'.format(
+            self.io_seconds, self.tokenize_seconds, self.build_seconds)]
+        lines.append('{:<16} {:>8} {:>10} {:>12} {:>10} {:>10} {:>8} {:>8} {:>8}'.format(
+            'keyword', 'sections', 'lines', 'bytes', 'items', 'max block',
+            'io', 'tokenize', 'build'))
+        for keyword, stats in sorted(self.keywords.items(), key=lambda item: -item[1].seconds):
+            lines.append(
+                '{:<16} {:>8} {:>10} {:>12} {:>10} {:>10} {:>7.3f}s {:>7.3f}s {:>7.3f}s'.format(
+                    keyword, stats.sections, stats.lines, stats.bytes, stats.items,
+                    stats.max_block_items, stats.io_seconds, stats.tokenize_seconds,
+                    stats.build_seconds))
+        lines.append('{:<40} {:>10} {:>12} {:>10} {:>8} {:>8}'.format(
+            'file', 'inclusions', 'bytes', 'lines', 'open', 'io'))
+        for name, stats in sorted(self.files.items(), key=lambda item: -item[1].io_seconds):
+            lines.append('{:<40} {:>10} {:>12} {:>10} {:>7.3f}s {:>7.3f}s'.format(
+                name, stats.inclusions, stats.bytes, stats.lines,
+                stats.open_seconds, stats.io_seconds))
+        return lines
+
+
+def count_items(record) -> int:
+    """Counts the nodes, elements, element set members, or properties in a record.
+
+    :param record: Record from iter_mesh.
+    :return: Number of items.
+    """
+    record_type = type(record)
+    if record_type is NodeBlock:
+        return len(record.node_numbers)
+    if record_type is ElementBlock:
+        return len(record.element_numbers)
+    if record_type is ElementSetMembers:
+        return len(record.element_numbers) + len(record.element_set_names)
+    if record_type is ElementSetRange:
+        return len(range(record.start, record.end + 1, record.step))
+    return 1
+
+
+__all__ = ['FileStats', 'KeywordStats', 'ReadStats']
@@ -0,0 +1,101 @@
+from itertools import chain
+from typing import Collection, List
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+
+def renumber_mesh(mesh: dict) -> None:
+    """Adds dense lookup arrays from node and element numbers to indices, and back,
+    and replaces node numbers in element connectivity with node indices.
+
+    Nodes are indexed in the order of node_numbers for the 'numpy' backend,
+    or node_coordinates_by_number for the 'dict' backend.
+    Elements are indexed by type, in the order of the mesh's element types,
+    then in file order within each type.
+
+    Lookup arrays have an entry for every number up to the largest,
+    which is -1 for numbers without a node or element,
+    so their size is that of the largest number rather than the number of nodes or elements.
+
+    :param mesh: Mesh from build_mesh, with either backend, which is modified.
+    :raises ImportError: When numpy isn't installed.
+    """
+    if np is None:
+        raise ImportError(
+            'renumber requires numpy. '
+            'Install it with: pip install ccxmeshreader[numpy]')
+    if 'node_coordinates_by_number' in mesh:
+        node_numbers = np.fromiter(mesh['node_coordinates_by_number'], dtype=np.int64,
+                                   count=len(mesh['node_coordinates_by_number']))
+        connectivity_by_type = {
+            element_type: get_connectivity(element_dict.values())
+            for element_type, element_dict in mesh['element_dict_by_type'].items()
+        }
+        element_numbers = [
+            np.fromiter(element_dict, dtype=np.int64, count=len(element_dict))
+            for element_dict in mesh['element_dict_by_type'].values()
+        ]
+    else:
+        node_numbers = mesh['node_numbers']
+        connectivity_by_type = mesh['element_connectivity_by_type']
+        element_numbers = list(mesh['element_numbers_by_type'].values())
+    element_numbers = (np.concatenate(element_numbers) if element_numbers else
+                       np.empty(0, dtype=np.int64))
+
+    max_node_number = max([get_max(node_numbers)] + [
+        get_max(connectivity) for connectivity in connectivity_by_type.values()])
+    node_index_by_number = get_index_by_number(node_numbers, max_node_number)
+    node_indices_by_type = {
+        element_type: node_index_by_number[np.maximum(connectivity, 0)]
+        for element_type, connectivity in connectivity_by_type.items()
+    }
+
+    if 'node_coordinates_by_number' in mesh:
+        for element_type, element_dict in mesh['element_dict_by_type'].items():
+            node_indices = node_indices_by_type[element_type]
+            if node_indices.ndim == 2:
+                element_dict.update(zip(element_dict, node_indices.tolist()))
+                continue
+            node_indices = node_indices.tolist()
+            offset = 0
+            for element_number, numbers in element_dict.items():
+                element_dict[element_number] = node_indices[offset:offset + len(numbers)]
+                offset += len(numbers)
+    else:
+        mesh['element_connectivity_by_type'] = node_indices_by_type
+    mesh['node_numbers'] = node_numbers
+    mesh['node_index_by_number'] = node_index_by_number
+    mesh['element_numbers'] = element_numbers
+    mesh['element_index_by_number'] = get_index_by_number(
+        element_numbers, get_max(element_numbers))
+
+
+def get_index_by_number(numbers: 'np.ndarray', max_number: int) -> 'np.ndarray':
+    """Gets a dense lookup array from numbers to their index in an array.
+
+    :param numbers: (N,) int64 array of positive numbers.
+    :param max_number: Largest number to look up.
+    :return: (max_number + 1,) int64 array, which is -1 for numbers not in numbers.
+    """
+    index_by_number = np.full(max_number + 1, -1, dtype=np.int64)
+    index_by_number[numbers] = np.arange(len(numbers), dtype=np.int64)
+    return index_by_number
+
+
+def get_max(numbers: 'np.ndarray') -> int:
+    return int(numbers.max()) if numbers.size else 0
+
+
+def get_connectivity(rows: Collection[List[int]]) -> 'np.ndarray':
+    """Gets node numbers of elements as an (M, k) array,
+    or a flat array if elements have different numbers of nodes."""
+    connectivity = np.fromiter(chain.from_iterable(rows), dtype=np.int64)
+    if len(set(map(len, rows))) == 1:
+        return connectivity.reshape(len(rows), -1)
+    return connectivity
+
+
+__all__ = ['renumber_mesh']
@@ -0,0 +1,197 @@
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .connectivity import element_set_to_array
+from .element_set import ElementSet
+from .mesh_records import (Elastic, Element, ElementBlock, ElementSetMembers,
+                           Material)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+# Parts of a mesh which may be passed as include.
+PARTS = ('nodes', 'elements', 'element_sets', 'materials')
+
+
+class MeshSelection:
+    """Parts of a mesh to read, so sections of other parts can be skipped without parsing them.
+
+    Filters combine, so elements are read
+    when the TYPE of their *ELEMENT section is one of element_types,
+    and they're a member of one of element_sets.
+    Element sets are read from *ELEMENT sections with ELSET, even if their elements aren't.
+
+    Elements are selected by element set by number,
+    so element sets must first be resolved by a pass over the file with resolve_element_sets.
+
+    :ivar include: Parts to read, among 'nodes', 'elements', 'element_sets', and 'materials'.
+    :ivar element_types: Types of elements to read, or None to read every type.
+    :ivar element_sets: Names of element sets to read, or None to read every element set.
+    :ivar element_set_by_name: Selected element sets, once resolved.
+    :ivar element_numbers: Members of the selected element sets, once resolved.
+    """
+
+    def __init__(self,
+                 include: Optional[Iterable[str]] = None,
+                 element_types: Optional[Iterable[str]] = None,
+                 element_sets: Optional[Iterable[str]] = None):
+        """
+        :param include: Parts to read. Defaults to every part.
+        :param element_types: Types of elements to read, such as 'C3D10'. Case-insensitive.
+        :param element_sets: Names of element sets to read, such as 'Eall'.
+        :raises ValueError: When include contains an unknown part.
+        """
+        self.include = frozenset(PARTS if include is None else include)
+        unknown_parts = self.include.difference(PARTS)
+        if unknown_parts:
+            raise ValueError(
+                "Unknown part '{}' to include. Expected any of: {}.".format(
+                    sorted(unknown_parts)[0], ', '.join(PARTS)))
+        self.element_types = (None if element_types is None else
+                              frozenset(element_type.upper() for element_type in element_types))
+        self.element_sets = None if element_sets is None else frozenset(element_sets)
+        self.element_set_by_name: Optional[Dict[str, ElementSet]] = None
+        self.element_numbers: Optional[ElementSet] = None
+        # Sorted array of element_numbers, for selecting elements of blocks.
+        self.element_number_array = None
+
+    @property
+    def referenced_nodes_only(self) -> bool:
+        """Whether only nodes referenced by the elements read are kept,
+        which is the case when elements are filtered by type or element set."""
+        return self.element_types is not None or self.element_sets is not None
+
+    def includes_block(self, data_type: str, element_type: str, element_set: Optional[str]) -> bool:
+        """Whether to parse a data block of a *NODE, *ELEMENT, or *ELSET section.
+
+        :param data_type: 'node', 'element', or 'element_set'.
+        :param element_type: TYPE of the section.
+        :param element_set: ELSET of the section, or None.
+        :return: True to parse the block, False to skip it.
+        """
+        if data_type == 'node':
+            return 'nodes' in self.include
+        if data_type == 'element' and self.includes_elements(element_type):
+            return True
+        return self.includes_element_set(element_set)
+
+    def includes_elements(self, element_type: str) -> bool:
+        """Whether to read elements of an *ELEMENT section.
+        When selecting element sets, only their members are kept.
+
+        :param element_type: TYPE of the section.
+        """
+        return ('elements' in self.include and
+                (self.element_types is None or element_type.upper() in self.element_types))
+
+    def includes_element_set(self, element_set: Optional[str]) -> bool:
+        """Whether to read an element set from its *ELEMENT or *ELSET sections.
+        Selected element sets are resolved beforehand instead.
+
+        :param element_set: Name of element set, or None.
+        """
+        return (element_set is not None and 'element_sets' in self.include and
+                self.element_sets is None)
+
+    def resolve_element_sets(self, element_set_by_name: Dict[str, ElementSet]) -> None:
+        """Keeps the selected element sets, so elements are selected by number.
+
+        :param element_set_by_name: Every element set of the file, with references resolved.
+        """
+        self.element_set_by_name = {
+            name: element_set for name, element_set in element_set_by_name.items()
+            if name in self.element_sets
+        }
+        self.element_numbers = ElementSet().union(*self.element_set_by_name.values())
+        if np is not None:
+            self.element_number_array = element_set_to_array(self.element_numbers)
+
+    def iter_element_set_records(self) -> Iterator[ElementSetMembers]:
+        """Iterates over the resolved element sets, if they're included.
+
+        :return: Iterator of records with the members of each selected element set.
+        """
+        if self.element_set_by_name is None or 'element_sets' not in self.include:
+            return
+        for name, element_set in self.element_set_by_name.items():
+            yield ElementSetMembers(name, list(element_set), [])
+
+    def filter_records(self, records: Iterable[Any]) -> Iterator[Any]:
+        """Drops records of parts that aren't read.
+
+        Elements that aren't read, of an element set that is,
+        are replaced by the element set's members.
+
+        :param records: Records from a keyword handler or data block.
+        :return: Iterator of records to yield.
+        """
+        for record in records:
+            record_type = type(record)
+            if record_type is Element or record_type is ElementBlock:
+                if self.element_sets is not None:
+                    if self.includes_elements(record.type):
+                        record = self.select_elements(record)
+                        if record is not None:
+                            yield record
+                elif self.includes_elements(record.type):
+                    yield record
+                elif self.includes_element_set(record.element_set):
+                    element_numbers = ([record.number] if record_type is Element else
+                                       record.element_numbers.tolist())
+                    yield ElementSetMembers(record.element_set, element_numbers, [])
+            elif record_type is Material or record_type is Elastic:
+                if 'materials' in self.include:
+                    yield record
+            else:
+                yield record
+
+    def select_elements(self, record: Any) -> Optional[Any]:
+        """Keeps the elements of a record which are members of the selected element sets.
+
+        The ELSET of the record is dropped, as element sets are resolved beforehand.
+
+        :param record: Element or ElementBlock record.
+        :return: Record of the selected elements, or None if there are none.
+        """
+        if type(record) is Element:
+            if record.number not in self.element_numbers:
+                return None
+            return record._replace(element_set=None)
+        is_selected = np.isin(record.element_numbers, self.element_number_array)
+        if not is_selected.any():
+            return None
+        if not is_selected.all():
+            record = record._replace(element_numbers=record.element_numbers[is_selected],
+                                     connectivity=record.connectivity[is_selected])
+        return record._replace(element_set=None)
+
+    def keep_referenced_nodes(self, mesh: dict) -> None:
+        """Removes nodes not referenced by any element from a mesh,
+        if referenced_nodes_only.
+
+        :param mesh: Mesh from build_mesh, which is modified.
+        """
+        if not self.referenced_nodes_only:
+            return
+        if 'node_coordinates_by_number' in mesh:
+            referenced = set()
+            for element_dict in mesh['element_dict_by_type'].values():
+                for node_numbers in element_dict.values():
+                    referenced.update(node_numbers)
+            node_coordinates_by_number = mesh['node_coordinates_by_number']
+            mesh['node_coordinates_by_number'] = {
+                number: node_coordinates_by_number[number]
+                for number in node_coordinates_by_number if number in referenced
+            }
+        else:
+            node_numbers = mesh['node_numbers']
+            # numpy.isin takes memory in proportion to the arrays, not the largest node number.
+            referenced = [connectivity.ravel()
+                          for connectivity in mesh['element_connectivity_by_type'].values()]
+            mask = np.isin(node_numbers, np.concatenate(referenced) if referenced else [])
+            mesh['node_numbers'] = node_numbers[mask]
+            mesh['node_coordinates'] = mesh['node_coordinates'][mask]
+
+
+__all__ = ['MeshSelection']
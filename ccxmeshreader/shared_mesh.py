@@ -0,0 +1,194 @@
+import sys
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple, Tuple, Union
+
+from .mesh_cache import mesh_to_arrays
+from .parser_error import ParserError
+from .read_mesh import ArrayMesh, Mesh
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+# Alignment of each array within the shared memory segment, in bytes.
+ARRAY_ALIGNMENT = 64
+
+# Keys added by read_mesh with renumber=True.
+RENUMBERING_KEYS = ('node_index_by_number', 'element_numbers', 'element_index_by_number')
+
+
+class SharedArray(NamedTuple):
+    """Location of an array within a shared memory segment."""
+    name: str
+    dtype: str
+    shape: Tuple[int, ...]
+    offset: int
+
+
+class SharedMeshDescriptor(NamedTuple):
+    """Describes a mesh published to shared memory,
+    to pass to other processes instead of the mesh.
+
+    :ivar name: Name of the shared memory segment.
+    :ivar arrays: Arrays in the segment.
+    :ivar metadata: Element types, element set names, and materials.
+    """
+    name: str
+    arrays: Tuple[SharedArray, ...]
+    metadata: dict
+
+
+class SharedMesh:
+    """A mesh in a shared memory segment, which other processes attach to without copying it.
+
+    The publishing process copies the mesh into the segment with publish,
+    and passes the small, picklable descriptor to other processes,
+    which attach to the segment with attach.
+
+    The mesh is in the same form as the 'numpy' backend of read_mesh,
+    with element sets as sorted arrays of element numbers,
+    and arrays are read-only views of the segment.
+
+    :ivar descriptor: Descriptor to pass to attach.
+    :ivar mesh: Mesh, or None once closed.
+    """
+
+    def __init__(self, shared_memory: SharedMemory, descriptor: SharedMeshDescriptor, owner: bool):
+        self.shared_memory = shared_memory
+        self.descriptor = descriptor
+        self.owner = owner
+        self.mesh = arrays_to_shared_mesh(shared_memory, descriptor)
+
+    @classmethod
+    def publish(cls, mesh: Union[Mesh, ArrayMesh]) -> 'SharedMesh':
+        """Copies a mesh into a new shared memory segment.
+
+        The segment is removed when the returned SharedMesh is closed.
+
+        :param mesh: Mesh from read_mesh, with any backend.
+        :raises ImportError: When numpy isn't installed.
+        :raises ParserError: When elements of a type have differing numbers of nodes.
+        :return: Shared mesh owning the segment.
+        """
+        if np is None:
+            raise ImportError(
+                'SharedMesh requires numpy. '
+                'Install it with: pip install ccxmeshreader[numpy]')
+        arrays, metadata = mesh_to_arrays(mesh)
+        for i, element_type in enumerate(metadata['element_types']):
+            offsets = arrays.pop('element_offsets_{}'.format(i))
+            lengths = np.diff(offsets)
+            if len(lengths) and np.any(lengths != lengths[0]):
+                raise ParserError(
+                    'Elements of type {} must all have {} nodes.'.format(
+                        element_type, lengths[0]))
+            element_numbers = arrays['element_numbers_{}'.format(i)]
+            connectivity_name = 'element_connectivity_{}'.format(i)
+            arrays[connectivity_name] = arrays[connectivity_name].reshape(len(element_numbers), -1)
+        for key in RENUMBERING_KEYS:
+            if key in mesh:
+                arrays[key] = mesh[key]
+
+        shared_arrays = []
+        size = 0
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            shared_arrays.append(SharedArray(name, array.dtype.str, array.shape, size))
+            size += -(-array.nbytes // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
+        # Segments can't be empty.
+        shared_memory = SharedMemory(create=True, size=max(size, 1))
+        try:
+            for shared_array, array in zip(shared_arrays, arrays.values()):
+                get_array(shared_memory, shared_array)[...] = array
+            descriptor = SharedMeshDescriptor(shared_memory.name, tuple(shared_arrays), metadata)
+            return cls(shared_memory, descriptor, owner=True)
+        except BaseException:
+            shared_memory.close()
+            shared_memory.unlink()
+            raise
+
+    @classmethod
+    def attach(cls, descriptor: SharedMeshDescriptor) -> 'SharedMesh':
+        """Attaches to a mesh published by another process.
+
+        Before Python 3.13, a process not started by the publishing process
+        removes the segment when it exits, so only attach from such processes,
+        like those of a multiprocessing pool.
+
+        :param descriptor: Descriptor of the published mesh.
+        :raises FileNotFoundError: When the mesh is no longer published.
+        :return: Shared mesh.
+        """
+        if sys.version_info >= (3, 13):
+            shared_memory = SharedMemory(descriptor.name, track=False)
+        else:
+            shared_memory = SharedMemory(descriptor.name)
+        return cls(shared_memory, descriptor, owner=False)
+
+    def close(self) -> None:
+        """Detaches from the segment, and removes it if this process published it.
+
+        Arrays of the mesh must not be referenced elsewhere once closed.
+
+        :raises BufferError: When arrays of the mesh are still referenced.
+        """
+        self.mesh = None
+        try:
+            self.shared_memory.close()
+        finally:
+            if self.owner:
+                self.owner = False
+                self.shared_memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def arrays_to_shared_mesh(shared_memory: SharedMemory, descriptor: SharedMeshDescriptor) -> dict:
+    """Creates a mesh of arrays viewing a shared memory segment.
+
+    :param shared_memory: Shared memory segment.
+    :param descriptor: Descriptor of the arrays in the segment.
+    :return: Mesh.
+    """
+    arrays = {shared_array.name: get_array(shared_memory, shared_array, writeable=False)
+              for shared_array in descriptor.arrays}
+    metadata = descriptor.metadata
+    element_types = metadata['element_types']
+    mesh = {
+        'node_numbers': arrays['node_numbers'],
+        'node_coordinates': arrays['node_coordinates'],
+        'element_numbers_by_type': {
+            element_type: arrays['element_numbers_{}'.format(i)]
+            for i, element_type in enumerate(element_types)
+        },
+        'element_connectivity_by_type': {
+            element_type: arrays['element_connectivity_{}'.format(i)]
+            for i, element_type in enumerate(element_types)
+        },
+        'element_set_by_name': {
+            element_set_name: arrays['element_set_{}'.format(i)]
+            for i, element_set_name in enumerate(metadata['element_set_names'])
+        },
+        'materials': metadata['materials']
+    }
+    for key in RENUMBERING_KEYS:
+        if key in arrays:
+            mesh[key] = arrays[key]
+    return mesh
+
+
+def get_array(shared_memory: SharedMemory,
+              shared_array: SharedArray,
+              writeable: bool = True) -> 'np.ndarray':
+    array = np.ndarray(shared_array.shape, dtype=np.dtype(shared_array.dtype),
+                       buffer=shared_memory.buf, offset=shared_array.offset)
+    array.flags.writeable = writeable
+    return array
+
+
+__all__ = ['SharedMesh', 'SharedMeshDescriptor']
@@ -0,0 +1,230 @@
+import io
+import os
+from typing import BinaryIO, Optional, Union
+
+from .decompression import (DECOMPRESS_CHUNK_BYTES, HEADER_BYTES,
+                            get_decompressing_opener)
+from .mapped_file_reader import (DATA_BLOCK_BYTES, DATA_BLOCK_END_PATTERN,
+                                 ENCODING, MappedFileReader, Source,
+                                 get_source_name, read_buffer)
+
+
+class StreamingFileReader:
+    """Reads lines and data blocks from a file as a stream, decompressing it if it's compressed.
+
+    The stream is read DECOMPRESS_CHUNK_BYTES at a time into a window,
+    which keeps only the bytes from the start of the line or data block being read.
+    Lines and data blocks that continue past the end of a chunk are completed from the next,
+    so neither the decompressed file nor a copy of it on disk is needed,
+    and memory use is bounded by the chunk size and largest data block,
+    which is at most DATA_BLOCK_BYTES unless its lines are continued.
+
+    Offsets are in bytes from the start of the decompressed file,
+    as for MappedFileReader, which this reads the same way.
+
+    :ivar path: Path of the file, or None if the source isn't a path.
+    :ivar name: Path of the file, or a name for the source.
+    """
+
+    def __init__(self, source: Source, name: Optional[str] = None):
+        if isinstance(source, (str, os.PathLike)):
+            self.path = self.name = os.fspath(source)
+            self.buffer = None
+        else:
+            self.path = None
+            self.name = get_source_name(source, name)
+            self.buffer = read_buffer(source)
+        self.file = None
+        self.stream = None
+        self.rewind()
+
+    @property
+    def size(self) -> int:
+        """Number of bytes decompressed so far, which is the size of the file at its end."""
+        return self.window_start + len(self.window)
+
+    def readline(self) -> str:
+        """Reads the next line.
+
+        :return: Line including the trailing newline, or '' at end of file.
+        """
+        start = self.position
+        while True:
+            end = self.window.find(b'\n', start - self.window_start)
+            if end != -1:
+                end += self.window_start + 1
+                break
+            if not self._read_chunk(start):
+                end = self.size
+                break
+        self.line_start = start
+        self.position = end
+        return self._slice(start, end).decode(ENCODING)
+
+    def read_data_block(self) -> bytes:
+        """Reads a data block starting with the last line read.
+
+        The block ends before the next keyword, comment, or blank line,
+        or after DATA_BLOCK_BYTES at the end of a line that isn't continued.
+
+        :return: Data block including the trailing newline, if any.
+        """
+        start = self.line_start
+        search_start = start
+        while True:
+            end = self._find_data_block_end(search_start)
+            if end is not None or self.size - start > DATA_BLOCK_BYTES:
+                batch_end = self._find_batch_end(start + DATA_BLOCK_BYTES,
+                                                 self.size if end is None else end)
+                if batch_end is not None:
+                    end = batch_end
+                if end is not None:
+                    break
+            search_start = self._get_search_start(search_start)
+            if not self._read_chunk(start):
+                end = self.size
+                break
+        self.position = end
+        return bytes(self._slice(start, end))
+
+    def skip_data_block(self) -> int:
+        """Skips a data block starting with the last line read,
+        without keeping more of it than a chunk.
+
+        :return: Number of lines skipped.
+        """
+        search_start = self.line_start
+        num_lines = 0
+        while True:
+            end = self._find_data_block_end(search_start)
+            if end is not None:
+                break
+            # Lines before the search start are counted, and may be dropped from the window.
+            next_search_start = self._get_search_start(search_start)
+            num_lines += self._slice(search_start, next_search_start).count(b'\n')
+            search_start = next_search_start
+            if not self._read_chunk(search_start):
+                end = self.size
+                break
+        num_lines += self._slice(search_start, end).count(b'\n')
+        if self._slice(end - 1, end) != b'\n':
+            num_lines += 1
+        self.position = end
+        return num_lines
+
+    def rewind(self) -> None:
+        """Moves back to the start of the file, to read it again, decompressing it again."""
+        self.close()
+        self.file = open(self.path, 'rb') if self.path is not None else io.BytesIO(self.buffer)
+        self.stream = open_decompressed(self.file)
+        self.window = bytearray()
+        self.window_start = 0
+        self.position = 0
+        self.line_start = 0
+
+    def close(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.file.close()
+            self.stream = self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _slice(self, start: int, end: int) -> bytearray:
+        return self.window[start - self.window_start:end - self.window_start]
+
+    def _read_chunk(self, keep_start: int) -> bool:
+        """Reads the next chunk into the window, dropping bytes before an offset.
+
+        :param keep_start: Offset of the first byte to keep.
+        :return: Whether a chunk was read, rather than the stream having ended.
+        """
+        chunk = self.stream.read(DECOMPRESS_CHUNK_BYTES)
+        if not chunk:
+            return False
+        del self.window[:keep_start - self.window_start]
+        self.window_start = keep_start
+        self.window += chunk
+        return True
+
+    def _find_data_block_end(self, search_start: int) -> Optional[int]:
+        """Finds the end of a data block in the window,
+        before the next keyword, comment, or blank line.
+
+        :param search_start: Offset of the end of a line in the data block, or its start.
+        :return: Offset after the newline ending the last data line,
+                 or None if it isn't in the window.
+        """
+        match = DATA_BLOCK_END_PATTERN.search(self.window, search_start - self.window_start)
+        return None if match is None else self.window_start + match.start() + 1
+
+    def _get_search_start(self, search_start: int) -> int:
+        """Gets where to search for the end of a data block from once the next chunk is read.
+
+        The end may start at the last newline of the window,
+        with the keyword, or white-space and newline, after it still to be read.
+        """
+        newline = self.window.rfind(b'\n', search_start - self.window_start)
+        return search_start if newline == -1 else self.window_start + newline
+
+    def _find_batch_end(self, position: int, end: int) -> Optional[int]:
+        """Finds the end of the first line after position that isn't continued.
+
+        :param position: Offset to start searching from.
+        :param end: Offset of the end of the data block, or of the window.
+        :return: Offset after the newline ending the line,
+                 or None if every line up to end is continued.
+        """
+        while position < end:
+            newline = self.window.find(b'\n', position - self.window_start,
+                                       end - self.window_start)
+            if newline == -1:
+                return None
+            line_start = self.window.rfind(b'\n', 0, newline) + 1
+            if not self.window[line_start:newline].rstrip().endswith(b','):
+                return self.window_start + newline + 1
+            position = self.window_start + newline + 1
+        return None
+
+
+def open_decompressed(f: BinaryIO) -> BinaryIO:
+    """Opens a binary file for reading its contents, decompressed if it's compressed.
+
+    :param f: Binary file positioned at its start.
+    :return: f, or a file of its decompressed contents.
+    """
+    open_decompressing = get_decompressing_opener(f.read(HEADER_BYTES))
+    f.seek(0)
+    return f if open_decompressing is None else open_decompressing(f)
+
+
+# Reader of a file opened by open_file_reader.
+FileReader = Union[MappedFileReader, StreamingFileReader]
+
+
+def open_file_reader(source: Source, name: Optional[str] = None) -> FileReader:
+    """Opens a reader of a CalculiX input file.
+
+    Compressed sources are streamed, and others are memory-mapped or searched in place.
+
+    :param source: Path to CalculiX input file, its contents, or a file-like object.
+    :param name: Name of a source that isn't a path.
+    :return: StreamingFileReader if the source is compressed, otherwise MappedFileReader.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            header = f.read(HEADER_BYTES)
+    else:
+        name = get_source_name(source, name)
+        source = read_buffer(source)
+        header = bytes(source[:HEADER_BYTES])
+    if get_decompressing_opener(header) is not None:
+        return StreamingFileReader(source, name)
+    return MappedFileReader(source, name)
+
+
+__all__ = ['FileReader', 'StreamingFileReader', 'open_file_reader']
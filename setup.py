@@ -1,7 +1,7 @@
 import io
 from os import path
 
-from setuptools import setup
+from setuptools import Extension, setup
 
 current_dir = path.abspath(path.dirname(__file__))
 with io.open(path.join(current_dir, 'README.md'), encoding='utf-8') as f:
@@ -16,7 +16,18 @@ setup(
     author='G Roques',
     version='0.3.2',
     packages=['ccxmeshreader'],
+    # Optional accelerator for parsing data blocks.
+    # If it can't be built, data blocks are parsed with numpy or in Python.
+    ext_modules=[
+        Extension('ccxmeshreader._tokenizer',
+                  sources=['ccxmeshreader/_tokenizer.c'],
+                  optional=True)
+    ],
     install_requires=[],
+    extras_require={
+        'numpy': ['numpy'],
+        'zstd': ['zstandard']
+    },
     classifiers=[
         # Full List: https://pypi.org/pypi?%3Aaction=list_classifiers
         'License :: OSI Approved :: GNU Lesser General Public License v2 or later (LGPLv2+)',
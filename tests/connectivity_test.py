@@ -0,0 +1,160 @@
+import os
+import unittest
+from collections import defaultdict
+
+from ccxmeshreader import MeshConnectivity, read_mesh
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class MeshConnectivityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mesh_path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+        self.mesh = read_mesh(self.mesh_path)
+        self.elements = self.mesh['element_dict_by_type']['S4']
+
+    def test_node_elements(self):
+        expected_elements_by_node = defaultdict(set)
+        for element_number, node_numbers in self.elements.items():
+            for node_number in node_numbers:
+                expected_elements_by_node[node_number].add(element_number)
+
+        node_elements = MeshConnectivity(self.mesh).node_elements()
+
+        self.assertListEqual(node_elements.numbers.tolist(),
+                             sorted(expected_elements_by_node))
+        for node_number, element_numbers in expected_elements_by_node.items():
+            self.assertListEqual(node_elements.row(node_number).tolist(),
+                                 sorted(element_numbers))
+        self.assertListEqual(node_elements.row(1000000).tolist(), [])
+
+    def test_element_neighbors(self):
+        elements_by_edge = defaultdict(set)
+        for element_number, node_numbers in self.elements.items():
+            for i in range(4):
+                edge = frozenset((node_numbers[i], node_numbers[(i + 1) % 4]))
+                elements_by_edge[edge].add(element_number)
+        expected_neighbors = {element_number: set() for element_number in self.elements}
+        for element_numbers in elements_by_edge.values():
+            for element_number in element_numbers:
+                expected_neighbors[element_number] |= element_numbers - {element_number}
+
+        neighbors = MeshConnectivity(self.mesh).element_neighbors()
+
+        self.assertListEqual(neighbors.numbers.tolist(), sorted(expected_neighbors))
+        for element_number, neighbor_numbers in expected_neighbors.items():
+            self.assertListEqual(neighbors.row(element_number).tolist(),
+                                 sorted(neighbor_numbers))
+
+    def test_element_neighbors_with_mixed_element_types(self):
+        # Two hexahedra sharing a face, a wedge on top of the second,
+        # and a tetrahedron sharing only an edge with the first.
+        mesh = read_mesh(
+            b'*ELEMENT, TYPE=C3D8\n'
+            b'1, 1, 2, 3, 4, 5, 6, 7, 8\n'
+            b'2, 2, 9, 10, 3, 6, 11, 12, 7\n'
+            b'*ELEMENT, TYPE=C3D6\n'
+            b'3, 6, 11, 12, 13, 14, 15\n'
+            b'*ELEMENT, TYPE=C3D4\n'
+            b'4, 1, 4, 16, 17\n',
+            backend='numpy')
+        connectivity = MeshConnectivity(mesh)
+
+        face_neighbors = connectivity.element_neighbors('face')
+        edge_neighbors = connectivity.element_neighbors('edge')
+        hexahedron_neighbors = connectivity.element_neighbors(element_types=['C3D8'])
+
+        self.assertListEqual([face_neighbors.row(number).tolist() for number in range(1, 5)],
+                             [[2], [1], [], []])
+        self.assertListEqual([edge_neighbors.row(number).tolist() for number in range(1, 5)],
+                             [[2, 4], [1, 3], [2], [1]])
+        self.assertListEqual(hexahedron_neighbors.numbers.tolist(), [1, 2])
+        self.assertListEqual(hexahedron_neighbors.counts().tolist(), [1, 1])
+
+    def test_renumbered_mesh_gives_node_indices(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+        expected_connectivity = MeshConnectivity(self.mesh)
+        for backend in ['dict', 'numpy']:
+            with self.subTest(backend=backend):
+                mesh = read_mesh(path, backend=backend, renumber=True)
+
+                connectivity = MeshConnectivity(mesh)
+
+                node_elements = connectivity.node_elements()
+                # Node index 0 is a node like any other.
+                self.assertEqual(node_elements.numbers[0], 0)
+                self.assertListEqual(mesh['node_numbers'][node_elements.numbers].tolist(),
+                                     expected_connectivity.node_elements().numbers.tolist())
+                self.assertListEqual(node_elements.offsets.tolist(),
+                                     expected_connectivity.node_elements().offsets.tolist())
+                self.assertListEqual(connectivity.element_neighbors().values.tolist(),
+                                     expected_connectivity.element_neighbors().values.tolist())
+                self.assertListEqual(
+                    mesh['node_numbers'][connectivity.element_set_nodes('Efaces')].tolist(),
+                    expected_connectivity.element_set_nodes('Efaces').tolist())
+
+    def test_renumbered_mesh_with_missing_nodes(self):
+        mesh = read_mesh(
+            b'*NODE\n'
+            b'1, 0, 0, 0\n'
+            b'2, 1, 0, 0\n'
+            b'*ELEMENT, TYPE=T3D2, ELSET=E1\n'
+            b'1, 1, 2\n'
+            b'2, 2, 3\n'
+            b'3, 3, 4\n',
+            backend='numpy', renumber=True)
+
+        connectivity = MeshConnectivity(mesh)
+
+        self.assertListEqual(connectivity.node_elements().numbers.tolist(), [0, 1])
+        # Ends at missing nodes aren't shared.
+        self.assertListEqual(connectivity.element_neighbors().row(2).tolist(), [1])
+        self.assertListEqual(connectivity.element_neighbors().row(3).tolist(), [])
+        self.assertListEqual(connectivity.element_set_nodes('E1').tolist(), [0, 1])
+
+    def test_element_type_without_elements_is_ignored(self):
+        expected_neighbors = MeshConnectivity(self.mesh).element_neighbors()
+        # Reading a type from the defaultdict adds it without elements.
+        self.assertDictEqual(self.mesh['element_dict_by_type']['C3D4'], {})
+
+        for mesh in [self.mesh, read_mesh(self.mesh_path, renumber=True)]:
+            mesh['element_dict_by_type']['C3D4']
+            connectivity = MeshConnectivity(mesh)
+
+            self.assertListEqual(connectivity.element_neighbors().numbers.tolist(),
+                                 expected_neighbors.numbers.tolist())
+            self.assertListEqual(
+                connectivity.element_neighbors(element_types=['C3D4']).numbers.tolist(), [])
+
+    def test_element_neighbors_with_unknown_element_type_raises_value_error(self):
+        connectivity = MeshConnectivity(self.mesh)
+
+        with self.assertRaises(ValueError):
+            connectivity.element_neighbors(element_types=['SPRING1'])
+        with self.assertRaises(ValueError):
+            connectivity.element_neighbors(by='vertex')
+
+    def test_element_set_nodes(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'continuation-line-element.inp')
+        mesh = read_mesh(path, compact_element_sets=True)
+
+        connectivity = MeshConnectivity(mesh)
+
+        self.assertListEqual(connectivity.element_set_nodes('E1').tolist(),
+                             [1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 12, 13, 14, 15,
+                              16, 17, 18, 19, 20])
+        self.assertListEqual(connectivity.element_set_nodes('E4').tolist(), [])
+        with self.assertRaises(KeyError):
+            connectivity.element_set_nodes('undefined')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from ccxmeshreader import ReadStats, read_mesh
+from ccxmeshreader.decompression import decompress, open_gzip
+from ccxmeshreader.streaming_file_reader import StreamingFileReader
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESS_BY_EXTENSION = {
+    '.gz': gzip.compress,
+    '.bz2': bz2.compress,
+    '.xz': lzma.compress
+}
+
+
+class DecompressionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.tests_directory = os.path.abspath(os.path.dirname(__file__))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_compressed(self, filename, compress, compressed_filename=None):
+        with open(os.path.join(self.tests_directory, filename), 'rb') as f:
+            data = f.read()
+        path = os.path.join(self.directory.name, compressed_filename or filename)
+        with open(path, 'wb') as f:
+            f.write(compress(data))
+        return path
+
+    def test_read_mesh_with_compressed_file(self):
+        path = os.path.join(self.tests_directory, 'engine.inp')
+        expected_mesh = read_mesh(path)
+        for extension, compress in COMPRESS_BY_EXTENSION.items():
+            with self.subTest(extension=extension):
+                compressed_path = self.write_compressed(
+                    'engine.inp', compress, 'engine.inp' + extension)
+
+                self.assertEqual(read_mesh(compressed_path), expected_mesh)
+
+    def test_read_mesh_with_compressed_include(self):
+        path = os.path.join(self.tests_directory, '2d-beam.inp')
+        expected_mesh = read_mesh(path)
+        for extension, compress in COMPRESS_BY_EXTENSION.items():
+            with self.subTest(extension=extension):
+                # The included file is recognized as compressed by its contents.
+                compressed_path = self.write_compressed('2d-beam.inp', compress)
+                self.write_compressed('2d-beam-nodes.inp', compress)
+
+                self.assertEqual(read_mesh(compressed_path), expected_mesh)
+
+    def test_read_mesh_with_repeated_compressed_include(self):
+        with open(os.path.join(self.directory.name, 'nodes.inp.gz'), 'wb') as f:
+            f.write(gzip.compress(b'1, 0, 0, 0\n2, 1, 0, 0\n'))
+        path = os.path.join(self.directory.name, 'mesh.inp')
+        with open(path, 'w') as f:
+            f.write('*NODE, NSET=A\n*INCLUDE, INPUT=nodes.inp.gz\n'
+                    '*NODE, NSET=B\n*INCLUDE, INPUT=nodes.inp.gz\n')
+
+        mesh = read_mesh(path)
+
+        self.assertDictEqual(mesh['node_coordinates_by_number'],
+                             {1: (0, 0, 0), 2: (1, 0, 0)})
+
+    def test_read_mesh_with_compressed_bytes(self):
+        path = os.path.join(self.tests_directory, 'engine.inp')
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        mesh = read_mesh(gzip.compress(data))
+
+        self.assertEqual(mesh, read_mesh(path))
+
+    def test_read_mesh_with_compressed_file_and_workers(self):
+        path = os.path.join(self.tests_directory, '2d-beam.inp')
+        shutil.copy(os.path.join(self.tests_directory, '2d-beam-nodes.inp'),
+                    self.directory.name)
+        compressed_path = self.write_compressed('2d-beam.inp', gzip.compress)
+
+        with mock.patch('ccxmeshreader.read_mesh.PARALLEL_DATA_BLOCK_BYTES', 0):
+            mesh = read_mesh(compressed_path, workers=2)
+
+        self.assertEqual(mesh, read_mesh(path))
+
+    def test_read_mesh_streams_compressed_file_without_temporary_file(self):
+        path = os.path.join(self.tests_directory, '2d-beam.inp')
+        compressed_path = self.write_compressed('2d-beam.inp', gzip.compress)
+        self.write_compressed('2d-beam-nodes.inp', gzip.compress)
+        expected_mesh = read_mesh(path)
+        window_sizes = []
+        read_next_chunk = StreamingFileReader._read_chunk
+
+        def read_chunk(reader, keep_start):
+            is_read = read_next_chunk(reader, keep_start)
+            window_sizes.append(len(reader.window))
+            return is_read
+
+        stats = ReadStats()
+        with mock.patch('tempfile.TemporaryFile', side_effect=AssertionError), \
+                mock.patch('mmap.mmap', side_effect=AssertionError), \
+                mock.patch('ccxmeshreader.streaming_file_reader.DECOMPRESS_CHUNK_BYTES', 1024), \
+                mock.patch('ccxmeshreader.streaming_file_reader.DATA_BLOCK_BYTES', 4096), \
+                mock.patch.object(StreamingFileReader, '_read_chunk', read_chunk):
+            mesh = read_mesh(compressed_path, stats=stats)
+
+        self.assertEqual(mesh, expected_mesh)
+        # Only a chunk and a data block at most are held, rather than the decompressed deck.
+        self.assertLess(max(window_sizes), 1024 + 4096 + 200)
+        self.assertEqual(stats.files[compressed_path].bytes, os.path.getsize(path))
+
+    def test_decompress_into_memory(self):
+        buffer = decompress(io.BytesIO(gzip.compress(b'*NODE\n1, 0, 0, 0\n')), open_gzip)
+
+        self.assertEqual(buffer, b'*NODE\n1, 0, 0, 0\n')
+        self.assertEqual(decompress(io.BytesIO(gzip.compress(b'')), open_gzip), b'')
+
+    @unittest.skipIf(zstandard is None, 'zstandard is not installed')
+    def test_read_mesh_with_zstd_compressed_file(self):
+        path = os.path.join(self.tests_directory, 'engine.inp')
+        compressed_path = self.write_compressed(
+            'engine.inp', zstandard.ZstdCompressor().compress, 'engine.inp.zst')
+
+        self.assertEqual(read_mesh(compressed_path), read_mesh(path))
+
+    @unittest.skipIf(zstandard is not None, 'zstandard is installed')
+    def test_read_mesh_with_zstd_compressed_file_without_zstandard_raises_import_error(self):
+        path = os.path.join(self.directory.name, 'engine.inp.zst')
+        with open(path, 'wb') as f:
+            f.write(b'\x28\xb5\x2f\xfd\x00\x00')
+
+        with self.assertRaises(ImportError):
+            read_mesh(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import unittest
+from unittest import mock
+
+from ccxmeshreader import ElementSet, read_mesh
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ElementSetTest(unittest.TestCase):
+
+    def test_range_is_stored_as_one_run(self):
+        element_set = ElementSet(range(1, 100001))
+
+        self.assertEqual(len(element_set), 100000)
+        self.assertListEqual(element_set.ranges(), [range(1, 100001)])
+        self.assertIn(1, element_set)
+        self.assertIn(100000, element_set)
+        self.assertNotIn(0, element_set)
+        self.assertNotIn(100001, element_set)
+
+    def test_numbers_are_merged_into_runs(self):
+        element_set = ElementSet([5, 3, 4, 10, 3, 1])
+
+        self.assertListEqual(element_set.ranges(),
+                             [range(1, 2), range(3, 6), range(10, 11)])
+        self.assertListEqual(list(element_set), [1, 3, 4, 5, 10])
+        self.assertEqual(element_set, {1, 3, 4, 5, 10})
+
+    def test_union(self):
+        element_set = ElementSet(range(1, 6)) | ElementSet([6, 7, 20])
+        element_set.update(range(8, 10), [21])
+
+        self.assertListEqual(element_set.ranges(),
+                             [range(1, 10), range(20, 22)])
+
+    def test_discard(self):
+        element_set = ElementSet(range(1, 6))
+        element_set.discard(3)
+        element_set.discard(1)
+        element_set.discard(42)
+
+        self.assertListEqual(element_set.ranges(), [range(2, 3), range(4, 6)])
+
+    def test_without_numpy(self):
+        with mock.patch('ccxmeshreader.element_set.np', None):
+            element_set = ElementSet([5, 3, 4, 10, 3, 1])
+
+            self.assertListEqual(element_set.ranges(),
+                                 [range(1, 2), range(3, 6), range(10, 11)])
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_update_with_array(self):
+        element_set = ElementSet()
+        element_set.update(np.array([3, 1, 2], dtype=np.int32))
+
+        self.assertListEqual(element_set.ranges(), [range(1, 4)])
+
+    def test_read_mesh_with_compact_element_sets(self):
+        for filename in ['2d-beam.inp', 'continuation-line-element.inp', 'engine.inp']:
+            with self.subTest(filename=filename):
+                path = os.path.join(os.path.abspath(
+                    os.path.dirname(__file__)), filename)
+                mesh = read_mesh(path)
+
+                compact_mesh = read_mesh(path, compact_element_sets=True)
+
+                self.assertEqual(compact_mesh['element_set_by_name'].keys(),
+                                 mesh['element_set_by_name'].keys())
+                for name, element_set in mesh['element_set_by_name'].items():
+                    self.assertIsInstance(
+                        compact_mesh['element_set_by_name'][name], ElementSet)
+                    self.assertEqual(compact_mesh['element_set_by_name'][name],
+                                     element_set)
+
+
+if __name__ == '__main__':
+    unittest.main()
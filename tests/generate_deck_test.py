@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+
+from benchmarks.generate_deck import generate_deck
+from benchmarks.run_benchmarks import run_benchmarks
+from ccxmeshreader import read_mesh
+
+
+class GenerateDeckTest(unittest.TestCase):
+
+    def test_generate_deck(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = generate_deck(directory, num_nodes=100, num_elements=10)
+
+            mesh = read_mesh(path)
+
+        self.assertEqual(len(mesh['node_coordinates_by_number']), 100)
+        self.assertDictEqual(
+            {element_type: len(element_dict)
+             for element_type, element_dict in mesh['element_dict_by_type'].items()},
+            {'C3D4': 3, 'C3D10': 3, 'C3D20R': 2, 'S4': 2})
+        self.assertEqual(len(mesh['element_dict_by_type']['C3D20R'][7]), 20)
+        element_set_by_name = mesh['element_set_by_name']
+        self.assertSetEqual(element_set_by_name['Eall'], set(range(1, 11)))
+        self.assertSetEqual(element_set_by_name['Efirsthalf'], set(range(1, 6)))
+        self.assertSetEqual(element_set_by_name['Eodd'], set(range(1, 11, 2)))
+        self.assertEqual(mesh['materials'][0]['name'], 'Steel')
+
+    def test_run_benchmarks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = generate_deck(directory, num_nodes=100, num_elements=10)
+
+            results = run_benchmarks(path, ['dict'], repeat=1)
+
+        self.assertListEqual(
+            [(result['phase'], result['backend']) for result in results['results']],
+            [('scan', None), ('parse', None), ('build', 'dict'), ('read_mesh', 'dict')])
+        self.assertGreater(results['deck']['lines'], 110)
+
+
+if __name__ == '__main__':
+    unittest.main()
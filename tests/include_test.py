@@ -0,0 +1,172 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ccxmeshreader import MeshIndex, ParserError, iter_mesh, read_mesh
+from ccxmeshreader.mesh_records import IncludeEnd, IncludeStart
+from ccxmeshreader.read_mesh import iter_data_records
+from ccxmeshreader.streaming_file_reader import open_file_reader
+
+
+class IncludeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.directory.name, 'parts'))
+        self.write('materials.inp',
+                   '*MATERIAL, NAME=Steel\n'
+                   '*ELASTIC\n'
+                   '210000, 0.3\n')
+        self.write(os.path.join('parts', 'nodes.inp'),
+                   '1, 0, 0, 0\n'
+                   '2, 1, 0, 0\n')
+        # Relative paths in an included file are relative to it.
+        self.write(os.path.join('parts', 'part.inp'),
+                   '*NODE\n'
+                   '*INCLUDE, INPUT=nodes.inp\n'
+                   '*ELEMENT, TYPE=T3D2, ELSET=Eall\n'
+                   '1, 1, 2\n'
+                   '*INCLUDE, INPUT=../materials.inp\n')
+        self.path = self.write(
+            'main.inp',
+            '*INCLUDE, INPUT=parts/part.inp\n'
+            '*INCLUDE, INPUT={}\n'.format(
+                os.path.join(self.directory.name, 'parts', 'part.inp')) +
+            '*INCLUDE, INPUT=parts/part.inp\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, filename, contents):
+        path = os.path.join(self.directory.name, filename)
+        with open(path, 'w') as f:
+            f.write(contents)
+        return path
+
+    def test_iter_mesh_with_nested_includes(self):
+        part_path = os.path.join(self.directory.name, 'parts', 'part.inp')
+        nodes_path = os.path.join(self.directory.name, 'parts', 'nodes.inp')
+        materials_path = os.path.join(self.directory.name, 'parts', '..', 'materials.inp')
+
+        include_records = [record for record in iter_mesh(self.path)
+                           if isinstance(record, (IncludeStart, IncludeEnd))]
+
+        self.assertListEqual(include_records, 3 * [
+            IncludeStart(part_path),
+            IncludeStart(nodes_path),
+            IncludeEnd(nodes_path),
+            IncludeStart(materials_path),
+            IncludeEnd(materials_path),
+            IncludeEnd(part_path)
+        ])
+
+    def test_read_mesh_with_nested_includes(self):
+        mesh = read_mesh(self.path)
+
+        self.assertDictEqual(mesh['node_coordinates_by_number'],
+                             {1: (0, 0, 0), 2: (1, 0, 0)})
+        self.assertDictEqual(mesh['element_dict_by_type'], {'T3D2': {1: [1, 2]}})
+        self.assertSetEqual(mesh['element_set_by_name']['Eall'], {1})
+        self.assertListEqual([material['name'] for material in mesh['materials']],
+                             3 * ['Steel'])
+
+    def test_read_mesh_reads_and_parses_repeated_includes_once(self):
+        with mock.patch('ccxmeshreader.read_mesh.open_file_reader',
+                        wraps=open_file_reader) as open_file:
+            with mock.patch('ccxmeshreader.read_mesh.iter_data_records',
+                            wraps=iter_data_records) as parse:
+                mesh = read_mesh(self.path)
+
+        self.assertEqual(open_file.call_count, 4)
+        # Blocks are parsed on the first and second inclusion, and reused after.
+        self.assertEqual(parse.call_count, 4)
+        self.assertEqual(mesh, read_mesh(self.path))
+
+    def test_read_mesh_with_include_cycle_raises_parser_error(self):
+        self.write('a.inp', '*INCLUDE, INPUT=parts/b.inp\n')
+        self.write(os.path.join('parts', 'b.inp'), '*INCLUDE, INPUT=../a.inp\n')
+
+        with self.assertRaises(ParserError) as context:
+            read_mesh(os.path.join(self.directory.name, 'a.inp'))
+
+        self.assertIn('*INCLUDE cycle', str(context.exception))
+
+    def test_read_mesh_with_file_including_itself_raises_parser_error(self):
+        path = self.write('self.inp', '*INCLUDE, INPUT=self.inp\n')
+
+        with self.assertRaises(ParserError):
+            read_mesh(path)
+
+    def test_mesh_index_with_sections_continuing_in_includes(self):
+        mesh = read_mesh(self.path)
+
+        with MeshIndex(self.path) as index:
+            self.assertDictEqual(index.nodes(), mesh['node_coordinates_by_number'])
+            self.assertDictEqual(index.elements('T3D2'), mesh['element_dict_by_type']['T3D2'])
+            self.assertSetEqual(index.element_set('Eall'), mesh['element_set_by_name']['Eall'])
+            self.assertListEqual(index.materials(), mesh['materials'])
+            self.assertListEqual(
+                [(section.keyword, section.path, section.line_num)
+                 for section in index.sections[:4]],
+                [('*INCLUDE', self.path, 1),
+                 ('*NODE', os.path.join(self.directory.name, 'parts', 'part.inp'), 1),
+                 ('*INCLUDE', os.path.join(self.directory.name, 'parts', 'part.inp'), 2),
+                 ('*NODE', os.path.join(self.directory.name, 'parts', 'nodes.inp'), 0)])
+            self.assertTrue(index.sections[3].is_continuation)
+
+    def test_mesh_index_with_sections_continuing_after_includes(self):
+        self.write('more.inp',
+                   '** Comments do not end a section.\n'
+                   '3, 2, 0, 0\n'
+                   '*ELSET, ELSET=E1, GENERATE\n')
+        path = self.write(
+            'continued.inp',
+            '*NODE\n'
+            '*INCLUDE, INPUT=more.inp\n'
+            '1, 10, 1\n'
+            '*ELSET, ELSET=E2, GENERATE\n'
+            '1, 3, 1\n'
+            '*INCLUDE, INPUT=more.inp\n'
+            '5, 6\n'
+            '*ELSET, ELSET=E3\n'
+            '7\n'
+            '\n'
+            '*INCLUDE, INPUT=more.inp\n')
+        mesh = read_mesh(path)
+
+        with MeshIndex(path) as index:
+            self.assertDictEqual(index.nodes(), mesh['node_coordinates_by_number'])
+            for name in ['E1', 'E2', 'E3']:
+                self.assertSetEqual(index.element_set(name), mesh['element_set_by_name'][name])
+            self.assertListEqual(
+                [(section.path, section.line_num)
+                 for section in index.find('*ELSET', ELSET='E2')],
+                [(path, 4), (os.path.join(self.directory.name, 'more.inp'), 0)])
+
+        # Only the first data line after GENERATE is a range.
+        self.assertSetEqual(mesh['element_set_by_name']['E2'], {0, 1, 2, 3})
+        # A blank line ends a section.
+        self.assertSetEqual(mesh['element_set_by_name']['E3'], {7})
+
+    def test_mesh_index_with_include_resolver(self):
+        def resolve_include(include_input, path):
+            return b'1, 0, 0, 0\n'
+
+        path = self.write('resolved.inp', '*NODE\n*INCLUDE, INPUT=nodes\n')
+
+        with MeshIndex(path, include_resolver=resolve_include) as index:
+            self.assertDictEqual(index.nodes(), {1: (0, 0, 0)})
+            self.assertListEqual([section.path for section in index.sections],
+                                 [path, path, 'nodes'])
+
+    def test_mesh_index_with_include_cycle_raises_parser_error(self):
+        self.write('a.inp', '*INCLUDE, INPUT=parts/b.inp\n')
+        self.write(os.path.join('parts', 'b.inp'), '*INCLUDE, INPUT=../a.inp\n')
+
+        with self.assertRaises(ParserError):
+            MeshIndex(os.path.join(self.directory.name, 'a.inp'))
+
+
+if __name__ == '__main__':
+    unittest.main()
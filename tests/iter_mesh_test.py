@@ -0,0 +1,67 @@
+import os
+import unittest
+
+from ccxmeshreader import iter_mesh
+from ccxmeshreader.mesh_records import (Elastic, Element, ElementSetMembers,
+                                        ElementSetRange, IncludeEnd,
+                                        IncludeStart, Material, Node,
+                                        NodeBlock)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class IterMeshTest(unittest.TestCase):
+
+    def test_iter_mesh_with_continuation_line_element_data(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'continuation-line-element.inp')
+
+        records = list(iter_mesh(path))
+
+        nodes = [record for record in records if isinstance(record, Node)]
+        self.assertEqual(len(nodes), 20)
+        self.assertEqual(nodes[0], Node(1, (2.0, -7.45058e-09, 0.0)))
+
+        remaining_records = records[len(nodes):]
+        self.assertListEqual(remaining_records, [
+            Element(1, 'C3D20R',
+                    [1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20],
+                    'Eall'),
+            ElementSetRange('E1', 1, 5, 1),
+            ElementSetMembers('E2', [6, 7], ['E1']),
+            ElementSetRange('E3', 1, 7, 2),
+            ElementSetMembers('E4', [20], []),
+            Material('EL'),
+            Elastic('EL', 'ISO', 210000.0, 0.3)
+        ])
+
+    def test_iter_mesh_with_include(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+        include_path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam-nodes.inp')
+
+        records = list(iter_mesh(path))
+
+        self.assertEqual(records[0], IncludeStart(include_path))
+        self.assertEqual(records[1160], IncludeEnd(include_path))
+        self.assertTrue(all(isinstance(record, Node)
+                            for record in records[1:1160]))
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_iter_mesh_with_blocks(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+
+        node_blocks = [record for record in iter_mesh(path, blocks=True)
+                       if isinstance(record, NodeBlock)]
+
+        self.assertEqual(len(node_blocks), 1)
+        self.assertTupleEqual(node_blocks[0].node_coordinates.shape, (1159, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
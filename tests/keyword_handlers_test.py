@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from typing import List, NamedTuple
+
+from ccxmeshreader import (KeywordHandler, iter_mesh, read_mesh,
+                           register_keyword_handler)
+from ccxmeshreader.keyword_handlers import get_keyword_handler
+
+
+class Boundary(NamedTuple):
+    node_set: str
+    dofs: List[int]
+
+
+class BoundaryHandler(KeywordHandler):
+
+    def data_line(self, state, stripped_line, line_num):
+        parts = [part.strip() for part in stripped_line.split(',')]
+        return (Boundary(parts[0], [int(part) for part in parts[1:]]),)
+
+
+class KeywordHandlersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'boundary.inp')
+        with open(self.path, 'w') as f:
+            f.write('*NODE, NSET=Nall\n'
+                    '1, 0.0, 0.0, 0.0\n'
+                    '2, 1.0, 0.0, 0.0\n'
+                    '*Boundary\n'
+                    'Nall, 1, 3\n'
+                    '*ELEMENT, TYPE=T3D2, ELSET=Eall\n'
+                    '1, 1, 2\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+        register_keyword_handler('*BOUNDARY', None)
+
+    def test_unknown_keyword_ends_data_lines(self):
+        mesh = read_mesh(self.path)
+
+        self.assertDictEqual(mesh['node_coordinates_by_number'],
+                             {1: (0.0, 0.0, 0.0), 2: (1.0, 0.0, 0.0)})
+        self.assertDictEqual(mesh['element_dict_by_type']['T3D2'], {1: [1, 2]})
+
+    def test_register_keyword_handler(self):
+        register_keyword_handler('*boundary', BoundaryHandler())
+
+        boundaries = [record for record in iter_mesh(self.path)
+                      if type(record) is Boundary]
+
+        self.assertListEqual(boundaries, [Boundary('Nall', [1, 3])])
+        self.assertEqual(len(read_mesh(self.path)['node_coordinates_by_number']), 2)
+
+    def test_get_keyword_handler_ignores_case_and_white_space(self):
+        self.assertIs(get_keyword_handler('*Element'),
+                      get_keyword_handler(' *ELEMENT '))
+        self.assertEqual(get_keyword_handler('*Element').data_type, 'element')
+        self.assertEqual(get_keyword_handler('*Element Output').data_type, '')
+        self.assertEqual(get_keyword_handler('*Node Print').data_type, '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ccxmeshreader.mapped_file_reader import MappedFileReader
+
+
+class MappedFileReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'mesh.inp')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, contents: bytes) -> None:
+        with open(self.path, 'wb') as f:
+            f.write(contents)
+
+    def test_readline(self):
+        self.write(b'*NODE\n1, 0, 0, 0')
+
+        with MappedFileReader(self.path) as reader:
+            self.assertEqual(reader.readline(), '*NODE\n')
+            self.assertEqual(reader.readline(), '1, 0, 0, 0')
+            self.assertEqual(reader.readline(), '')
+
+    def test_readline_with_empty_file(self):
+        self.write(b'')
+
+        with MappedFileReader(self.path) as reader:
+            self.assertEqual(reader.readline(), '')
+
+    def test_read_data_block_ends_before_keyword(self):
+        self.write(b'*NODE\n1, 0, 0, 0\n2, 1, 0, 0\n*ELEMENT, TYPE=T3D2\n')
+
+        with MappedFileReader(self.path) as reader:
+            reader.readline()
+            reader.readline()
+            self.assertEqual(reader.read_data_block(),
+                             b'1, 0, 0, 0\n2, 1, 0, 0\n')
+            self.assertEqual(reader.readline(), '*ELEMENT, TYPE=T3D2\n')
+
+    def test_read_data_block_ends_before_blank_line_or_indented_keyword(self):
+        self.write(b'1, 0, 0, 0\n  \n2, 1, 0, 0\n  *ELEMENT\n')
+
+        with MappedFileReader(self.path) as reader:
+            reader.readline()
+            self.assertEqual(reader.read_data_block(), b'1, 0, 0, 0\n')
+            self.assertEqual(reader.readline(), '  \n')
+            reader.readline()
+            self.assertEqual(reader.read_data_block(), b'2, 1, 0, 0\n')
+            self.assertEqual(reader.readline(), '  *ELEMENT\n')
+
+    def test_skip_data_block(self):
+        self.write(b'*NODE\n1, 0, 0, 0\n2, 1, 0, 0\n*ELEMENT, TYPE=T3D2\n1, 1, 2')
+
+        with MappedFileReader(self.path) as reader:
+            reader.readline()
+            reader.readline()
+            self.assertEqual(reader.skip_data_block(), 2)
+            self.assertEqual(reader.readline(), '*ELEMENT, TYPE=T3D2\n')
+            reader.readline()
+            self.assertEqual(reader.skip_data_block(), 1)
+            self.assertEqual(reader.readline(), '')
+
+    def test_read_data_block_splits_large_blocks_between_continued_lines(self):
+        self.write(b'1, 1, 2,\n3, 4\n2, 5, 6,\n7, 8\n')
+
+        with mock.patch('ccxmeshreader.mapped_file_reader.DATA_BLOCK_BYTES', 2):
+            with MappedFileReader(self.path) as reader:
+                reader.readline()
+                self.assertEqual(reader.read_data_block(), b'1, 1, 2,\n3, 4\n')
+                reader.readline()
+                self.assertEqual(reader.read_data_block(), b'2, 5, 6,\n7, 8\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
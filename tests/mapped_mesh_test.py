@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ccxmeshreader import ParserError, load_mapped_mesh, read_mesh
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class MappedMeshTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.tests_directory = os.path.abspath(os.path.dirname(__file__))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertMeshesEqual(self, mapped_mesh, mesh):
+        self.assertListEqual(mapped_mesh['node_numbers'].tolist(), mesh['node_numbers'].tolist())
+        self.assertListEqual(mapped_mesh['node_coordinates'].tolist(),
+                             mesh['node_coordinates'].tolist())
+        self.assertListEqual(list(mapped_mesh['element_numbers_by_type']),
+                             list(mesh['element_numbers_by_type']))
+        for element_type, element_numbers in mesh['element_numbers_by_type'].items():
+            self.assertListEqual(mapped_mesh['element_numbers_by_type'][element_type].tolist(),
+                                 element_numbers.tolist())
+            self.assertListEqual(
+                mapped_mesh['element_connectivity_by_type'][element_type].tolist(),
+                mesh['element_connectivity_by_type'][element_type].tolist())
+        self.assertDictEqual(
+            {name: element_set.tolist()
+             for name, element_set in mapped_mesh['element_set_by_name'].items()},
+            {name: sorted(element_set) for name, element_set in mesh['element_set_by_name'].items()})
+        self.assertListEqual(mapped_mesh['materials'], mesh['materials'])
+
+    def test_read_mesh_with_memmap_backend(self):
+        for filename in ('2d-beam.inp', 'continuation-line-element.inp'):
+            with self.subTest(filename=filename):
+                path = os.path.join(self.tests_directory, filename)
+                directory = os.path.join(self.directory.name, filename)
+
+                mesh = read_mesh(path, backend='memmap', directory=directory)
+
+                self.assertIsInstance(mesh['node_coordinates'], np.memmap)
+                self.assertFalse(mesh['node_coordinates'].flags.writeable)
+                self.assertMeshesEqual(mesh, read_mesh(path, backend='numpy'))
+
+    def test_read_mesh_with_memmap_backend_writes_in_chunks(self):
+        path = os.path.join(self.tests_directory, 'continuation-line-element.inp')
+
+        # Elements with continuation lines are added one at a time, and flushed every chunk.
+        with mock.patch('ccxmeshreader.mapped_mesh.CHUNK_BYTES', 16):
+            mesh = read_mesh(path, backend='memmap', directory=self.directory.name)
+
+        self.assertMeshesEqual(mesh, read_mesh(path, backend='numpy'))
+
+    def test_load_mapped_mesh(self):
+        path = os.path.join(self.tests_directory, '2d-beam.inp')
+        read_mesh(path, backend='memmap', directory=self.directory.name)
+
+        mesh = load_mapped_mesh(self.directory.name)
+
+        self.assertMeshesEqual(mesh, read_mesh(path, backend='numpy'))
+
+    def test_load_mapped_mesh_without_mesh_raises_file_not_found_error(self):
+        with self.assertRaises(FileNotFoundError):
+            load_mapped_mesh(self.directory.name)
+
+    def test_read_mesh_with_memmap_backend_without_directory_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            read_mesh(b'*NODE\n1, 0, 0, 0\n', backend='memmap')
+
+    def test_read_mesh_with_memmap_backend_and_differing_node_counts_raises_parser_error(self):
+        with self.assertRaises(ParserError):
+            read_mesh(b'*ELEMENT, TYPE=U1\n1, 1, 2\n2, 1, 2, 3\n',
+                      backend='memmap', directory=self.directory.name)
+
+    def test_failed_read_mesh_removes_mesh_in_directory(self):
+        path = os.path.join(self.tests_directory, '2d-beam.inp')
+        read_mesh(path, backend='memmap', directory=self.directory.name)
+
+        with self.assertRaises(ParserError):
+            read_mesh(b'*NODE\n1, 0, 0, 0\n*ELEMENT, TYPE=U1\n1, 1, 2\n2, 1, 2, 3\n',
+                      backend='memmap', directory=self.directory.name)
+
+        with self.assertRaises(FileNotFoundError):
+            load_mapped_mesh(self.directory.name)
+        self.assertNotIn('node_numbers.npy', os.listdir(self.directory.name))
+
+    def test_read_mesh_with_memmap_backend_and_renumber_or_selection_raises_value_error(self):
+        path = os.path.join(self.tests_directory, '2d-beam.inp')
+        for kwargs in [{'renumber': True}, {'element_types': ['S4']}, {'element_sets': ['Eall']}]:
+            with self.subTest(**kwargs):
+                with self.assertRaises(ValueError):
+                    read_mesh(path, backend='memmap', directory=self.directory.name, **kwargs)
+
+    def test_read_mesh_with_memmap_backend_and_include(self):
+        path = os.path.join(self.tests_directory, '2d-beam.inp')
+
+        mesh = read_mesh(path, backend='memmap', directory=self.directory.name,
+                         include=('nodes', 'elements'))
+
+        self.assertMeshesEqual(load_mapped_mesh(self.directory.name), mesh)
+        self.assertEqual(len(mesh['node_numbers']), 1159)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from ccxmeshreader import MeshCache, read_mesh
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class MeshCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_directory = os.path.join(self.directory.name, 'cache')
+        tests_directory = os.path.abspath(os.path.dirname(__file__))
+        for filename in ['2d-beam.inp', '2d-beam-nodes.inp', 'continuation-line-element.inp']:
+            shutil.copy(os.path.join(tests_directory, filename),
+                        self.directory.name)
+        self.path = os.path.join(self.directory.name, '2d-beam.inp')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_mesh_from_cache(self):
+        cache = MeshCache(self.cache_directory)
+
+        cache.read_mesh(self.path)
+        os.rename(self.path, self.path + '.bak')
+        os.rename(self.path + '.bak', self.path)
+        mesh = cache.read_mesh(self.path)
+
+        self.assertEqual(len(os.listdir(self.cache_directory)), 1)
+        self.assertEqual(mesh, read_mesh(self.path))
+
+    def test_read_mesh_from_cache_with_numpy_backend(self):
+        cache = MeshCache(self.cache_directory)
+
+        cache.read_mesh(self.path)
+        mesh = cache.read_mesh(self.path, backend='numpy')
+
+        expected = read_mesh(self.path, backend='numpy')
+        self.assertTrue(np.array_equal(mesh['node_numbers'],
+                                       expected['node_numbers']))
+        self.assertTrue(np.array_equal(mesh['node_coordinates'],
+                                       expected['node_coordinates']))
+        self.assertTrue(np.array_equal(mesh['element_connectivity_by_type']['S4'],
+                                       expected['element_connectivity_by_type']['S4']))
+        self.assertEqual(mesh['element_set_by_name'],
+                         expected['element_set_by_name'])
+        self.assertEqual(mesh['materials'], expected['materials'])
+
+    def test_read_mesh_after_included_file_changes(self):
+        cache = MeshCache(self.cache_directory)
+        cache.read_mesh(self.path)
+
+        include_path = os.path.join(self.directory.name, '2d-beam-nodes.inp')
+        with open(include_path, 'a') as f:
+            f.write('1160, 1, 2, 3\n')
+        mesh = cache.read_mesh(self.path)
+
+        self.assertTupleEqual(
+            mesh['node_coordinates_by_number'][1160], (1, 2, 3))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = MeshCache(self.cache_directory)
+        other_path = os.path.join(
+            self.directory.name, 'continuation-line-element.inp')
+
+        cache.read_mesh(self.path)
+        cache.read_mesh(other_path)
+        cache.read_mesh(self.path)
+        entry_path = cache.get_entry_path(self.path)
+        cache.max_bytes = os.path.getsize(entry_path)
+        cache.evict()
+
+        self.assertListEqual(os.listdir(self.cache_directory),
+                             [os.path.basename(entry_path)])
+
+if __name__ == '__main__':
+    unittest.main()
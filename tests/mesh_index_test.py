@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from ccxmeshreader import MeshIndex, read_mesh
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class MeshIndexTest(unittest.TestCase):
+
+    def test_sections(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'continuation-line-element.inp')
+
+        index = MeshIndex(path)
+
+        self.assertListEqual(
+            [section.keyword for section in index.sections],
+            ['*NODE', '*ELEMENT', '*ELSET', '*ELSET', '*ELSET', '*ELSET',
+             '*MATERIAL', '*ELASTIC', '*SOLIDSECTION', '*BOUNDARY', '*STEP',
+             '*STATIC', '*DLOAD', '*ELPRINT', '*ENDSTEP'])
+        self.assertListEqual(
+            [section.line_num for section in index.find('*Solid Section')], [49])
+        self.assertListEqual(
+            [section.parameters for section in index.find('*elset', GENERATE=True)],
+            [{'ELSET': 'E1', 'GENERATE': True},
+             {'ELSET': 'E3', 'GENERATE': True},
+             {'ELSET': 'E4', 'GENERATE': True}])
+
+    def test_accessors_match_read_mesh(self):
+        for filename in ['2d-beam.inp', 'continuation-line-element.inp', 'engine.inp']:
+            with self.subTest(filename=filename):
+                path = os.path.join(os.path.abspath(
+                    os.path.dirname(__file__)), filename)
+                mesh = read_mesh(path)
+
+                index = MeshIndex(path)
+
+                self.assertDictEqual(index.nodes(),
+                                     mesh['node_coordinates_by_number'])
+                for element_type, element_dict in mesh['element_dict_by_type'].items():
+                    self.assertDictEqual(index.elements(element_type),
+                                         element_dict)
+                for name, element_set in mesh['element_set_by_name'].items():
+                    self.assertSetEqual(index.element_set(name), element_set)
+                self.assertListEqual(index.materials(), mesh['materials'])
+
+    def test_element_set_with_undefined_name_raises_key_error(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'engine.inp')
+
+        with self.assertRaises(KeyError):
+            MeshIndex(path).element_set('Undefined')
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_elements_with_numpy_backend(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+
+        element_numbers, connectivity = MeshIndex(
+            path, backend='numpy').elements('S4')
+
+        self.assertEqual(len(element_numbers), 1080)
+        self.assertTupleEqual(connectivity.shape, (1080, 4))
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_elements_of_undefined_type_are_empty(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+
+        element_numbers, connectivity = MeshIndex(
+            path, backend='numpy').elements('C3D10')
+
+        self.assertDictEqual(MeshIndex(path).elements('C3D10'), {})
+        self.assertTupleEqual(element_numbers.shape, (0,))
+        self.assertTupleEqual(connectivity.shape, (0, 0))
+
+    def test_element_set_references_are_parsed_once(self):
+        lines = ['*ELSET, ELSET=E0', '1, 2, 3']
+        for i in range(1, 30):
+            lines += ['*ELSET, ELSET=E{}'.format(i), 'E{0}, E{0}'.format(i - 1)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'references.inp')
+            with open(path, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+
+            with MeshIndex(path) as index:
+                self.assertSetEqual(index.element_set('E29'), {1, 2, 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ccxmeshreader import MeshQuery, read_mesh
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class MeshQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+        self.mesh = read_mesh(self.path)
+        self.query = MeshQuery(self.mesh)
+        node_coordinates_by_number = self.mesh['node_coordinates_by_number']
+        self.node_numbers = np.array(list(node_coordinates_by_number))
+        self.node_coordinates = np.array(list(node_coordinates_by_number.values()))
+
+    def test_nearest_nodes(self):
+        points = np.random.default_rng(0).uniform(
+            self.node_coordinates.min(axis=0) - 1, self.node_coordinates.max(axis=0) + 1, (50, 3))
+        expected_distances = np.linalg.norm(
+            self.node_coordinates[np.newaxis] - points[:, np.newaxis], axis=2).min(axis=1)
+
+        node_numbers, distances = self.query.nearest_nodes(points)
+
+        coordinates = self.mesh['node_coordinates_by_number']
+        np.testing.assert_allclose(distances, expected_distances)
+        np.testing.assert_allclose(
+            np.linalg.norm([coordinates[number] for number in node_numbers] - points, axis=1),
+            expected_distances)
+
+    def test_nearest_nodes_in_batches(self):
+        points = np.random.default_rng(1).uniform(
+            self.node_coordinates.min(axis=0) - 10, self.node_coordinates.max(axis=0) + 10, (300, 3))
+        points[:100] = self.node_coordinates[:100]
+        expected_distances = np.linalg.norm(
+            self.node_coordinates[np.newaxis] - points[:, np.newaxis], axis=2).min(axis=1)
+
+        with mock.patch('ccxmeshreader.mesh_query.NEAREST_BATCH_POINTS', 64), \
+                mock.patch('ccxmeshreader.mesh_query.NEAREST_BATCH_CELLS', 16):
+            node_numbers, distances = self.query.nearest_nodes(points)
+
+        self.assertListEqual(node_numbers[:100].tolist(), self.node_numbers[:100].tolist())
+        np.testing.assert_allclose(distances, expected_distances)
+
+    def test_nearest_nodes_far_outside_mesh(self):
+        directions = np.random.default_rng(2).normal(size=(100, 3))
+        center = self.node_coordinates.mean(axis=0)
+        points = center + 1e4 * directions / np.linalg.norm(directions, axis=1)[:, np.newaxis]
+        points[0] = self.node_coordinates.max(axis=0) + [1e6, 0, 0]
+        expected_distances = np.linalg.norm(
+            self.node_coordinates[np.newaxis] - points[:, np.newaxis], axis=2).min(axis=1)
+
+        node_numbers, distances = self.query.nearest_nodes(points)
+
+        coordinates = self.mesh['node_coordinates_by_number']
+        np.testing.assert_allclose(distances, expected_distances)
+        np.testing.assert_allclose(
+            np.linalg.norm([coordinates[number] for number in node_numbers] - points, axis=1),
+            expected_distances)
+
+    def test_nearest_nodes_across_empty_cells(self):
+        coordinates = np.concatenate([np.random.default_rng(3).uniform(0, 1, (200, 3)),
+                                      [[100, 100, 100]]])
+        mesh = read_mesh(b'*NODE\n' + b''.join(
+            b'%d, %r, %r, %r\n' % (number, *point)
+            for number, point in enumerate(coordinates.tolist(), 1)), backend='numpy')
+        points = np.array([[50, 50, 50], [99, 99, 99], [0.5, 0.5, 0.5], [-10, 50, 200]])
+        expected_distances = np.linalg.norm(
+            coordinates[np.newaxis] - points[:, np.newaxis], axis=2).min(axis=1)
+
+        np.testing.assert_allclose(MeshQuery(mesh).nearest_nodes(points)[1], expected_distances)
+
+    def test_nearest_node_of_single_point(self):
+        node_number = int(self.node_numbers[10])
+
+        nearest_number, distance = self.query.nearest_nodes(self.node_coordinates[10])
+
+        self.assertEqual(nearest_number, node_number)
+        self.assertEqual(distance, 0)
+
+    def test_nodes_within(self):
+        center = self.node_coordinates[100]
+        radius = 1.5
+        expected = np.sort(self.node_numbers[
+            np.linalg.norm(self.node_coordinates - center, axis=1) <= radius])
+
+        self.assertListEqual(self.query.nodes_within(center, radius).tolist(), expected.tolist())
+        self.assertListEqual(self.query.nodes_within(center, -1).tolist(), [])
+
+    def test_nodes_in_box(self):
+        lower = self.node_coordinates.min(axis=0)
+        upper = (lower + self.node_coordinates.max(axis=0)) / 2
+        expected = np.sort(self.node_numbers[np.all(
+            (self.node_coordinates >= lower) & (self.node_coordinates <= upper), axis=1)])
+
+        self.assertListEqual(self.query.nodes_in_box(lower, upper).tolist(), expected.tolist())
+        self.assertListEqual(self.query.nodes_in_box(upper + 1000, upper + 2000).tolist(), [])
+
+    def test_element_set_nodes(self):
+        expected = sorted({node_number
+                           for node_numbers in self.mesh['element_dict_by_type']['S4'].values()
+                           for node_number in node_numbers})
+
+        self.assertListEqual(self.query.element_set_nodes('Efaces').tolist(), expected)
+        with self.assertRaises(KeyError):
+            self.query.element_set_nodes('undefined')
+
+    def test_bounding_box(self):
+        expected = [self.node_coordinates.min(axis=0).tolist(),
+                    self.node_coordinates.max(axis=0).tolist()]
+
+        self.assertListEqual(self.query.bounding_box().tolist(), expected)
+        self.assertListEqual(self.query.bounding_box('Efaces').tolist(), expected)
+        self.assertListEqual(self.query.bounding_box(element_type='S4').tolist(), expected)
+        self.assertTrue(np.isnan(self.query.bounding_box('Efaces', 'C3D4')).all())
+
+    def test_element_centroids(self):
+        elements = self.mesh['element_dict_by_type']['S4']
+        node_coordinates_by_number = self.mesh['node_coordinates_by_number']
+        expected = [np.mean([node_coordinates_by_number[number] for number in node_numbers], axis=0)
+                    for node_numbers in elements.values()]
+
+        np.testing.assert_allclose(self.query.element_centroids('S4'), expected)
+
+    def test_backends_give_same_results(self):
+        center = self.node_coordinates[100]
+        expected_nodes = self.query.nodes_within(center, 2, 'Efaces').tolist()
+        expected_centroids = self.query.element_centroids('S4')
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        meshes = [read_mesh(self.path, backend='numpy'),
+                  read_mesh(self.path, renumber=True),
+                  read_mesh(self.path, backend='numpy', renumber=True),
+                  read_mesh(self.path, backend='memmap', directory=directory.name)]
+        for mesh in meshes:
+            query = MeshQuery(mesh)
+
+            self.assertListEqual(query.nodes_within(center, 2, 'Efaces').tolist(), expected_nodes)
+            np.testing.assert_allclose(query.element_centroids('S4'), expected_centroids)
+
+    def test_missing_nodes_are_ignored(self):
+        mesh = read_mesh(
+            b'*NODE\n'
+            b'1, 0, 0, 0\n'
+            b'2, 1, 0, 0\n'
+            b'3, 0, 1, 0\n'
+            b'*ELEMENT, TYPE=C3D4, ELSET=E1\n'
+            b'1, 1, 2, 3, 4\n',
+            backend='numpy')
+        query = MeshQuery(mesh)
+
+        self.assertListEqual(query.element_set_nodes('E1').tolist(), [1, 2, 3])
+        np.testing.assert_allclose(query.element_centroids('C3D4'), [[1 / 3, 1 / 3, 0]])
+        self.assertListEqual(query.bounding_box('E1').tolist(), [[0, 0, 0], [1, 1, 0]])
+
+    def test_element_type_without_elements_is_ignored(self):
+        self.mesh['element_dict_by_type']['C3D4']
+        query = MeshQuery(self.mesh)
+
+        self.assertListEqual(query.element_set_nodes('Efaces').tolist(),
+                             self.query.element_set_nodes('Efaces').tolist())
+        with self.assertRaises(KeyError):
+            query.element_centroids('C3D4')
+
+    def test_mesh_without_nodes(self):
+        query = MeshQuery(read_mesh(b'*ELEMENT, TYPE=S4\n1, 1, 2, 3, 4\n'))
+
+        self.assertListEqual(query.nodes_in_box([0, 0, 0], [1, 1, 1]).tolist(), [])
+        with self.assertRaises(ValueError):
+            query.nearest_nodes([0, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from ccxmeshreader import MeshReader, read_mesh
+from ccxmeshreader.read_mesh import iter_data_records
+
+
+class MeshReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        tests_directory = os.path.abspath(os.path.dirname(__file__))
+        for filename in ['2d-beam.inp', '2d-beam-nodes.inp']:
+            shutil.copy(os.path.join(tests_directory, filename),
+                        self.directory.name)
+        self.path = os.path.join(self.directory.name, '2d-beam.inp')
+        self.nodes_path = os.path.join(self.directory.name, '2d-beam-nodes.inp')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_refresh_without_changes(self):
+        reader = MeshReader(self.path)
+        mesh = reader.refresh()
+
+        with mock.patch('ccxmeshreader.mesh_reader.iter_records') as iter_records:
+            self.assertIs(reader.refresh(), mesh)
+            iter_records.assert_not_called()
+        self.assertEqual(mesh, read_mesh(self.path))
+
+    def test_refresh_parses_only_changed_files(self):
+        reader = MeshReader(self.path)
+        reader.refresh()
+        with open(self.nodes_path, 'a') as f:
+            f.write('9999, 1.0, 2.0, 3.0\n')
+
+        with mock.patch('ccxmeshreader.mesh_reader.iter_data_records',
+                        wraps=iter_data_records) as parse:
+            mesh = reader.refresh()
+            parsed_paths = {call.args[0].path for call in parse.call_args_list}
+
+        self.assertSetEqual(parsed_paths, {self.nodes_path})
+        self.assertEqual(mesh['node_coordinates_by_number'][9999], (1.0, 2.0, 3.0))
+        self.assertEqual(mesh, read_mesh(self.path))
+
+    def test_refresh_after_main_file_changes(self):
+        reader = MeshReader(self.path)
+        reader.refresh()
+        with open(self.path, 'a') as f:
+            f.write('*ELSET, ELSET=Enew\n157, 158\n')
+
+        mesh = reader.refresh()
+
+        self.assertSetEqual(mesh['element_set_by_name']['Enew'], {157, 158})
+        self.assertEqual(mesh, read_mesh(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
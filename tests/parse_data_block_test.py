@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+
+from ccxmeshreader.parse_data_block import (parse_element_block,
+                                            parse_node_block)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class ParseDataBlockTest(unittest.TestCase):
+
+    def test_parse_node_block(self):
+        node_numbers, node_coordinates = parse_node_block(
+            b'       1,  2.00000e+00, -7.45058e-09,  0.00000e+00 \n'
+            b'14, 0, 10, 0\n')
+
+        self.assertListEqual(node_numbers.tolist(), [1, 14])
+        self.assertListEqual(node_coordinates.tolist(), [
+            [2.0, -7.45058e-09, 0.0],
+            [0.0, 10.0, 0.0]
+        ])
+
+    def test_parse_blocks_of_bytearray(self):
+        node_numbers, _ = parse_node_block(bytearray(b'1, 0, 0, 0\n2, 1, 0, 0\n'))
+        element_numbers, connectivity = parse_element_block(bytearray(b'1, 1, 2\n'))
+
+        self.assertListEqual(node_numbers.tolist(), [1, 2])
+        self.assertListEqual(element_numbers.tolist(), [1])
+        self.assertListEqual(connectivity.tolist(), [[1, 2]])
+
+    def test_parse_node_block_with_wrong_number_of_parts_returns_none(self):
+        self.assertIsNone(parse_node_block(b'1, 0, 0\n2, 0, 0, 0\n'))
+
+    def test_parse_node_block_with_non_integer_node_number_returns_none(self):
+        self.assertIsNone(parse_node_block(b'1.5, 0, 0, 0\n'))
+        self.assertIsNone(parse_node_block(b'1, 0, 0, 0\n2.0, 0, 0, 0\n'))
+        self.assertIsNone(parse_node_block(b'1e3, 0, 0, 0\n'))
+
+    def test_parse_node_block_keeps_large_node_numbers(self):
+        node_numbers, _ = parse_node_block(b'9007199254740993, 0, 0, 0\n 2 ,1,0,0\n')
+
+        self.assertListEqual(node_numbers.tolist(), [2 ** 53 + 1, 2])
+
+    def test_parse_element_block_with_continuation_lines_and_empty_fields(self):
+        element_numbers, connectivity = parse_element_block(
+            b'1, 1, 2, 3, \r\n'
+            b'   4, , 6\r\n'
+            b'2, 7,8,9,\n'
+            b'10,11,12')
+
+        self.assertListEqual(element_numbers.tolist(), [1, 2])
+        self.assertListEqual(connectivity.tolist(), [
+            [1, 2, 3, 4, 0, 6],
+            [7, 8, 9, 10, 11, 12]
+        ])
+
+    def test_parse_element_block_with_too_many_parts_on_a_line_returns_none(self):
+        self.assertIsNone(parse_element_block(
+            b','.join(str(i).encode() for i in range(17)) + b'\n'))
+
+    def test_parse_element_block_with_mixed_node_counts_returns_none(self):
+        self.assertIsNone(parse_element_block(b'1, 1, 2, 3\n2, 4, 5\n'))
+
+    def test_parse_element_block_with_non_numeric_field_returns_none(self):
+        self.assertIsNone(parse_element_block(b'1, 1, x, 3\n'))
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class ParseDataBlockWithoutTokenizerTest(ParseDataBlockTest):
+
+    def setUp(self):
+        patcher = mock.patch('ccxmeshreader.parse_data_block._tokenizer', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+if __name__ == '__main__':
+    unittest.main()
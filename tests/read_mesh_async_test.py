@@ -0,0 +1,87 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from ccxmeshreader import (ParserError, iter_mesh, iter_mesh_async, read_mesh,
+                           read_mesh_async)
+
+
+class ReadMeshAsyncTest(unittest.TestCase):
+
+    def test_read_mesh_async(self):
+        for filename in ['2d-beam.inp', 'continuation-line-element.inp', 'engine.inp']:
+            with self.subTest(filename=filename):
+                path = os.path.join(os.path.abspath(
+                    os.path.dirname(__file__)), filename)
+
+                mesh = asyncio.run(read_mesh_async(path))
+
+                self.assertEqual(mesh, read_mesh(path))
+
+    def test_iter_mesh_async(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+
+        async def collect_records():
+            return [record async for record in iter_mesh_async(path)]
+
+        with mock.patch('ccxmeshreader.read_mesh_async.ASYNC_BATCH_BYTES', 1):
+            records = asyncio.run(collect_records())
+
+        self.assertListEqual(records, list(iter_mesh(path)))
+
+    def test_read_mesh_async_yields_control_between_batches(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'engine.inp')
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def read_while_ticking():
+            ticker = asyncio.ensure_future(tick())
+            try:
+                await asyncio.sleep(0)
+                num_ticks = len(ticks)
+                await read_mesh_async(path)
+                return len(ticks) - num_ticks
+            finally:
+                ticker.cancel()
+
+        with mock.patch('ccxmeshreader.read_mesh_async.ASYNC_BATCH_BYTES', 1):
+            self.assertGreater(asyncio.run(read_while_ticking()), 0)
+
+    def test_iter_mesh_async_closed_early(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+
+        async def read_first_record():
+            records = iter_mesh_async(path)
+            try:
+                return await records.__anext__()
+            finally:
+                await records.aclose()
+
+        self.assertEqual(asyncio.run(read_first_record()),
+                         next(iter_mesh(path)))
+
+    def test_read_mesh_async_with_continuation_keyword_line_raises_parser_error(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'continuation-keyword-line.inp')
+
+        with self.assertRaises(ParserError):
+            asyncio.run(read_mesh_async(path))
+
+    def test_read_mesh_async_with_unknown_backend_raises_value_error(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+
+        with self.assertRaises(ValueError):
+            asyncio.run(read_mesh_async(path, backend='unknown'))
+
+
+if __name__ == '__main__':
+    unittest.main()
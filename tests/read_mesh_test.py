@@ -1,8 +1,16 @@
+import io
 import os
+import tarfile
 import unittest
+from unittest import mock
 
 from ccxmeshreader import ParserError, read_mesh
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class ReadMeshTest(unittest.TestCase):
 
@@ -131,6 +139,133 @@ class ReadMeshTest(unittest.TestCase):
         self.assertTrue(str(context.exception).startswith(
             '*ELASTIC definition for ISO material must define Young\'s modulus and Poisson\'s ratio.'))
 
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_read_mesh_with_numpy_backend(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+
+        mesh = read_mesh(path, backend='numpy')
+        expected = read_mesh(path)
+
+        self.assertEqual(mesh['node_numbers'].dtype, np.int64)
+        self.assertEqual(mesh['node_coordinates'].dtype, np.float64)
+        self.assertTupleEqual(mesh['node_coordinates'].shape, (1159, 3))
+        self.assertTrue(mesh['node_coordinates'].flags['C_CONTIGUOUS'])
+        self.assertDictEqual(
+            dict(zip(mesh['node_numbers'].tolist(),
+                     map(tuple, mesh['node_coordinates'].tolist()))),
+            expected['node_coordinates_by_number'])
+
+        self.assertTupleEqual(
+            mesh['element_connectivity_by_type']['S4'].shape, (1080, 4))
+        self.assertDictEqual(
+            dict(zip(mesh['element_numbers_by_type']['S4'].tolist(),
+                     mesh['element_connectivity_by_type']['S4'].tolist())),
+            expected['element_dict_by_type']['S4'])
+
+        self.assertDictEqual(mesh['element_set_by_name'],
+                             expected['element_set_by_name'])
+        self.assertListEqual(mesh['materials'], expected['materials'])
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_read_mesh_with_numpy_backend_and_continuation_line_element_data(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'continuation-line-element.inp')
+
+        mesh = read_mesh(path, backend='numpy')
+
+        self.assertListEqual(
+            mesh['element_numbers_by_type']['C3D20R'].tolist(), [1])
+        self.assertListEqual(
+            mesh['element_connectivity_by_type']['C3D20R'].tolist(),
+            [[1, 2, 3, 4, 5, 6, 7, 8, 9, 0, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20]])
+
+    def test_read_mesh_with_workers(self):
+        for filename in ['2d-beam.inp', 'continuation-line-element.inp', 'engine.inp']:
+            with self.subTest(filename=filename):
+                path = os.path.join(os.path.abspath(
+                    os.path.dirname(__file__)), filename)
+
+                with mock.patch('ccxmeshreader.read_mesh.PARALLEL_DATA_BLOCK_BYTES', 0):
+                    mesh = read_mesh(path, workers=2)
+
+                self.assertEqual(mesh, read_mesh(path))
+
+    def test_read_mesh_from_memory(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'engine.inp')
+        with open(path, 'rb') as f:
+            data = f.read()
+        expected_mesh = read_mesh(path)
+        sources = {
+            'bytes': lambda: data,
+            'bytearray': lambda: bytearray(data),
+            'memoryview': lambda: memoryview(data),
+            'memoryview slice': lambda: memoryview(b' ' + data)[1:],
+            'binary file': lambda: io.BytesIO(data),
+            'text file': lambda: io.StringIO(data.decode('utf-8'))
+        }
+        for name, get_source in sources.items():
+            with self.subTest(source=name):
+                self.assertEqual(read_mesh(get_source()), expected_mesh)
+
+    def test_read_mesh_from_memory_with_include_resolver(self):
+        tests_directory = os.path.abspath(os.path.dirname(__file__))
+        path = os.path.join(tests_directory, '2d-beam.inp')
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode='w') as tar:
+            tar.add(path, '2d-beam.inp')
+            tar.add(os.path.join(tests_directory, '2d-beam-nodes.inp'),
+                    '2d-beam-nodes.inp')
+        archive.seek(0)
+        resolved = []
+
+        with tarfile.open(fileobj=archive) as tar:
+            def resolve_include(include_input, including_path):
+                resolved.append((include_input, including_path))
+                return tar.extractfile(include_input)
+
+            mesh = read_mesh(tar.extractfile('2d-beam.inp'),
+                             include_resolver=resolve_include)
+
+        self.assertListEqual(resolved, [('2d-beam-nodes.inp', None)])
+        self.assertEqual(mesh, read_mesh(path))
+
+    def test_read_mesh_from_memory_with_workers(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), 'engine.inp')
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        with mock.patch('ccxmeshreader.read_mesh.PARALLEL_DATA_BLOCK_BYTES', 0):
+            mesh = read_mesh(data, workers=2)
+
+        self.assertEqual(mesh, read_mesh(path))
+
+    def test_read_mesh_from_memory_resolves_includes_relative_to_working_directory(self):
+        tests_directory = os.path.abspath(os.path.dirname(__file__))
+        with open(os.path.join(tests_directory, '2d-beam.inp'), 'rb') as f:
+            data = f.read()
+        working_directory = os.getcwd()
+        os.chdir(tests_directory)
+        try:
+            mesh = read_mesh(data)
+        finally:
+            os.chdir(working_directory)
+
+        self.assertEqual(len(mesh['node_coordinates_by_number']), 1159)
+
+    def test_read_mesh_with_unknown_backend_raises_value_error(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+
+        with self.assertRaises(ValueError):
+            read_mesh(path, backend='pandas')
+
+    def test_read_mesh_with_unsupported_source_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            read_mesh(42)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from ccxmeshreader import ParserError, read_mesh, read_meshes
+from ccxmeshreader.read_mesh import iter_data_records
+
+
+class ReadMeshesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        tests_directory = os.path.abspath(os.path.dirname(__file__))
+        shutil.copy(os.path.join(tests_directory, '2d-beam-nodes.inp'),
+                    self.directory.name)
+        with open(os.path.join(tests_directory, '2d-beam.inp')) as f:
+            deck = f.read()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.directory.name, 'variant-{}.inp'.format(i))
+            with open(path, 'w') as f:
+                f.write(deck.replace('210000', str(200000 + i)))
+            self.paths.append(path)
+        self.invalid_path = os.path.join(self.directory.name, 'invalid.inp')
+        with open(self.invalid_path, 'w') as f:
+            f.write('*ELEMENT\n1, 2, 3\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_meshes_with_thread_pool_parses_shared_includes_once(self):
+        nodes_path = os.path.join(self.directory.name, '2d-beam-nodes.inp')
+
+        with mock.patch('ccxmeshreader.read_meshes.iter_data_records',
+                        wraps=iter_data_records) as parse:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                results = dict(read_meshes(self.paths, executor=executor))
+            parsed_include_blocks = [call.args[0] for call in parse.call_args_list
+                                     if call.args[0].path == nodes_path]
+
+        self.assertEqual(len(parsed_include_blocks),
+                         len(set(block.start for block in parsed_include_blocks)))
+        self.assertSetEqual(set(results), set(self.paths))
+        for path in self.paths:
+            self.assertEqual(results[path], read_mesh(path))
+
+    def test_read_meshes_with_process_pool(self):
+        results = dict(read_meshes(self.paths + [self.invalid_path], max_workers=2))
+
+        for path in self.paths:
+            self.assertEqual(results[path], read_mesh(path))
+        self.assertIsInstance(results[self.invalid_path], ParserError)
+
+
+if __name__ == '__main__':
+    unittest.main()
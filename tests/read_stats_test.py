@@ -0,0 +1,84 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from ccxmeshreader import ReadStats, read_mesh
+
+
+class ReadStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tests_directory = os.path.abspath(os.path.dirname(__file__))
+        self.path = os.path.join(self.tests_directory, '2d-beam.inp')
+
+    def test_read_mesh_with_stats(self):
+        stats = ReadStats()
+
+        mesh = read_mesh(self.path, stats=stats)
+
+        self.assertEqual(mesh, read_mesh(self.path))
+        node_stats = stats.keywords['*NODE']
+        # The *NODE keyword line and data lines, in the included file.
+        self.assertEqual(node_stats.sections, 1)
+        self.assertEqual(node_stats.lines, 1160)
+        self.assertEqual(node_stats.items, 1159)
+        self.assertEqual(node_stats.max_block_items, 1159)
+        element_stats = stats.keywords['*ELEMENT']
+        self.assertEqual(element_stats.items, 1080)
+        self.assertEqual(stats.keywords['*ELSET'].sections, 2)
+        self.assertEqual(stats.keywords['*STEP'].lines, 1)
+        self.assertEqual(stats.keywords['*STEP'].items, 0)
+        self.assertGreater(stats.tokenize_seconds, 0)
+        self.assertGreater(stats.build_seconds, 0)
+        self.assertLessEqual(sum(file_stats.io_seconds for file_stats in stats.files.values()),
+                             stats.io_seconds)
+
+    def test_read_mesh_with_stats_collects_file_stats(self):
+        stats = ReadStats()
+
+        read_mesh(self.path, stats=stats)
+
+        nodes_path = os.path.join(self.tests_directory, '2d-beam-nodes.inp')
+        self.assertListEqual(list(stats.files), [self.path, nodes_path])
+        self.assertEqual(stats.files[nodes_path].inclusions, 1)
+        self.assertEqual(stats.files[nodes_path].bytes, os.path.getsize(nodes_path))
+        # Comment lines aren't counted.
+        self.assertEqual(stats.files[nodes_path].lines, 1160)
+        self.assertEqual(stats.files[self.path].lines + stats.files[nodes_path].lines,
+                         sum(keyword_stats.lines for keyword_stats in stats.keywords.values()))
+
+    def test_read_mesh_with_stats_accumulates_reads(self):
+        stats = ReadStats()
+
+        read_mesh(self.path, stats=stats)
+        read_mesh(self.path, stats=stats)
+
+        self.assertEqual(stats.keywords['*NODE'].sections, 2)
+        self.assertEqual(stats.files[self.path].inclusions, 2)
+
+    def test_read_mesh_with_stats_and_workers(self):
+        stats = ReadStats()
+
+        with mock.patch('ccxmeshreader.read_mesh.PARALLEL_DATA_BLOCK_BYTES', 0):
+            mesh = read_mesh(self.path, workers=2, stats=stats)
+
+        self.assertEqual(mesh, read_mesh(self.path))
+        self.assertEqual(stats.keywords['*NODE'].items, 1159)
+        self.assertEqual(stats.tokenize_seconds, 0)
+
+    def test_as_dict_and_format(self):
+        stats = ReadStats()
+        read_mesh(self.path, stats=stats)
+
+        stats_dict = json.loads(json.dumps(stats.as_dict()))
+        lines = stats.format()
+
+        self.assertEqual(stats_dict['keywords']['*ELEMENT']['items'], 1080)
+        self.assertEqual(stats_dict['files'][self.path]['inclusions'], 1)
+        self.assertTrue(any(line.startswith('*NODE') for line in lines))
+        self.assertTrue(any(line.startswith(self.path) for line in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
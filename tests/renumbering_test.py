@@ -0,0 +1,67 @@
+import unittest
+
+from ccxmeshreader import read_mesh
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DECK = (
+    b'*NODE\n'
+    b'10, 0, 0, 0\n'
+    b'30, 1, 0, 0\n'
+    b'20, 1, 1, 0\n'
+    b'50, 0, 1, 0\n'
+    b'*ELEMENT, TYPE=S3, ELSET=Shells\n'
+    b'7, 10, 30, 20\n'
+    b'3, 10, 20, 50\n'
+    b'*ELEMENT, TYPE=T3D2\n'
+    b'100, 30, 50\n'
+)
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class RenumberingTest(unittest.TestCase):
+
+    def test_read_mesh_with_renumber(self):
+        mesh = read_mesh(DECK, renumber=True)
+
+        self.assertListEqual(mesh['node_numbers'].tolist(), [10, 30, 20, 50])
+        node_index_by_number = mesh['node_index_by_number']
+        self.assertEqual(len(node_index_by_number), 51)
+        self.assertListEqual(node_index_by_number[[10, 20, 30, 50]].tolist(), [0, 2, 1, 3])
+        self.assertEqual(node_index_by_number[40], -1)
+        self.assertDictEqual(mesh['element_dict_by_type'],
+                             {'S3': {7: [0, 1, 2], 3: [0, 2, 3]}, 'T3D2': {100: [1, 3]}})
+        self.assertListEqual(mesh['element_numbers'].tolist(), [7, 3, 100])
+        element_indices = mesh['element_index_by_number'][sorted(mesh['element_set_by_name']['Shells'])]
+        self.assertListEqual(element_indices.tolist(), [1, 0])
+
+    def test_read_mesh_with_renumber_and_numpy_backend(self):
+        mesh = read_mesh(DECK, backend='numpy', renumber=True)
+
+        connectivity = mesh['element_connectivity_by_type']['S3']
+        self.assertListEqual(connectivity.tolist(), [[0, 1, 2], [0, 2, 3]])
+        self.assertListEqual(mesh['node_coordinates'][connectivity[1]].tolist(),
+                             [[0, 0, 0], [1, 1, 0], [0, 1, 0]])
+        self.assertListEqual(mesh['element_connectivity_by_type']['T3D2'].tolist(), [[1, 3]])
+        self.assertListEqual(mesh['element_numbers'].tolist(), [7, 3, 100])
+        self.assertListEqual(mesh['element_index_by_number'][[3, 7, 100]].tolist(), [1, 0, 2])
+
+    def test_read_mesh_with_renumber_and_undefined_nodes(self):
+        mesh = read_mesh(DECK + b'*ELEMENT, TYPE=T3D2\n101, 10, 60\n', renumber=True)
+
+        self.assertEqual(len(mesh['node_index_by_number']), 61)
+        self.assertListEqual(mesh['element_dict_by_type']['T3D2'][101], [0, -1])
+
+    def test_read_mesh_with_renumber_and_elements_with_different_numbers_of_nodes(self):
+        mesh = read_mesh(b'*NODE\n1, 0, 0, 0\n2, 1, 0, 0\n3, 1, 1, 0\n'
+                         b'*ELEMENT, TYPE=U1\n5, 3, 1\n6, 2, 3, 1\n',
+                         renumber=True)
+
+        self.assertDictEqual(mesh['element_dict_by_type'], {'U1': {5: [2, 0], 6: [1, 2, 0]}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import io
+import os
+import unittest
+from unittest import mock
+
+from ccxmeshreader import ParserError, iter_mesh, read_mesh
+from ccxmeshreader.mesh_records import Element, ElementSetMembers, Material, Node
+from ccxmeshreader.read_mesh import iter_data_records
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DECK = (
+    b'*NODE\n'
+    b'1, 0, 0, 0\n'
+    b'2, 1, 0, 0\n'
+    b'3, 1, 1, 0\n'
+    b'4, 0, 1, 0\n'
+    b'5, 0, 0, 1\n'
+    b'*ELEMENT, TYPE=T3D2, ELSET=Bars\n'
+    b'1, 1, 2\n'
+    b'2, 2, 3\n'
+    b'*ELEMENT, TYPE=S3, ELSET=Shells\n'
+    b'3, 1, 2, 4\n'
+    b'*ELEMENT, TYPE=C3D4\n'
+    b'4, 1, 2, 4, 5\n'
+    b'*ELSET, ELSET=Edges\n'
+    b'1, Shells\n'
+    b'*MATERIAL, NAME=Steel\n'
+    b'*ELASTIC\n'
+    b'210000, 0.3\n'
+)
+
+
+class SelectionTest(unittest.TestCase):
+
+    def test_read_mesh_with_include(self):
+        mesh = read_mesh(DECK, include=('nodes', 'materials'))
+
+        self.assertEqual(len(mesh['node_coordinates_by_number']), 5)
+        self.assertDictEqual(mesh['element_dict_by_type'], {})
+        self.assertDictEqual(mesh['element_set_by_name'], {})
+        self.assertListEqual(mesh['materials'], read_mesh(DECK)['materials'])
+
+    def test_read_mesh_with_element_types_keeps_referenced_nodes(self):
+        mesh = read_mesh(DECK, element_types={'s3', 'T3D2'})
+
+        self.assertDictEqual(mesh['element_dict_by_type'],
+                             {'T3D2': {1: [1, 2], 2: [2, 3]}, 'S3': {3: [1, 2, 4]}})
+        self.assertListEqual(sorted(mesh['node_coordinates_by_number']), [1, 2, 3, 4])
+        self.assertSetEqual(mesh['element_set_by_name']['Edges'], {1, 3})
+
+    def test_read_mesh_with_element_sets(self):
+        mesh = read_mesh(DECK, include=('nodes', 'elements', 'element_sets'),
+                         element_sets={'Shells'})
+
+        self.assertDictEqual(mesh['element_dict_by_type'], {'S3': {3: [1, 2, 4]}})
+        self.assertDictEqual(mesh['node_coordinates_by_number'],
+                             {1: (0, 0, 0), 2: (1, 0, 0), 4: (0, 1, 0)})
+        self.assertDictEqual(dict(mesh['element_set_by_name']), {'Shells': {3}})
+        self.assertListEqual(mesh['materials'], [])
+
+    def test_read_mesh_with_element_set_referencing_unselected_element_set(self):
+        mesh = read_mesh(DECK, element_sets={'Edges'})
+
+        self.assertDictEqual(mesh['element_dict_by_type'],
+                             {'T3D2': {1: [1, 2]}, 'S3': {3: [1, 2, 4]}})
+        self.assertListEqual(sorted(mesh['node_coordinates_by_number']), [1, 2, 4])
+        self.assertDictEqual(dict(mesh['element_set_by_name']), {'Edges': {1, 3}})
+
+    def test_read_mesh_with_element_set_defined_by_elset_section(self):
+        mesh = read_mesh(DECK + b'*ELSET, ELSET=Part1\n4\n', element_sets={'Part1'})
+
+        self.assertDictEqual(mesh['element_dict_by_type'], {'C3D4': {4: [1, 2, 4, 5]}})
+        self.assertListEqual(sorted(mesh['node_coordinates_by_number']), [1, 2, 4, 5])
+        self.assertDictEqual(dict(mesh['element_set_by_name']), {'Part1': {4}})
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_read_mesh_with_element_sets_and_numpy_backend(self):
+        mesh = read_mesh(DECK + b'*ELSET, ELSET=Part1\n2, 4\n', backend='numpy',
+                         element_sets={'Part1'})
+
+        self.assertListEqual(mesh['node_numbers'].tolist(), [1, 2, 3, 4, 5])
+        self.assertDictEqual({element_type: element_numbers.tolist() for element_type, element_numbers
+                              in mesh['element_numbers_by_type'].items()},
+                             {'T3D2': [2], 'C3D4': [4]})
+        self.assertListEqual(mesh['element_connectivity_by_type']['T3D2'].tolist(), [[2, 3]])
+        self.assertDictEqual(dict(mesh['element_set_by_name']), {'Part1': {2, 4}})
+
+    def test_read_mesh_with_undefined_element_set_reads_no_elements(self):
+        mesh = read_mesh(DECK, element_sets={'Undefined'})
+
+        self.assertDictEqual(mesh['element_dict_by_type'], {})
+        self.assertDictEqual(mesh['node_coordinates_by_number'], {})
+        self.assertDictEqual(dict(mesh['element_set_by_name']), {})
+
+    def test_read_mesh_with_element_set_referencing_element_sets_of_element_sections(self):
+        path = os.path.join(os.path.abspath(
+            os.path.dirname(__file__)), '2d-beam.inp')
+        expected_mesh = read_mesh(path)
+
+        mesh = read_mesh(path, element_sets={'Eall'})
+
+        self.assertDictEqual(mesh['element_dict_by_type'], expected_mesh['element_dict_by_type'])
+        self.assertDictEqual(mesh['node_coordinates_by_number'],
+                             expected_mesh['node_coordinates_by_number'])
+        self.assertDictEqual(dict(mesh['element_set_by_name']),
+                             {'Eall': expected_mesh['element_set_by_name']['Eall']})
+
+    def test_read_mesh_with_element_sets_from_file_like_object(self):
+        mesh = read_mesh(io.BytesIO(DECK), element_sets={'Edges'})
+
+        self.assertEqual(mesh, read_mesh(DECK, element_sets={'Edges'}))
+
+    def test_read_mesh_with_element_types_reads_element_sets_of_other_types(self):
+        mesh = read_mesh(DECK, element_types={'C3D4'})
+
+        self.assertDictEqual(mesh['element_dict_by_type'], {'C3D4': {4: [1, 2, 4, 5]}})
+        self.assertDictEqual(dict(mesh['element_set_by_name']),
+                             {'Bars': {1, 2}, 'Shells': {3}, 'Edges': {1, 3}})
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_read_mesh_with_element_types_and_numpy_backend(self):
+        mesh = read_mesh(DECK, backend='numpy', element_types={'C3D4'})
+
+        self.assertListEqual(mesh['node_numbers'].tolist(), [1, 2, 4, 5])
+        self.assertListEqual(mesh['node_coordinates'].tolist(),
+                             [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]])
+        self.assertListEqual(list(mesh['element_numbers_by_type']), ['C3D4'])
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_read_mesh_with_element_types_and_large_node_numbers(self):
+        mesh = read_mesh(
+            b'*NODE\n'
+            b'1000000000001, 0, 0, 0\n'
+            b'1000000000002, 1, 0, 0\n'
+            b'3, 0, 1, 0\n'
+            b'*ELEMENT, TYPE=T3D2\n'
+            b'1, 1000000000002, 3\n',
+            backend='numpy', element_types={'T3D2'})
+
+        self.assertListEqual(mesh['node_numbers'].tolist(), [1000000000002, 3])
+        self.assertListEqual(mesh['node_coordinates'].tolist(), [[1, 0, 0], [0, 1, 0]])
+
+    def test_read_mesh_skips_unselected_blocks_without_parsing(self):
+        with mock.patch('ccxmeshreader.read_mesh.iter_data_records',
+                        wraps=iter_data_records) as parse:
+            read_mesh(DECK, include=('elements',), element_types={'C3D4'})
+
+        self.assertListEqual([call.args[0].element_type for call in parse.call_args_list],
+                             ['C3D4'])
+
+    def test_read_mesh_with_selection_and_workers(self):
+        with mock.patch('ccxmeshreader.read_mesh.PARALLEL_DATA_BLOCK_BYTES', 0):
+            mesh = read_mesh(DECK, workers=2, element_types={'T3D2'})
+            element_set_mesh = read_mesh(DECK, workers=2, element_sets={'Edges'})
+
+        self.assertEqual(mesh, read_mesh(DECK, element_types={'T3D2'}))
+        self.assertEqual(element_set_mesh, read_mesh(DECK, element_sets={'Edges'}))
+
+    def test_read_mesh_with_selection_reports_line_numbers_after_skipped_blocks(self):
+        with self.assertRaises(ParserError) as context:
+            read_mesh(DECK + b'*ELEMENT\n5, 1, 2\n', include=('elements',))
+
+        self.assertIn('Line 19:', str(context.exception))
+
+    def test_read_mesh_with_unknown_part_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            read_mesh(DECK, include=('nodes', 'surfaces'))
+
+    def test_iter_mesh_with_element_sets_yields_resolved_element_sets_first(self):
+        records = list(iter_mesh(DECK, element_sets={'Edges'}))
+
+        self.assertEqual(records[0], ElementSetMembers('Edges', [1, 3], []))
+        self.assertListEqual([record.number for record in records if type(record) is Element],
+                             [1, 3])
+
+    def test_iter_mesh_with_include(self):
+        records = list(iter_mesh(DECK, include=('nodes',), element_sets={'Bars'}))
+
+        self.assertTrue(all(type(record) is Node for record in records))
+        self.assertEqual(len(records), 5)
+        self.assertNotIn(Material('Steel'), records)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from ccxmeshreader import SharedMesh, read_mesh
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def sum_coordinates(descriptor):
+    with SharedMesh.attach(descriptor) as shared_mesh:
+        mesh = shared_mesh.mesh
+        total = float(mesh['node_coordinates'][:, 1].sum())
+        num_elements = len(mesh['element_numbers_by_type']['S4'])
+        del mesh
+    return total, num_elements
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class SharedMeshTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(os.path.abspath(os.path.dirname(__file__)), '2d-beam.inp')
+
+    def assertMeshesEqual(self, shared, mesh):
+        self.assertListEqual(shared['node_numbers'].tolist(), mesh['node_numbers'].tolist())
+        self.assertListEqual(shared['node_coordinates'].tolist(), mesh['node_coordinates'].tolist())
+        for element_type, connectivity in mesh['element_connectivity_by_type'].items():
+            self.assertListEqual(shared['element_numbers_by_type'][element_type].tolist(),
+                                 mesh['element_numbers_by_type'][element_type].tolist())
+            self.assertListEqual(shared['element_connectivity_by_type'][element_type].tolist(),
+                                 connectivity.tolist())
+        self.assertDictEqual(
+            {name: element_set.tolist() for name, element_set in shared['element_set_by_name'].items()},
+            {name: sorted(element_set) for name, element_set in mesh['element_set_by_name'].items()})
+        self.assertListEqual(shared['materials'], mesh['materials'])
+
+    def test_publish_and_attach(self):
+        mesh = read_mesh(self.path, backend='numpy')
+
+        with SharedMesh.publish(mesh) as published:
+            attached = SharedMesh.attach(published.descriptor)
+            self.assertMeshesEqual(attached.mesh, mesh)
+            self.assertFalse(attached.mesh['node_coordinates'].flags.writeable)
+            attached.close()
+
+        with self.assertRaises(FileNotFoundError):
+            SharedMesh.attach(published.descriptor)
+
+    def test_publish_with_dict_backend_and_renumbering(self):
+        mesh = read_mesh(self.path, renumber=True)
+
+        with SharedMesh.publish(mesh) as published:
+            shared = published.mesh
+            self.assertMeshesEqual(shared, read_mesh(self.path, backend='numpy', renumber=True))
+            self.assertListEqual(shared['node_index_by_number'].tolist(),
+                                 mesh['node_index_by_number'].tolist())
+            self.assertListEqual(shared['element_numbers'].tolist(), mesh['element_numbers'].tolist())
+            del shared
+
+    def test_publish_empty_mesh(self):
+        with SharedMesh.publish(read_mesh(b'', backend='numpy')) as published:
+            self.assertEqual(published.mesh['node_coordinates'].shape, (0, 3))
+
+    def test_attach_in_worker_processes(self):
+        mesh = read_mesh(self.path, backend='numpy')
+
+        with SharedMesh.publish(mesh) as published:
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(sum_coordinates, 2 * [published.descriptor]))
+
+        self.assertListEqual(results, 2 * [(float(mesh['node_coordinates'][:, 1].sum()), 1080)])
+
+
+if __name__ == '__main__':
+    unittest.main()
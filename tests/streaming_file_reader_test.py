@@ -0,0 +1,140 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ccxmeshreader.mapped_file_reader import MappedFileReader
+from ccxmeshreader.streaming_file_reader import (StreamingFileReader,
+                                                 open_file_reader)
+
+# Chunk sizes splitting lines, keywords, and blank lines across chunk edges, or not at all.
+CHUNK_SIZES = (1, 3, 1 << 20)
+
+
+class StreamingFileReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'mesh.inp.gz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, contents: bytes) -> None:
+        with open(self.path, 'wb') as f:
+            f.write(gzip.compress(contents))
+
+    def iter_readers(self):
+        for chunk_size in CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                with mock.patch('ccxmeshreader.streaming_file_reader.DECOMPRESS_CHUNK_BYTES',
+                                chunk_size):
+                    with StreamingFileReader(self.path) as reader:
+                        yield reader
+
+    def test_readline(self):
+        self.write(b'*NODE\n1, 0, 0, 0')
+
+        for reader in self.iter_readers():
+            self.assertEqual(reader.readline(), '*NODE\n')
+            self.assertEqual(reader.readline(), '1, 0, 0, 0')
+            self.assertEqual(reader.readline(), '')
+            self.assertEqual(reader.size, 16)
+
+    def test_readline_with_empty_file(self):
+        self.write(b'')
+
+        for reader in self.iter_readers():
+            self.assertEqual(reader.readline(), '')
+
+    def test_read_data_block_ends_before_keyword(self):
+        self.write(b'*NODE\n1, 0, 0, 0\n2, 1, 0, 0\n*ELEMENT, TYPE=T3D2\n')
+
+        for reader in self.iter_readers():
+            reader.readline()
+            reader.readline()
+            self.assertEqual(reader.read_data_block(),
+                             b'1, 0, 0, 0\n2, 1, 0, 0\n')
+            self.assertEqual(reader.position, 28)
+            self.assertEqual(reader.readline(), '*ELEMENT, TYPE=T3D2\n')
+
+    def test_read_data_block_ends_before_blank_line_or_indented_keyword(self):
+        self.write(b'1, 0, 0, 0\n  \n2, 1, 0, 0\n  *ELEMENT\n')
+
+        for reader in self.iter_readers():
+            reader.readline()
+            self.assertEqual(reader.read_data_block(), b'1, 0, 0, 0\n')
+            self.assertEqual(reader.readline(), '  \n')
+            reader.readline()
+            self.assertEqual(reader.read_data_block(), b'2, 1, 0, 0\n')
+            self.assertEqual(reader.readline(), '  *ELEMENT\n')
+
+    def test_read_data_block_at_end_of_file(self):
+        self.write(b'*NODE\n1, 0, 0, 0\n2, 1, 0, 0')
+
+        for reader in self.iter_readers():
+            reader.readline()
+            reader.readline()
+            self.assertEqual(reader.read_data_block(), b'1, 0, 0, 0\n2, 1, 0, 0')
+            self.assertEqual(reader.readline(), '')
+
+    def test_skip_data_block(self):
+        self.write(b'*NODE\n1, 0, 0, 0\n2, 1, 0, 0\n*ELEMENT, TYPE=T3D2\n1, 1, 2')
+
+        for reader in self.iter_readers():
+            reader.readline()
+            reader.readline()
+            self.assertEqual(reader.skip_data_block(), 2)
+            self.assertEqual(reader.readline(), '*ELEMENT, TYPE=T3D2\n')
+            reader.readline()
+            self.assertEqual(reader.skip_data_block(), 1)
+            self.assertEqual(reader.readline(), '')
+
+    def test_skip_data_block_keeps_at_most_a_chunk(self):
+        self.write(b'*NODE\n' + b''.join(b'%d, 0, 0, 0\n' % i for i in range(1000)) + b'*END\n')
+
+        with mock.patch('ccxmeshreader.streaming_file_reader.DECOMPRESS_CHUNK_BYTES', 64):
+            with StreamingFileReader(self.path) as reader:
+                reader.readline()
+                reader.readline()
+                self.assertEqual(reader.skip_data_block(), 1000)
+                self.assertLessEqual(len(reader.window), 2 * 64)
+                self.assertEqual(reader.readline(), '*END\n')
+
+    def test_read_data_block_splits_large_blocks_between_continued_lines(self):
+        self.write(b'1, 1, 2,\n3, 4\n2, 5, 6,\n7, 8\n')
+
+        with mock.patch('ccxmeshreader.streaming_file_reader.DATA_BLOCK_BYTES', 2):
+            for reader in self.iter_readers():
+                reader.readline()
+                self.assertEqual(reader.read_data_block(), b'1, 1, 2,\n3, 4\n')
+                reader.readline()
+                self.assertEqual(reader.read_data_block(), b'2, 5, 6,\n7, 8\n')
+
+    def test_rewind_decompresses_again(self):
+        self.write(b'*NODE\n1, 0, 0, 0\n')
+
+        for reader in self.iter_readers():
+            reader.readline()
+            reader.readline()
+            reader.rewind()
+            self.assertEqual(reader.readline(), '*NODE\n')
+            self.assertEqual(reader.readline(), '1, 0, 0, 0\n')
+
+    def test_open_file_reader_streams_compressed_sources(self):
+        self.write(b'*NODE\n')
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        for source in (self.path, data, memoryview(data)):
+            with self.subTest(source=type(source).__name__):
+                with open_file_reader(source) as reader:
+                    self.assertIsInstance(reader, StreamingFileReader)
+                    self.assertEqual(reader.readline(), '*NODE\n')
+        with open_file_reader(b'*NODE\n') as reader:
+            self.assertIsInstance(reader, MappedFileReader)
+
+
+if __name__ == '__main__':
+    unittest.main()
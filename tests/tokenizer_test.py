@@ -0,0 +1,74 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from ccxmeshreader import _tokenizer
+except ImportError:
+    _tokenizer = None
+
+
+@unittest.skipIf(_tokenizer is None, 'the _tokenizer extension is not built')
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TokenizerTest(unittest.TestCase):
+
+    def test_parse_node_block(self):
+        node_numbers = np.empty(3, dtype=np.int64)
+        node_coordinates = np.empty((3, 3), dtype=np.float64)
+
+        num_nodes = _tokenizer.parse_node_block(
+            b'  1, 2.00000e+00, -7.45058e-09, 0.00000e+00 \r\n'
+            b'14,0,10,.5\n'
+            b'-3, 1.2345678901234567890e-300, 1e400, 9007199254740993\n',
+            node_numbers, node_coordinates)
+
+        self.assertEqual(num_nodes, 3)
+        self.assertListEqual(node_numbers.tolist(), [1, 14, -3])
+        self.assertListEqual(node_coordinates.tolist(), [
+            [2.0, -7.45058e-09, 0.0],
+            [0.0, 10.0, 0.5],
+            [float('1.2345678901234567890e-300'), float('inf'), 9007199254740993.0]
+        ])
+
+    def test_parse_node_block_returns_none_unless_regular(self):
+        for data in [b'1, 0, 0\n', b'1, 0, 0, 0, 0\n', b'1.5, 0, 0, 0\n',
+                     b'1, nan, 0, 0\n', b'1, 1_0, 0, 0\n', b'1, 0, 0, 0\n\n2, 0, 0, 0\n',
+                     b'1, 0, 0, 0\n2, 0, 0, 0\n']:
+            with self.subTest(data=data):
+                node_numbers = np.empty(1, dtype=np.int64)
+                node_coordinates = np.empty((1, 3), dtype=np.float64)
+                self.assertIsNone(_tokenizer.parse_node_block(
+                    data, node_numbers, node_coordinates))
+
+    def test_parse_element_block(self):
+        element_numbers = np.empty(4, dtype=np.int64)
+        connectivity = np.empty(16, dtype=np.int64)
+
+        shape = _tokenizer.parse_element_block(
+            b'1, 1, 2, 3, \r\n'
+            b'   4, , 6\r\n'
+            b'2, 7,8,9,\n'
+            b'10,11,12',
+            element_numbers, connectivity)
+
+        self.assertTupleEqual(shape, (2, 6))
+        self.assertListEqual(element_numbers[:2].tolist(), [1, 2])
+        self.assertListEqual(connectivity[:12].tolist(),
+                             [1, 2, 3, 4, 0, 6, 7, 8, 9, 10, 11, 12])
+
+    def test_parse_element_block_returns_none_unless_regular(self):
+        for data in [b'1, 1, 2, 3\n2, 4, 5\n', b'1, 1, x, 3\n', b'1, 1, 2\n\n2, 3, 4\n',
+                     b','.join(str(i).encode() for i in range(17)) + b'\n',
+                     b'1, 99999999999999999999\n']:
+            with self.subTest(data=data):
+                element_numbers = np.empty(4, dtype=np.int64)
+                connectivity = np.empty(64, dtype=np.int64)
+                self.assertIsNone(_tokenizer.parse_element_block(
+                    data, element_numbers, connectivity))
+
+
+if __name__ == '__main__':
+    unittest.main()